@@ -118,3 +118,29 @@ def get_thread_health():
         })
 
     return success(data=threads)
+
+
+# -------------------------------------------
+#             PARSER TELEMETRY
+# -------------------------------------------
+
+@system_api.get("/parsers")
+def get_parser_telemetry():
+    logger.info("[parsers] Parser telemetry endpoint called")
+
+    from backend.core.scheduler.scheduler import scheduler_instance
+
+    if not scheduler_instance:
+        return error("Scheduler not initialized", status_code=503)
+
+    try:
+        data = scheduler_instance.parse_telemetry.snapshot()
+
+        if scheduler_instance.ssh_sessions:
+            data["ssh_sessions"] = scheduler_instance.ssh_sessions.stats()
+
+        return success(data=data)
+
+    except Exception as e:
+        logger.exception(f"[parsers] Exception occurred: {e}")
+        return error("Failed to retrieve parser telemetry", exception=e)
@@ -1,3 +1,5 @@
+import signal
+
 from flask import Flask, render_template
 from backend.database import init_db
 
@@ -85,6 +87,20 @@ def create_app():
         except Exception:
             logger.exception("[APP] Failed to stop DBWriter")
 
+    # SIGTERM (systemd stop) / SIGINT: açık sshd oturumları özetlensin,
+    # offset'ler ve correlation context yazılsın, sonra çık
+    def on_signal(signum, frame):
+        logger.info(f"[APP] Received signal {signum}")
+        shutdown()
+        raise SystemExit(0)
+
+    try:
+        signal.signal(signal.SIGTERM, on_signal)
+        signal.signal(signal.SIGINT, on_signal)
+    except ValueError:
+        # main thread dışında import edildi (signal kurulamaz)
+        logger.warning("[APP] Signal handlers not installed (not in main thread)")
+
     # -------------------------------------------------
     # FRONTEND ROUTES
     # -------------------------------------------------
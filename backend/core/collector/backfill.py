@@ -0,0 +1,288 @@
+# 📁 backfill.py
+
+# Amaç: agent yeni kurulduğunda son N günün rotate edilmiş loglarını
+# (auth.log.1, auth.log.2.gz, syslog.3.gz, dpkg.log.1.gz ...) içeri almak.
+#
+# - Canlı dosyalara ve log_offsets.json'a dokunmaz (onlar LogsCollector'ın işi)
+# - Arşivler worker process'lerde paralel açılır ve parse edilir; worker'lar
+#   birbirini beklemez (en fazla MAX_INFLIGHT_PER_WORKER × worker arşiv havada)
+# - Worker her PARSE_BATCH_LINES'lık parçanın event'lerini arşive ait geçici
+#   spool dosyasına yazar; ana process arşiv bitince spool'u parça parça
+#   okuyup DB'ye yazar → bellek arşiv boyutuyla değil parça boyutuyla büyür
+# - Her kaynak kendi içinde kronolojik sırayla (eskiden yeniye) DB'ye yazılır
+# - Rule engine çalıştırılmaz: geçmiş veri alarm üretmemeli
+#
+# Kullanım: scripts/backfill_logs.py --days 7
+
+import gzip
+import itertools
+import multiprocessing
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from backend.core.collector.log_sources import LogSourceRegistry
+from backend.core.parser.LogDispatcher import LogDispatcher
+from backend.core.utils.timestamp import default_parser as timestamp_parser
+from backend.logger import logger
+
+
+# auth.log.1, auth.log.2.gz, auth.log-20240101, auth.log-20240101.gz
+ARCHIVE_SUFFIX = re.compile(r"^(?:\.(\d+)|-(\d{8}))(?:\.gz)?$")
+
+# worker'da dispatch_batch'e verilen satır grubu
+PARSE_BATCH_LINES = 5000
+
+# sırası gelmemiş (spool'u yazılmayı bekleyen) arşiv sınırı, worker başına;
+# spool'ların disk kullanımını sınırlar, worker'ları durdurmaz
+MAX_INFLIGHT_PER_WORKER = 2
+
+
+# WORKER PROCESS STATE
+_worker_dispatcher = None
+
+
+def _init_worker():
+    global _worker_dispatcher
+    _worker_dispatcher = LogDispatcher()
+
+
+def _parse_archive(path, parser, cutoff, spool_dir):
+    """
+    Worker: arşivi açar, satırları parça parça parse eder; her parçanın
+    event'lerini spool dosyasına pickle'lar (spool_dir None → dry run, sadece sayar).
+    → {"lines", "events", "spool", "started", "finished"}
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    started = time.time()
+    lines = 0
+    count = 0
+
+    spool = None
+    if spool_dir is not None:
+        fd, spool_path = tempfile.mkstemp(dir=spool_dir, suffix=".spool")
+        spool = os.fdopen(fd, "wb")
+
+    def keep(events):
+        nonlocal count
+        events = _keep_events(events, cutoff)
+        if events:
+            count += len(events)
+            if spool is not None:
+                pickle.dump(events, spool, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # yılsız syslog zamanları arşivin yazıldığı zamana göre yıllandırılır
+    timestamp_parser.set_reference(datetime.fromtimestamp(os.path.getmtime(path)))
+
+    try:
+        with opener(path, "rb") as f:
+            while True:
+                chunk = [
+                    raw.decode("utf-8", errors="ignore").rstrip("\n")
+                    for raw in itertools.islice(f, PARSE_BATCH_LINES)
+                ]
+                if not chunk:
+                    break
+
+                lines += len(chunk)
+                keep(_worker_dispatcher.dispatch_batch(parser, chunk)["events"])
+
+        # stateful parser (auditd): arşiv sonunda tamamlanmamış kayıtlar
+        keep(_worker_dispatcher.flush(parser))
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool_path)
+        raise
+    finally:
+        timestamp_parser.set_reference(None)
+
+    if spool is not None:
+        spool.close()
+
+    return {
+        "lines": lines,
+        "events": count,
+        "spool": spool_path if spool is not None else None,
+        "started": started,
+        "finished": time.time(),
+    }
+
+
+def _keep_events(parsed, cutoff):
+    events = []
+    for event in parsed:
+        # process event'leri (auditd PROCESS_EXEC ...) log_events tablosuna ait değil;
+        # geçmiş process aktivitesi backfill edilmez
+        if "type" in event:
+            continue
+        ts = event.get("timestamp")
+        if ts is not None and _local_naive(ts) < cutoff:
+            continue
+        events.append(event)
+    return events
+
+
+def _local_naive(ts):
+    """RFC3339 (rsyslog) zamanları timezone'lu gelir; cutoff ile aynı forma (yerel, naive) çevir."""
+    if ts.tzinfo is not None:
+        return ts.astimezone().replace(tzinfo=None)
+    return ts
+
+
+class LogBackfill:
+
+    def __init__(self, days=7, workers=None, registry=None, db_writer=None):
+        self.days = days
+        self.workers = workers or os.cpu_count() or 1
+        self.registry = registry or LogSourceRegistry()
+        self.db_writer = db_writer  # None → sadece parse (dry run)
+
+    # PUBLIC API
+
+    def discover(self):
+        """
+        Kaynak başına son `days` gün içinde yazılmış arşivleri bulur.
+        → {source: [(path, parser), ...]} (eskiden yeniye)
+        """
+        cutoff = time.time() - self.days * 86400
+        found = {}
+
+        for spec in self.registry.specs:
+            directory, name = os.path.split(spec["path"])
+            try:
+                entries = os.listdir(directory)
+            except OSError:
+                continue
+
+            archives = []
+            for entry in entries:
+                if not entry.startswith(name):
+                    continue
+                m = ARCHIVE_SUFFIX.match(entry[len(name):])
+                if not m:
+                    continue
+
+                path = os.path.join(directory, entry)
+                mtime = os.path.getmtime(path)
+                if mtime < cutoff:
+                    continue
+
+                # aynı mtime'da numarası büyük olan daha eskidir
+                number = int(m.group(1) or 0)
+                archives.append((mtime, -number, path))
+
+            if archives:
+                found[spec["name"]] = [(path, spec["parser"]) for _, _, path in sorted(archives)]
+
+        return found
+
+    def run(self):
+        """Arşivleri paralel parse eder, kaynak sırasıyla yükler ve istatistik döner."""
+        archives = self.discover()
+        if not archives:
+            logger.info("[Backfill] No rotated archives found")
+            return {}
+
+        cutoff = datetime.now() - timedelta(days=self.days)
+        started = time.time()
+        stats = {}
+
+        logger.info(
+            f"[Backfill] {sum(map(len, archives.values()))} archives, "
+            f"{self.workers} workers, last {self.days} days"
+        )
+
+        # kaynak sırasıyla, kaynak içinde eskiden yeniye
+        work = deque(
+            (source, path, parser)
+            for source, items in archives.items()
+            for path, parser in items
+        )
+        inflight = deque()
+        max_inflight = self.workers * MAX_INFLIGHT_PER_WORKER
+        spool_dir = tempfile.mkdtemp(prefix="hids-backfill-") if self.db_writer is not None else None
+        self.timings = []  # arşiv başına (path, worker başlangıç, bitiş) — scripts/bench_backfill.py
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_init_worker,
+            ) as pool:
+
+                while work or inflight:
+                    while work and len(inflight) < max_inflight:
+                        source, path, parser = work.popleft()
+                        future = pool.submit(_parse_archive, path, parser, cutoff, spool_dir)
+                        inflight.append((source, path, future))
+
+                    # sonuçlar kaynak sırasıyla yazılır; diğer worker'lar bu sırada parse etmeye devam eder
+                    source, path, future = inflight.popleft()
+                    source_stats = stats.setdefault(source, {"archives": 0, "lines": 0, "events": 0})
+
+                    try:
+                        result = future.result()
+                    except Exception:
+                        logger.exception(f"[Backfill] Failed parsing {path}")
+                        continue
+
+                    if result["spool"] is not None:
+                        self._write_spool(result["spool"], path)
+
+                    self.timings.append((path, result["started"], result["finished"]))
+                    source_stats["archives"] += 1
+                    source_stats["lines"] += result["lines"]
+                    source_stats["events"] += result["events"]
+                    logger.info(f"[Backfill] {path}: {result['lines']} lines, {result['events']} events")
+        finally:
+            if spool_dir is not None:
+                shutil.rmtree(spool_dir, ignore_errors=True)
+
+        elapsed = max(time.time() - started, 1e-6)
+        total_lines = sum(s["lines"] for s in stats.values())
+        stats["_total"] = {
+            "lines": total_lines,
+            "events": sum(s["events"] for s in stats.values()),
+            "seconds": round(elapsed, 2),
+            "lines_per_sec": int(total_lines / elapsed),
+        }
+
+        logger.info(f"[Backfill] Done: {stats['_total']}")
+        return stats
+
+    # HELPERS
+
+    def _write_spool(self, spool_path, path):
+        """Worker'ın spool'unu parça parça okuyup yazar, sonra siler."""
+        try:
+            with open(spool_path, "rb") as f:
+                while True:
+                    try:
+                        events = pickle.load(f)
+                    except EOFError:
+                        break
+                    self._write(events, path)
+        finally:
+            os.unlink(spool_path)
+
+    def _write(self, events, path):
+        if self.db_writer is None:
+            return
+
+        from backend.models.log_model import LogEventModel
+
+        try:
+            self.db_writer.write_bulk(
+                LogEventModel,
+                [LogEventModel.to_row(e) for e in events],
+                event_type="LOG_EVENT",
+            )
+        except Exception:
+            logger.exception(f"[Backfill] Failed writing {len(events)} events from {path}")
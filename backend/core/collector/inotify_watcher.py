@@ -0,0 +1,203 @@
+# 📁 inotify_watcher.py
+
+# Amaç: log dosyalarını polling yerine Linux inotify ile izlemek.
+# Dosya değiştiği anda hangi kaynağın (auth, syslog ...) okunması
+# gerektiğini LogsCollector'a bildirir.
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+
+from backend.logger import logger
+
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+FILE_MASK = IN_MODIFY | IN_MOVE_SELF | IN_DELETE_SELF
+DIR_MASK = IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+_READ_SIZE = 64 * 1024
+
+
+class InotifyWatcher:
+    """
+    Watches log files and their parent directories with inotify.
+
+    - File watches (IN_MODIFY / IN_MOVE_SELF / IN_DELETE_SELF) report appends
+      and rotation of the file that is currently open.
+    - Directory watches (IN_CREATE / IN_MOVED_TO ...) report a new file
+      appearing under a watched name, so the file watch is re-armed after
+      logrotate. A new file matching a watched glob sets `rescan_needed`.
+
+    wait() returns the set of source names that changed.
+    """
+
+    def __init__(self, paths: dict):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+
+        self._file_wds = {}   # wd -> source
+        self._dir_wds = {}    # wd -> directory
+        self._dir_names = {}  # directory -> {basename: source}
+        self._dir_patterns = {}  # directory -> [glob]
+        self.paths = {}
+        self.rescan_needed = False
+
+        for source, path in paths.items():
+            self.watch(source, path)
+
+    @classmethod
+    def create(cls, paths: dict):
+        """Returns a watcher, or None when inotify is not available."""
+        try:
+            watcher = cls(paths)
+            logger.info(f"[InotifyWatcher] Watching {len(paths)} log sources")
+            return watcher
+        except (OSError, AttributeError) as e:
+            logger.warning(f"[InotifyWatcher] inotify unavailable, falling back to polling: {e}")
+            return None
+
+    # PUBLIC API
+
+    def watch(self, source: str, path: str):
+        """Watch a log file and its parent directory."""
+        self.paths[source] = path
+
+        directory, name = os.path.split(path)
+        if not self._watch_dir(directory):
+            return
+
+        self._dir_names[directory][name] = source
+        self._watch_file(source, path)
+
+    def watch_pattern(self, directory: str, pattern: str):
+        """Watch a directory for new files whose name matches `pattern`."""
+        if self._watch_dir(directory):
+            self._dir_patterns.setdefault(directory, []).append(pattern)
+
+    def wait(self, timeout: float, extra_fds=None) -> set:
+        """
+        Blocks up to `timeout` seconds and returns the sources that changed.
+        An empty set means nothing happened before the timeout.
+
+        extra_fds: {fd: source} — stream-based sources (ör: journalctl pipe)
+        that are reported as changed when their fd becomes readable.
+        """
+        extra_fds = extra_fds or {}
+        readable, _, _ = select.select([self.fd, *extra_fds], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = {extra_fds[fd] for fd in readable if fd in extra_fds}
+        if self.fd not in readable:
+            return changed
+
+        while True:
+            try:
+                buf = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            changed |= self._handle_events(buf)
+
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    # INTERNAL HELPERS
+
+    def _add_watch(self, path: str, mask: int):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            logger.debug(f"[InotifyWatcher] Cannot watch {path}: {os.strerror(err)}")
+            return None
+        return wd
+
+    def _watch_dir(self, directory: str) -> bool:
+        if directory in self._dir_names:
+            return True
+
+        wd = self._add_watch(directory, DIR_MASK)
+        if wd is None:
+            return False
+
+        self._dir_wds[wd] = directory
+        self._dir_names[directory] = {}
+        return True
+
+    def _watch_file(self, source: str, path: str):
+        if not os.path.exists(path):
+            return
+        wd = self._add_watch(path, FILE_MASK)
+        if wd is not None:
+            self._file_wds[wd] = source
+
+    def _handle_events(self, buf: bytes) -> set:
+        changed = set()
+        offset = 0
+
+        while offset + _EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b"\0").decode(errors="ignore")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("[InotifyWatcher] Event queue overflow, rescanning all sources")
+                changed |= set(self.paths)
+                continue
+
+            if wd in self._dir_wds:
+                directory = self._dir_wds[wd]
+                source = self._dir_names[directory].get(name)
+                if source is None:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and any(
+                        fnmatch.fnmatchcase(name, p) for p in self._dir_patterns.get(directory, ())
+                    ):
+                        # izlenen glob'a uyan yeni dosya → kaynak listesi yenilenmeli
+                        self.rescan_needed = True
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # new file under the watched name (ör: logrotate sonrası)
+                    self._watch_file(source, self.paths[source])
+                changed.add(source)
+                continue
+
+            source = self._file_wds.get(wd)
+            if source is None:
+                continue
+
+            if mask & IN_IGNORED:
+                # watch removed by the kernel (file deleted)
+                self._file_wds.pop(wd, None)
+                continue
+
+            changed.add(source)
+
+        return changed
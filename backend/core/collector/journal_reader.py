@@ -0,0 +1,315 @@
+# 📁 journal_reader.py
+
+# Amaç: sadece journald kullanan makinelerde (auth.log / syslog yok)
+# systemd journal kayıtlarını okumak.
+#
+# Kaynak: journal export formatı
+#   - canlı:  journalctl -o export -f --after-cursor=<cursor>
+#   - dosya:  journalctl -o export > kayit.export (test / replay)
+#
+# Kayıtlar yapısal alanlarına göre (SYSLOG_FACILITY, _TRANSPORT,
+# SYSLOG_IDENTIFIER) doğru parser'a yönlendirilir; regex ile satır
+# koklamaya gerek kalmaz. Checkpoint byte offset değil __CURSOR'dır.
+
+import fcntl
+import os
+import shutil
+import subprocess
+from datetime import datetime
+
+from backend.logger import logger
+
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# syslog facility numaraları: 4 = auth, 10 = authpriv
+AUTH_FACILITIES = {"4", "10"}
+
+AUTH_IDENTIFIERS = {
+    "sshd", "sudo", "su", "login", "passwd", "chpasswd",
+    "useradd", "usermod", "userdel", "groupadd", "groupdel",
+    "systemd-logind", "polkitd", "pkexec",
+}
+
+
+class ExportFormatParser:
+    """
+    Incremental parser for the journal export format.
+
+    Text fields are "KEY=value\\n", binary fields are "KEY\\n" followed by a
+    little-endian 64-bit length, the raw data and "\\n". A blank line ends
+    a record. feed() accepts arbitrary chunks and returns completed records.
+    """
+
+    def __init__(self):
+        self._buf = b""
+        self._record = {}
+
+    def feed(self, data: bytes) -> list:
+        buf = self._buf + data if self._buf else data
+        records = []
+        pos = 0
+        size = len(buf)
+
+        while pos < size:
+            if buf[pos] == 0x0A:
+                # boş satır → kayıt sonu
+                if self._record:
+                    records.append(self._record)
+                    self._record = {}
+                pos += 1
+                continue
+
+            nl = buf.find(b"\n", pos)
+            if nl < 0:
+                break
+
+            eq = buf.find(b"=", pos, nl)
+            if eq >= 0:
+                key = buf[pos:eq].decode("ascii", errors="ignore")
+                self._record[key] = buf[eq + 1:nl].decode("utf-8", errors="ignore")
+                pos = nl + 1
+                continue
+
+            # binary alan: KEY\n <uint64 le> data \n
+            if nl + 9 > size:
+                break
+            length = int.from_bytes(buf[nl + 1:nl + 9], "little")
+            end = nl + 9 + length
+            if end + 1 > size:
+                break
+
+            key = buf[pos:nl].decode("ascii", errors="ignore")
+            self._record[key] = buf[nl + 9:end].decode("utf-8", errors="ignore")
+            pos = end + 1
+
+        self._buf = buf[pos:]
+        return records
+
+
+class JournalReader:
+    """
+    Journal kaynağı. read() → (parser, satırlar, {"cursor": ...}, byte) batch'leri.
+    self.cursor, downstream'e verilen son batch'in cursor'ıdır (okuma konumu);
+    kalıcı checkpoint OffsetManager'da tutulur.
+
+    export_file verilirse dosya okunur (kayıtlı export / test); verilmezse
+    journalctl -f süreci açık tutulur ve non-blocking okunur.
+    """
+
+    SOURCE = "journal"
+    READ_SIZE = 64 * 1024
+    MAX_BATCH_LINES = 1000
+
+    def __init__(self, cursor=None, export_file=None, journalctl="journalctl"):
+        self.cursor = cursor  # son okunan (downstream'e verilen) kaydın cursor'ı
+        self.export_file = export_file
+        self.journalctl = journalctl
+
+        self._proc = None
+        self._parser = ExportFormatParser()
+        self._file_pos = 0
+        self._file_eof = False
+        self._skipping = export_file is not None and cursor is not None
+
+    @classmethod
+    def available(cls, journalctl="journalctl"):
+        return shutil.which(journalctl) is not None
+
+    # PUBLIC API
+
+    def fileno(self):
+        """select() için canlı stream'in fd'si (dosya modunda None)."""
+        if self.export_file is None:
+            self._ensure_process()
+        return self._proc.stdout.fileno() if self._proc else None
+
+    def read(self, max_bytes):
+        """
+        Generator: yeni kayıtları okur, ardışık aynı parser'a giden kayıtları
+        gruplayarak (parser, satırlar, checkpoint, byte) üretir.
+        """
+        records, nbytes = self._read_records(max_bytes)
+        if not records:
+            return
+
+        group, group_parser, group_cursor = [], None, None
+        completed = False
+
+        try:
+            for record in records:
+                parser = route(record)
+                line = to_syslog_line(record)
+
+                if group and (parser != group_parser or len(group) >= self.MAX_BATCH_LINES):
+                    yield group_parser, group, {"cursor": group_cursor}, nbytes
+                    self.cursor = group_cursor
+                    nbytes = 0
+                    group = []
+
+                group_parser = parser
+                group_cursor = record.get("__CURSOR", group_cursor)
+                group.append(line)
+
+            if group:
+                yield group_parser, group, {"cursor": group_cursor}, nbytes
+                self.cursor = group_cursor
+
+            completed = True
+
+        finally:
+            if not completed:
+                # okunmuş ama downstream'e verilmemiş kayıtlar var → cursor'dan yeniden oku
+                self._resync()
+
+    def seek(self, cursor):
+        """Okuma konumunu cursor'a geri alır (sonraki read() oradan devam eder)."""
+        self.cursor = cursor
+        self._resync()
+
+    def close(self):
+        if self._proc:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+            self._proc = None
+
+    # INTERNAL HELPERS
+
+    def _resync(self):
+        self.close()
+        self._parser = ExportFormatParser()
+        if self.export_file is not None:
+            self._file_pos = 0
+            self._skipping = self.cursor is not None
+
+    def _read_records(self, max_bytes):
+        if self.export_file is not None:
+            chunks = self._read_file(max_bytes)
+        else:
+            chunks = self._read_stream(max_bytes)
+
+        records = []
+        total = 0
+
+        for chunk in chunks:
+            total += len(chunk)
+            for record in self._parser.feed(chunk):
+                if self._skipping:
+                    # checkpoint'teki cursor'a kadar olan kayıtlar zaten işlendi
+                    if record.get("__CURSOR") == self.cursor:
+                        self._skipping = False
+                    continue
+                records.append(record)
+
+        if self._skipping and self._file_eof:
+            # cursor girdide yok (journal vacuum / rotate) → hepsini atlamak
+            # yerine baştan oku
+            logger.warning(
+                f"[JournalReader] Checkpoint cursor not found in {self.export_file}, "
+                f"reading from the beginning"
+            )
+            self._skipping = False
+            self._file_pos = 0
+            self._parser = ExportFormatParser()
+
+        return records, total
+
+    def _read_file(self, max_bytes):
+        try:
+            with open(self.export_file, "rb") as f:
+                f.seek(self._file_pos)
+                self._file_eof = False
+                while max_bytes > 0:
+                    chunk = f.read(min(self.READ_SIZE, max_bytes))
+                    if not chunk:
+                        self._file_eof = True
+                        break
+                    self._file_pos += len(chunk)
+                    max_bytes -= len(chunk)
+                    yield chunk
+        except OSError as e:
+            logger.error(f"[JournalReader] Failed reading {self.export_file}: {e}")
+
+    def _read_stream(self, max_bytes):
+        self._ensure_process()
+        if self._proc is None:
+            return
+
+        fd = self._proc.stdout.fileno()
+        while max_bytes > 0:
+            try:
+                chunk = os.read(fd, min(self.READ_SIZE, max_bytes))
+            except BlockingIOError:
+                return
+
+            if not chunk:
+                logger.warning("[JournalReader] journalctl exited, restarting on next read")
+                self._resync()
+                return
+
+            max_bytes -= len(chunk)
+            yield chunk
+
+    def _ensure_process(self):
+        if self._proc is not None:
+            return
+
+        cmd = [self.journalctl, "-o", "export", "-f", "--no-tail"]
+        cmd += [f"--after-cursor={self.cursor}"] if self.cursor else ["-b"]
+
+        try:
+            self._proc = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL
+            )
+        except OSError as e:
+            logger.error(f"[JournalReader] Cannot start journalctl: {e}")
+            self._proc = None
+            return
+
+        fd = self._proc.stdout.fileno()
+        fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+        logger.info(f"[JournalReader] Following journal ({' '.join(cmd[1:])})")
+
+
+# ROUTING / FORMATTING
+
+def route(record: dict) -> str:
+    """Kaydın hangi parser'a gideceğini yapısal alanlardan belirler."""
+    if record.get("_TRANSPORT") == "kernel":
+        return "ufw" if "[UFW " in record.get("MESSAGE", "") else "kernel"
+
+    ident = record.get("SYSLOG_IDENTIFIER") or record.get("_COMM") or ""
+    if record.get("SYSLOG_FACILITY") in AUTH_FACILITIES or ident in AUTH_IDENTIFIERS:
+        return "auth"
+
+    return "syslog"
+
+
+def to_syslog_line(record: dict) -> str:
+    """
+    Kaydı klasik syslog satırına çevirir; mevcut parser'lar değişmeden çalışır:
+    "Dec  4 12:32:10 host sshd[1234]: message"
+    """
+    try:
+        ts = datetime.fromtimestamp(int(record["__REALTIME_TIMESTAMP"]) / 1_000_000)
+    except (KeyError, ValueError):
+        ts = datetime.now()
+
+    host = record.get("_HOSTNAME", "localhost")
+    message = record.get("MESSAGE", "").replace("\n", " ")
+
+    if record.get("_TRANSPORT") == "kernel":
+        tag = "kernel"
+    else:
+        ident = record.get("SYSLOG_IDENTIFIER") or record.get("_COMM") or "unknown"
+        pid = record.get("SYSLOG_PID") or record.get("_PID")
+        tag = f"{ident}[{pid}]" if pid else ident
+
+    return (
+        f"{MONTH_NAMES[ts.month - 1]} {ts.day:2d} {ts:%H:%M:%S} "
+        f"{host} {tag}: {message}"
+    )
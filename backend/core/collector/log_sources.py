@@ -0,0 +1,120 @@
+# 📁 log_sources.py
+
+# Amaç: hangi log dosyalarının hangi parser ile okunacağını tek yerde tutmak.
+#
+# Varsayılan kaynaklar DEFAULT_SOURCES'ta. Ek kaynaklar /etc/hids/config.json
+# içindeki "log_sources" listesi ile eklenir (aynı isim varsayılanı ezer):
+#
+# {
+#   "log_sources": [
+#     {"name": "nginx", "path": "/var/log/nginx/*.log", "parser": "syslog"},
+#     {"name": "ufw", "enabled": false}
+#   ]
+# }
+#
+# path glob olabilir; eşleşen her dosya ayrı bir kaynak olur
+# (offset anahtarı: "nginx:/var/log/nginx/access.log").
+
+import glob
+import json
+import os
+
+from backend.logger import logger
+
+
+CONFIG_FILE = "/etc/hids/config.json"
+
+DEFAULT_SOURCES = [
+    {"name": "auth", "path": "/var/log/auth.log", "parser": "auth"},
+    {"name": "syslog", "path": "/var/log/syslog", "parser": "syslog"},
+    {"name": "kernel", "path": "/var/log/kern.log", "parser": "kernel"},
+    {"name": "dpkg", "path": "/var/log/dpkg.log", "parser": "dpkg"},
+    {"name": "ufw", "path": "/var/log/ufw.log", "parser": "ufw"},
+    {"name": "audit", "path": "/var/log/audit/audit.log", "parser": "audit"},
+]
+
+
+class LogSourceRegistry:
+    """
+    Kaynak tanımlarını (isim, path/glob, parser) tutar ve diskte gerçekten
+    var olan dosyaları aktif kaynak olarak çözer.
+
+    active: source key → {"name", "path", "parser"}
+    """
+
+    def __init__(self, sources=None, config_file=CONFIG_FILE):
+        self.specs = sources if sources is not None else self._load_specs(config_file)
+        self.active = {}
+        self._missing_warned = set()
+
+        self.refresh()
+
+        logger.info(
+            f"[LogSourceRegistry] {len(self.specs)} source specs, "
+            f"{len(self.active)} active files"
+        )
+
+    # PUBLIC API
+
+    def refresh(self):
+        """
+        Glob'ları yeniden çözer; yeni bulunan kaynakları active'e ekler
+        ve {key: spec} olarak döner.
+        """
+        added = {}
+
+        for spec in self.specs:
+            pattern = spec["path"]
+
+            if glob.has_magic(pattern):
+                paths = sorted(glob.glob(pattern))
+            else:
+                paths = [pattern] if os.path.exists(pattern) else []
+
+            if not paths and spec["name"] not in self._missing_warned:
+                # bir kez uyar; dosya oluşunca (dizin izleme / tam tarama) eklenir
+                logger.warning(f"[LogSourceRegistry] No log file for {spec['name']}: {pattern}")
+                self._missing_warned.add(spec["name"])
+
+            for path in paths:
+                key = f"{spec['name']}:{path}" if glob.has_magic(pattern) else spec["name"]
+                if key not in self.active and os.path.isfile(path):
+                    added[key] = {"name": spec["name"], "path": path, "parser": spec["parser"]}
+                    logger.info(f"[LogSourceRegistry] Source added: {key} → {path} ({spec['parser']})")
+
+        self.active.update(added)
+        return added
+
+    def watch_dirs(self):
+        """Yeni dosyalar için izlenmesi gereken dizinler → [(dizin, glob)]."""
+        return [os.path.split(spec["path"]) for spec in self.specs]
+
+    # INTERNAL HELPERS
+
+    @staticmethod
+    def _load_specs(config_file):
+        specs = {s["name"]: dict(s) for s in DEFAULT_SOURCES}
+
+        try:
+            with open(config_file, "r") as f:
+                configured = json.load(f).get("log_sources", [])
+        except FileNotFoundError:
+            configured = []
+        except (OSError, ValueError, AttributeError) as e:
+            logger.error(f"[LogSourceRegistry] Failed reading {config_file}: {e}")
+            configured = []
+
+        for item in configured:
+            name = item.get("name")
+            if not name:
+                logger.warning(f"[LogSourceRegistry] Source without name ignored: {item}")
+                continue
+
+            spec = {**specs.get(name, {}), **item}
+            if not spec.get("path") or not spec.get("parser"):
+                logger.warning(f"[LogSourceRegistry] Source {name} needs path and parser, ignored")
+                continue
+
+            specs[name] = spec
+
+        return [s for s in specs.values() if s.get("enabled", True)]
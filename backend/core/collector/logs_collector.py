@@ -83,68 +83,445 @@
 
 
 import os
+import time
+from backend.core.collector.inotify_watcher import InotifyWatcher
+from backend.core.collector.journal_reader import JournalReader
+from backend.core.collector.log_sources import LogSourceRegistry
 from backend.core.collector.offsets_manager import OffsetManager
 from backend.logger import logger
 
 
 class LogsCollector:
-    LOG_FILES = {
-        "auth": "/var/log/auth.log",
-        "syslog": "/var/log/syslog",
-        "kernel": "/var/log/kern.log",
-        "dpkg": "/var/log/dpkg.log",
-        "ufw": "/var/log/ufw.log",
-    }
-
-    def __init__(self, state_file="/var/lib/hids/log_offsets.json"):
+    """
+    Kaynaklar LogSourceRegistry'den gelir (varsayılanlar + /etc/hids/config.json).
+    """
+
+    # inotify modunda bile kaçan event'lere karşı periyodik tam tarama
+    FULL_SCAN_INTERVAL = 60
+
+    # Bir döngüde okunacak veri sınırları (outage / burst sonrası catch-up için)
+    MAX_BATCH_LINES = 1000
+    MAX_SOURCE_BYTES = 4 * 1024 * 1024
+    MAX_CYCLE_BYTES = 16 * 1024 * 1024
+
+    # Binary okuma: chunk boyutu ve newline'sız satır için üst sınır
+    CHUNK_SIZE = 256 * 1024
+    MAX_LINE_BYTES = 1024 * 1024
+
+    # Batch satır tipi:
+    #   "str"   → satırlar collector thread'inde decode edilir (varsayılan)
+    #   "bytes" → satırlar read buffer'ından bölünmüş bytes olarak verilir; decode
+    #             parse aşamasında (LineContext) satır başına yapılır. PARSE_WORKERS > 0
+    #             ile decode işi collector thread'inden worker process'lere taşınır.
+    LINE_MODE = "str"
+
+    # systemd journal kaynağı: True / False / "auto"
+    # "auto" → klasik syslog dosyaları yoksa ve journalctl varsa açılır
+    JOURNAL_ENABLED = "auto"
+    JOURNAL_FALLBACK_FILES = ("/var/log/auth.log", "/var/log/syslog")
+
+    def __init__(self, state_file="/var/lib/hids/log_offsets.json", use_inotify=True,
+                 sources=None, journal=None, line_mode=None):
+        self.line_mode = line_mode or self.LINE_MODE
+        if self.line_mode not in ("str", "bytes"):
+            raise ValueError(f"unknown line mode: {self.line_mode}")
+
         self.offset_manager = OffsetManager(state_file)
+        self.registry = LogSourceRegistry(sources)
+        # journal=None → otomatik (JOURNAL_ENABLED), False → kapalı
+        if journal is None:
+            journal = self._create_journal()
+        self.journal = None if journal is False else journal
+        self.watcher = None
+
+        if use_inotify:
+            self.watcher = InotifyWatcher.create(
+                {key: entry["path"] for key, entry in self.registry.active.items()}
+            )
+        if self.watcher:
+            for directory, pattern in self.registry.watch_dirs():
+                self.watcher.watch_pattern(directory, pattern)
+
+        self._last_full_scan = time.time()
+        # bütçe yüzünden yarım kalan kaynaklar
+        self._pending = set()
+        # okuma konumu (bellekte); offset_manager ise commit edilmiş checkpoint'i tutar
+        self._cursors = {}
+        # bu collect() döngüsünde okunan kaynakların döngü başındaki konumu (rewind için)
+        self._cycle_start = {}
         logger.info(f"[LogsCollector] Initialized with state file: {state_file}")
 
-    def collect(self):
+    def collect(self, sources=None):
+        """
+        Generator: reads new lines from the given sources (None → every source)
+        and yields bounded batches:
+            {"source": str, "parser": str, "lines": [str, ...],
+             "checkpoint": {"dev", "ino", "offset"}}
+        (line_mode="bytes" → dosya kaynaklarında lines: [bytes, ...]; journal hep str)
+
+        - Bir batch en fazla MAX_BATCH_LINES satırdır
+        - Bir döngüde kaynak başına MAX_SOURCE_BYTES, toplam MAX_CYCLE_BYTES okunur;
+          kalan veri pending olarak işaretlenir ve bir sonraki döngüde okunur
+        - Okuma konumu, batch downstream'e verildikten sonra (bir sonraki batch
+          istendiğinde) ilerler. Kalıcı offset ise ancak commit(batch) ile ilerler.
+        """
         logger.debug("[LogsCollector] collect() invoked")
-        results = []
+        cycle_budget = self.MAX_CYCLE_BYTES
 
-        for source, path in self.LOG_FILES.items():
-            lines = self._read_file(source, path)
-            if lines:
-                logger.info(f"[LogsCollector] {source}: collected {len(lines)} new lines")
-            results.extend({"source": source, "line": line} for line in lines)
+        # birikmiş checkpoint'leri (SAVE_INTERVAL dolduysa) diske yaz
+        self.offset_manager.save()
+        self._cycle_start = {}
+
+        if sources is None:
+            # tam tarama: glob'ları yeniden çöz, yeni dosyaları ekle
+            self._refresh_sources()
+
+        for source, entry in list(self.registry.active.items()):
+            if sources is not None and source not in sources:
+                continue
+
+            path = entry["path"]
+
+            self._pending.discard(source)
+            if cycle_budget <= 0:
+                self._pending.add(source)
+                continue
+
+            budget = min(self.MAX_SOURCE_BYTES, cycle_budget)
+            total = 0
+            self._cycle_start[source] = self._cursors.get(source)
+
+            for lines, position, nbytes in self._read_file(source, path, budget):
+                yield {
+                    "source": source,
+                    "parser": entry["parser"],
+                    "lines": lines,
+                    "checkpoint": position,
+                }
+
+                # batch downstream tarafından işlendi → okuma konumu ilerleyebilir
+                self._cursors[source] = position
+                budget -= nbytes
+                cycle_budget -= nbytes
+                total += len(lines)
+
+            if budget <= 0:
+                logger.info(f"[LogsCollector] {source}: read budget exhausted, continuing next cycle")
+                self._pending.add(source)
+
+            if total:
+                logger.info(f"[LogsCollector] {source}: collected {total} new lines")
+
+        if self.journal and (sources is None or JournalReader.SOURCE in sources):
+            yield from self._collect_journal(cycle_budget)
+
+    def commit(self, batch):
+        """
+        Batch'teki satırlardan üretilen event'ler kalıcı olarak yazıldıktan
+        sonra çağrılır; kaynağın checkpoint'ini batch sonuna ilerletir.
+        Diske yazma OffsetManager tarafından birleştirilir (coalesced).
+        """
+        position = batch["checkpoint"]
+
+        if "cursor" in position:
+            self.offset_manager.set_cursor(batch["source"], position["cursor"])
+        else:
+            self.offset_manager.set(
+                batch["source"], position["offset"], dev=position["dev"], ino=position["ino"]
+            )
 
         self.offset_manager.save()
-        logger.debug("[LogsCollector] Offsets saved after collection")
 
-        return results
+    def rewind(self, delivered):
+        """
+        Bu döngüde okunup downstream'de işlenmemiş batch'lerin okuma konumunu
+        geri alır (scheduler batch işlerken hata aldığında; ParsePool önden
+        okuduğu için birden çok batch havada kalabilir).
+
+        delivered: source → bu döngüde işlenmiş son batch'in checkpoint'i.
+        Kaynak o konuma, hiç batch'i işlenmediyse döngü başındaki konumuna
+        döner ve bir sonraki turda beklemeden tekrar okunur.
+        """
+        for source, start in self._cycle_start.items():
+            position = delivered.get(source, start)
+
+            if source == JournalReader.SOURCE:
+                if self.journal:
+                    self.journal.seek(position["cursor"] if position else None)
+            elif position is None:
+                self._cursors.pop(source, None)
+            else:
+                self._cursors[source] = position
+
+            self._pending.add(source)
+
+        self._cycle_start = {}
+
+    def flush(self):
+        """Bekleyen checkpoint'leri hemen diske yazar."""
+        self.offset_manager.save(force=True)
+
+    def wait_for_changes(self, timeout):
+        """
+        Blocks until a log source changes or `timeout` expires.
+
+        Returns the set of changed sources, or None when every source
+        should be read (polling fallback / periodic full scan).
+        """
+        if self._pending:
+            # catch-up devam ediyor, beklemeden oku
+            return set(self._pending)
+
+        if self.watcher is None:
+            time.sleep(timeout)
+            return None
+
+        extra_fds = {}
+        if self.journal:
+            fd = self.journal.fileno()
+            if fd is not None:
+                extra_fds[fd] = JournalReader.SOURCE
 
-    # INTERNAL HELPERS
-    def _read_file(self, source, filepath):
-        if not os.path.exists(filepath):
-            logger.warning(f"[LogsCollector] Log file not found: {filepath}")
-            return []
+        try:
+            changed = self.watcher.wait(timeout, extra_fds)
+        except OSError:
+            logger.exception("[LogsCollector] inotify wait failed, switching to polling")
+            self.watcher.close()
+            self.watcher = None
+            return None
 
-        last_offset = self.offset_manager.get(source)
-        file_size = os.path.getsize(filepath)
+        if self.watcher.rescan_needed:
+            self.watcher.rescan_needed = False
+            changed |= set(self._refresh_sources())
 
-        if last_offset > file_size:
-            logger.warning(f"[LogsCollector] Offset reset for {source} (file truncated or rotated)")
-            last_offset = 0
-            self.offset_manager.set(source, 0)
+        now = time.time()
+        if now - self._last_full_scan >= self.FULL_SCAN_INTERVAL:
+            self._last_full_scan = now
+            return None
+
+        return changed
 
-        new_lines = []
+    # INTERNAL HELPERS
+    def _create_journal(self):
+        enabled = self.JOURNAL_ENABLED
+        if enabled == "auto":
+            enabled = (
+                not any(os.path.exists(p) for p in self.JOURNAL_FALLBACK_FILES)
+                and JournalReader.available()
+            )
+
+        if not enabled:
+            return None
+
+        logger.info("[LogsCollector] systemd journal source enabled")
+        return JournalReader(cursor=self.offset_manager.get_cursor(JournalReader.SOURCE))
+
+    def _collect_journal(self, cycle_budget):
+        source = JournalReader.SOURCE
+        self._pending.discard(source)
+        start = self.journal.cursor
+        self._cycle_start[source] = {"cursor": start} if start else None
+
+        budget = min(self.MAX_SOURCE_BYTES, cycle_budget)
+        if budget <= 0:
+            self._pending.add(source)
+            return
+
+        total = 0
+        for parser, lines, checkpoint, nbytes in self.journal.read(budget):
+            yield {"source": source, "parser": parser, "lines": lines, "checkpoint": checkpoint}
+            budget -= nbytes
+            total += len(lines)
+
+        if budget <= 0:
+            self._pending.add(source)
+
+        if total:
+            logger.info(f"[LogsCollector] {source}: collected {total} new records")
+
+    def _refresh_sources(self):
+        added = self.registry.refresh()
+
+        if self.watcher:
+            for key, entry in added.items():
+                self.watcher.watch(key, entry["path"])
+
+        return added
+
+    def _read_file(self, source, filepath, max_bytes):
+        """
+        Generator: (satırlar, position, okunan byte) üçlüleri üretir.
+        position = {"dev", "ino", "offset"} → batch tüketilince kaydedilecek konum.
+        """
+        position = self._cursors.get(source) or self.offset_manager.get_position(source)
+        saved_id = (position["dev"], position["ino"])
 
         try:
-            with open(filepath, "r", errors="ignore") as f:
-                f.seek(last_offset)
-                for line in f:
-                    new_lines.append(line.rstrip("\n"))
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            st = None
 
-                new_offset = f.tell()
-                self.offset_manager.set(source, new_offset)
+        if st is None and position["ino"] is None:
+            logger.warning(f"[LogsCollector] Log file not found: {filepath}")
+            return
+
+        if st is None or (position["ino"] is not None and saved_id != (st.st_dev, st.st_ino)):
+            # ROTATION: önce eski dosyayı kaldığı yerden sonuna kadar oku
+            rotated = self._find_rotated(filepath, *saved_id)
+
+            if rotated:
+                drained = 0
+                for lines, end, nbytes in self._read_from(
+                    source, rotated, position["offset"], max_bytes, final=True
+                ):
+                    yield lines, {"dev": saved_id[0], "ino": saved_id[1], "offset": end}, nbytes
+                    drained += len(lines)
+                    max_bytes -= nbytes
+
+                if drained:
+                    logger.info(
+                        f"[LogsCollector] {source}: drained {drained} lines from rotated file {rotated}"
+                    )
+                if max_bytes <= 0:
+                    # eski dosya bitmedi, bir sonraki döngüde devam
+                    return
+            elif st is not None:
+                logger.warning(
+                    f"[LogsCollector] {source}: rotated file for inode {position['ino']} not found, "
+                    f"unread lines may be lost"
+                )
+
+            if st is None:
+                # yeni dosya henüz oluşmadı (veya dosya silindi), eski inode'da kal
+                return
+
+            logger.info(f"[LogsCollector] {source}: switched to new file (inode {st.st_ino})")
+            self._cursors[source] = {"dev": st.st_dev, "ino": st.st_ino, "offset": 0}
+            last_offset = 0
 
-        except Exception as e:
-            logger.error(f"[LogsCollector] Failed reading {source}: {e}")
-            return []
+        elif position["offset"] > st.st_size:
+            logger.warning(f"[LogsCollector] Offset reset for {source} (file truncated)")
+            last_offset = 0
+
+        else:
+            last_offset = position["offset"]
 
-        if new_lines:
-            logger.debug(f"[LogsCollector] {source}: read {len(new_lines)} new lines")
+        for lines, end, nbytes in self._read_from(source, filepath, last_offset, max_bytes):
+            yield lines, {"dev": st.st_dev, "ino": st.st_ino, "offset": end}, nbytes
 
-        return new_lines
+    def _read_from(self, source, filepath, offset, max_bytes, final=False):
+        """
+        Generator: offset'ten itibaren en fazla max_bytes okur ve
+        (satırlar, batch sonu offset'i, byte) parçaları üretir.
+
+        Dosya CHUNK_SIZE'lık byte chunk'ları halinde okunur, "\n" ile bytes
+        seviyesinde bölünür ve sadece tamamlanmış satırlar decode edilir.
+        Sondaki yarım satır verilmez: offset onun başında kalır, bir sonraki
+        okumada tamamlanmış haliyle gelir. final=True ise (rotate edilmiş,
+        artık büyümeyecek dosya) dosya sonundaki yarım satır da verilir.
+        """
+        try:
+            f = open(filepath, "rb", buffering=0)
+        except OSError as e:
+            logger.error(f"[LogsCollector] Failed reading {source}: {e}")
+            return
+
+        with f:
+            f.seek(offset)
+            carry = b""
+
+            while max_bytes > 0:
+                try:
+                    chunk = f.read(self.CHUNK_SIZE)
+                except OSError as e:
+                    logger.error(f"[LogsCollector] Failed reading {source}: {e}")
+                    return
+
+                if not chunk:
+                    break
+
+                buf = carry + chunk if carry else chunk
+                cut = buf.rfind(b"\n") + 1
+                carry = buf[cut:]
+
+                if cut:
+                    for lines, nbytes in self._split_lines(buf, cut - 1):
+                        offset += nbytes
+                        max_bytes -= nbytes
+                        yield lines, offset, nbytes
+                        if max_bytes <= 0:
+                            return
+
+                if len(carry) >= self.MAX_LINE_BYTES:
+                    logger.warning(f"[LogsCollector] {source}: line exceeds {self.MAX_LINE_BYTES} bytes, emitting as is")
+                    offset += len(carry)
+                    max_bytes -= len(carry)
+                    yield [self._decode(carry)], offset, len(carry)
+                    carry = b""
+
+            if final and carry and max_bytes > 0:
+                offset += len(carry)
+                yield [self._decode(carry)], offset, len(carry)
+
+    def _decode(self, data: bytes):
+        if self.line_mode == "bytes":
+            return data
+        return data.decode("utf-8", errors="ignore")
+
+    def _split_lines(self, buf, end):
+        """
+        buf[:end] (son newline hariç) → MAX_BATCH_LINES'lık (satırlar, byte) grupları.
+
+        - bytes modu: satırlar bytes olarak kalır (tek split, decode yok)
+        - ASCII buffer (log'ların neredeyse tamamı): tek decode + str split;
+          karakter sayısı = byte sayısı olduğu için grup byte'ı str'den hesaplanır
+        - diğerleri: her grup tek seferde decode edilir (geçersiz UTF-8 atlanır)
+        """
+        step = self.MAX_BATCH_LINES
+
+        if self.line_mode == "bytes":
+            parts = buf[:end].split(b"\n")
+        elif buf.isascii():
+            parts = buf[:end].decode("ascii").split("\n")
+        else:
+            parts = buf[:end].split(b"\n")
+            for i in range(0, len(parts), step):
+                group = parts[i:i + step]
+                nbytes = sum(map(len, group)) + len(group)
+                lines = b"\n".join(group).decode("utf-8", errors="ignore").split("\n")
+                yield lines, nbytes
+            return
+
+        for i in range(0, len(parts), step):
+            group = parts[i:i + step]
+            yield group, sum(map(len, group)) + len(group)
+
+    @staticmethod
+    def _find_rotated(filepath, dev, ino):
+        """
+        Rotate edilmiş dosyayı inode ile bulur (auth.log.1, auth.log-20240101 ...).
+        Sıkıştırılmış arşivler atlanır; logrotate delaycompress ile .1'i açık bırakır.
+        """
+        if ino is None:
+            return None
+
+        directory, name = os.path.split(filepath)
+        candidates = [f"{filepath}.1"]
+        try:
+            candidates += sorted(
+                os.path.join(directory, f)
+                for f in os.listdir(directory)
+                if f.startswith(name) and f != name and not f.endswith(".gz")
+            )
+        except OSError:
+            pass
+
+        for candidate in candidates:
+            try:
+                st = os.stat(candidate)
+            except OSError:
+                continue
+            if st.st_ino == ino and (dev is None or st.st_dev == dev):
+                return candidate
+
+        return None
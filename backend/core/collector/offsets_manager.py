@@ -1,17 +1,32 @@
     # """
     # Her log dosyası için son okunan byte offset'ini saklayan sınıf.
     # offsetler JSON dosyasında tutulur (ör: /var/lib/hids/log_offsets.json)
+    #
+    # Her kaynak için (device, inode, offset) saklanır:
+    # {"auth": {"dev": 2049, "ino": 1835021, "offset": 4096}, ...}
+    # Böylece logrotate sonrası hangi dosyanın okunduğu bilinir.
+    #
+    # Buradaki offset'ler "checkpoint"tir: sadece o aralıktaki event'ler
+    # DB'ye commit edildikten sonra ilerletilir (bkz. LogsCollector.commit).
     # """
 
 import os
 import json
+import time
 from threading import Lock
 
+from backend.core.utils.file_utils import atomic_write_json
+
 
 class OffsetManager:
+    # Diske yazma en fazla bu sıklıkta yapılır (checkpoint'ler birleştirilir)
+    SAVE_INTERVAL = 5
+
     def __init__(self, state_file):
         self.state_file = state_file
         self._lock = Lock()  
+        self._dirty = False
+        self._last_save = 0.0
 
         self._ensure_file_exists()
 
@@ -26,8 +41,7 @@ class OffsetManager:
             os.makedirs(directory, exist_ok=True)
 
         if not os.path.exists(self.state_file):
-            with open(self.state_file, "w") as f:
-                json.dump({}, f)
+            atomic_write_json(self.state_file, {})
 
     def _load(self):
         """JSON dosyasını okuyup dict olarak döner."""
@@ -39,28 +53,63 @@ class OffsetManager:
             return {}
 
     def _save(self):
-        """Güncel offsetleri dosyaya atomic şekilde yazar."""
-        with open(self.state_file, "w") as f:
-            json.dump(self.offsets, f, indent=4)
+        """Güncel offsetleri dosyaya atomic şekilde yazar (temp → fsync → rename)."""
+        atomic_write_json(self.state_file, self.offsets)
+        self._dirty = False
+        self._last_save = time.monotonic()
 
     def get(self, key):
         """Bir log dosyası için offset’i döner. Yoksa 0 döner."""
-        return self.offsets.get(key, 0)
+        return self.get_position(key)["offset"]
+
+    def get_position(self, key):
+        """
+        (dev, ino, offset) döner. Eski formatta (sadece int) kaydedilmiş
+        offset'ler için dev/ino None olur.
+        """
+        value = self.offsets.get(key, 0)
+        if isinstance(value, dict):
+            return {
+                "dev": value.get("dev"),
+                "ino": value.get("ino"),
+                "offset": int(value.get("offset", 0)),
+            }
+        return {"dev": None, "ino": None, "offset": int(value)}
+
+    def set(self, key, value, dev=None, ino=None):
+        """Offset (ve dosya kimliğini) günceller (ancak kaydetmez)."""
+        with self._lock:
+            self.offsets[key] = {"dev": dev, "ino": ino, "offset": int(value)}
+            self._dirty = True
+
+    def get_cursor(self, key):
+        """Cursor tabanlı kaynaklar (journal) için son checkpoint. Yoksa None."""
+        value = self.offsets.get(key)
+        return value.get("cursor") if isinstance(value, dict) else None
 
-    def set(self, key, value):
-        """Offset günceller (ancak kaydetmez)."""
+    def set_cursor(self, key, cursor):
+        """Cursor checkpoint'ini günceller (ancak kaydetmez)."""
         with self._lock:
-            self.offsets[key] = int(value)
+            self.offsets[key] = {"cursor": cursor}
+            self._dirty = True
 
-    def save(self):
-        """Offsetleri disk’e yazar (atomic)."""
+    def save(self, force=False):
+        """
+        Offsetleri disk’e yazar (atomic).
+        Değişiklik yoksa veya son yazmadan bu yana SAVE_INTERVAL geçmediyse
+        yazmaz; force=True her durumda yazar.
+        """
         with self._lock:
+            if not self._dirty:
+                return
+            if not force and time.monotonic() - self._last_save < self.SAVE_INTERVAL:
+                return
             self._save()
 
     def reset(self, key):
         """Bir dosya için offset’i sıfırlar."""
         with self._lock:
-            self.offsets[key] = 0
+            self.offsets.pop(key, None)
             self._save()
 
     def reset_all(self):
@@ -57,6 +57,11 @@ class EventDispatcher:
         elif etype == "METRIC_SNAPSHOT":
             self._handle_metric(event)
 
+        # restart sonrası tekrar okunan log satırı: DB'ye yazılır, rule'lar
+        # snapshot'tan geri yüklenen context'te onu zaten saymıştı
+        if event.get("replayed"):
+            return event
+
         # -------------------------
         # RULE ENGINE
         # -------------------------
@@ -83,6 +88,18 @@ class EventDispatcher:
 
         return event
 
+    def checkpoint(self, callback):
+        """
+        callback'i, bu noktaya kadar kuyruğa alınmış tüm event'ler DBWriter
+        tarafından commit edildikten sonra çağırır (DBWriter tek thread, FIFO).
+        Log offset checkpoint'leri bu sayede event'lerden önce ilerlemez.
+        """
+        if services.db_writer is None:
+            callback()
+            return
+
+        services.db_writer.enqueue({"type": "CHECKPOINT", "callback": callback})
+
     # -------------------------
     # HANDLERS
     # -------------------------
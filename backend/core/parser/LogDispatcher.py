@@ -11,12 +11,11 @@ Görevleri:
 7) Hata durumunda sistemi asla çökertmez.
 """
 
-from backend.core.parser.auth_parser import AuthParser
-from backend.core.parser.dpkg_parser import DpkgParser
-from backend.core.parser.kernel_parser import KernelParser
-from backend.core.parser.sys_parser import SysParser
-from backend.core.parser.ufw_parser import UfwParser
+import importlib
+import time
 
+from backend.core.parser.line_collapser import apply_repeat
+from backend.core.parser.line_context import LineContext
 from backend.core.storage import services
 
 from backend.logger import logger
@@ -24,39 +23,167 @@ from backend.logger import logger
 
 class LogDispatcher:
 
+    # parser adı → "modül:Sınıf". Parser'lar ilk kullanıldıklarında (yani o
+    # parser'a bağlı bir log dosyası gerçekten varsa) yüklenir.
+    PARSERS = {
+        "audit": "backend.core.parser.audit_parser:AuditParser",
+        "auth": "backend.core.parser.auth_parser:AuthParser",
+        "dpkg": "backend.core.parser.dpkg_parser:DpkgParser",
+        "kernel": "backend.core.parser.kernel_parser:KernelParser",
+        "syslog": "backend.core.parser.sys_parser:SysParser",
+        "ufw": "backend.core.parser.ufw_parser:UfwParser",
+    }
+
     def __init__(self):
-        self.parsers = {
-            "auth": AuthParser(),
-            "dpkg": DpkgParser(),
-            "kernel": KernelParser(),
-            "syslog": SysParser(),
-            "ufw": UfwParser(),
-        }
+        self.parsers = {}
+        self._unknown = set()
+
+    def get_parser(self, name: str):
+        """
+        Parser'ı lazy olarak oluşturur. İsim PARSERS'ta yoksa
+        "modül:Sınıf" formatında bir path olarak denenir (config'ten eklenen parser'lar).
+        """
+        parser = self.parsers.get(name)
+        if parser is not None:
+            return parser
+
+        if name in self._unknown:
+            return None
+
+        target = self.PARSERS.get(name, name)
+
+        try:
+            module_name, class_name = target.split(":")
+            parser = getattr(importlib.import_module(module_name), class_name)()
+        except (ValueError, ImportError, AttributeError) as e:
+            logger.error(f"[LogDispatcher] Unknown parser '{name}': {e}")
+            self._unknown.add(name)
+            return None
+
+        logger.info(f"[LogDispatcher] Loaded parser '{name}' ({target})")
+        self.parsers[name] = parser
+        return parser
+
+    def is_stateful(self, name: str) -> bool:
+        """
+        Parser satırlar arası durum tutuyor mu (ör: auditd kayıt birleştirme)?
+        Böyle parser'ların satırları sırayla aynı nesneden geçmeli (worker'a dağıtılamaz).
+        """
+        return bool(getattr(self.get_parser(name), "STATEFUL", False))
+
+    def flush(self, name: str) -> list:
+        """Stateful parser'ın bekleyen kayıtlarını event olarak döner (arşiv sonu / kapanış)."""
+        parser = self.parsers.get(name)
+        flush = getattr(parser, "flush", None)
+        return flush() if flush else []
+
+    def expire(self) -> list:
+        """Yüklü stateful parser'ların zaman aşımına uğrayan kayıtları (scheduler her turda çağırır)."""
+        events = []
+        for parser in list(self.parsers.values()):
+            expire = getattr(parser, "expire", None)
+            if expire is not None:
+                events.extend(expire())
+        return events
 
     # MAIN
 
     def dispatch(self, source: str, line: str):
         """
+        source: parser adı (auth, syslog ... veya config'teki parser)
+
         1) Doğru parser’ı bul
         2) Satırı parse et
         3) Event’i DB’ye kaydet
         4) Rule engine’e döndür
         """
         
-        parser = self.parsers.get(source)
+        parser = self.get_parser(source)
         if not parser:
             return None
 
-        if not parser.match(line):
+        ctx = LineContext(line)
+        if not parser.match(ctx):
             return None
 
         try:
-            event = parser.parse(line)
+            event = parser.parse(ctx)
 
             # self.save_to_db(event) # we dont save it in here anymore, instead in the eventparser
 
             return event
 
         except Exception as e:
+            logger.debug(f"[LogDispatcher] {source} line failed to parse: {e!r}")
             return None
 
+    def dispatch_batch(self, source: str, lines, repeats=None) -> dict:
+        """
+        Aynı kaynaktan gelen satır listesini tek seferde parse eder.
+        Parser bir kez çözülür; match / parse döngü boyunca yerel referanstır.
+
+        repeats: LineCollapser çıktısı {satır index: [adet, first, last]}
+
+        → {
+            "events": [...],  (stateful parser'da satır sayısıyla birebir değil)
+            "skipped": eşleşmeyen satır sayısı, "failed": parse hatası sayısı,
+            "unmatched": [eşleşmeyen satır index'leri],
+            "errors": [(satır index'i, hata)],
+            "elapsed": parse süresi (sn)
+          }
+        index'ler ParseTelemetry örneklemesi için (satırın kendisi çağıranda zaten var).
+        """
+        started = time.perf_counter()
+        result = {"events": [], "skipped": 0, "failed": 0, "unmatched": [], "errors": [], "elapsed": 0.0}
+
+        parser = self.get_parser(source)
+        if not parser:
+            result["skipped"] = len(lines)
+            result["unmatched"] = list(range(len(lines)))
+            return result
+
+        match = parser.match
+        parse = parser.parse
+        events = result["events"]
+
+        # stateful parser'da event'ler satır index'ine karşılık gelmez
+        if getattr(parser, "STATEFUL", False):
+            repeats = None
+        unmatched = result["unmatched"]
+        errors = result["errors"]
+
+        for i, line in enumerate(lines):
+            # strip / lower / header match() ve parse() arasında paylaşılır
+            ctx = LineContext(line)
+            if not match(ctx):
+                unmatched.append(i)
+                continue
+
+            try:
+                event = parse(ctx)
+            except Exception as e:
+                errors.append((i, repr(e)))
+                continue
+
+            # stateful parser: kayıt henüz tamamlanmadı
+            if event is None:
+                continue
+
+            if repeats and i in repeats:
+                apply_repeat(event, repeats[i])
+            events.append(event)
+
+        # stateful parser'ın bu batch sırasında süresi dolan kayıtları
+        drain = getattr(parser, "drain", None)
+        if drain is not None:
+            events.extend(drain())
+
+        if errors:
+            logger.warning(
+                f"[LogDispatcher] {len(errors)} {source} lines failed to parse (first error: {errors[0][1]})"
+            )
+
+        result["skipped"] = len(unmatched)
+        result["failed"] = len(errors)
+        result["elapsed"] = time.perf_counter() - started
+        return result
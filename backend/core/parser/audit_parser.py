@@ -0,0 +1,395 @@
+# 📁 audit_parser.py
+
+# Girdi: /var/log/audit/audit.log (auditd) satırları
+#
+# Kernel bir syscall'ı birden fazla kayıt olarak yazar; hepsi aynı
+# msg=audit(zaman:serial) kimliğini taşır:
+#
+#   type=SYSCALL msg=audit(1700000000.123:4711): ... ppid=812 pid=9001 auid=1000 uid=0 ... comm="cat" exe="/usr/bin/cat" key="identity"
+#   type=EXECVE msg=audit(1700000000.123:4711): argc=2 a0="cat" a1=2F6574632F736861646F77
+#   type=CWD msg=audit(1700000000.123:4711): cwd="/root"
+#   type=PATH msg=audit(1700000000.123:4711): item=0 name="/etc/shadow" inode=... nametype=NORMAL
+#   type=PROCTITLE msg=audit(1700000000.123:4711): proctitle=636174002F6574632F736861646F77
+#
+# Bu parser kayıtları serial'e göre biriktirir ve PROCTITLE (veya EOE)
+# geldiğinde tek bir event üretir:
+#
+# {
+#   "type": "PROCESS_EXEC" / "PROCESS_FILE_ACCESS",
+#   "pid": 9001, "ppid": 812, "process_name": "cat", "parent_name": "bash",
+#   "exe": "/usr/bin/cat", "cmdline": ["cat", "/etc/shadow"],
+#   "paths": ["/etc/shadow"], "cwd": "/root", "username": "root", ...
+# }
+#
+# - Boşluk / özel karakter içeren argümanlar auditd tarafından hex yazılır → çözülür
+# - Tamamlanmamış kayıtlar sınırlı bir tamponda tutulur; audit saatine göre
+#   MAX_AGE'den eski veya MAX_PENDING'i aşan kayıtlar eldeki parçalarla yayınlanır.
+#   Yeni satır gelmezse scheduler her turda expire() çağırır: MAX_AGE boyunca
+#   (duvar saati) audit satırı gelmediyse bekleyen kayıtlar yayınlanır
+# - Tek satırlık (user-space) kayıtlar (USER_LOGIN, USER_AUTH, ADD_USER ...)
+#   doğrudan LOG_EVENT olur
+#
+# Parser durum tutar (STATEFUL): aynı kaynağın satırları sırayla aynı parser
+# nesnesinden geçmeli → ParsePool audit batch'lerini inline parse eder.
+
+import json
+import os
+import pwd
+import time
+from datetime import datetime
+from functools import lru_cache
+
+from backend.core.parser.line_context import LineContext
+from backend.core.utils.regex_patterns import (
+    AUDIT_HEADER,
+    AUDIT_SYSCALL,
+    AUDIT_EXECVE_ARG,
+    AUDIT_PATH,
+    AUDIT_CWD,
+    AUDIT_PROCTITLE,
+    AUDIT_FIELD,
+)
+
+# auid atanmamış (login oturumu yok) → (uint32)-1
+UNSET_ID = "4294967295"
+
+
+@lru_cache(maxsize=1024)
+def _username(uid):
+    if uid is None or uid == UNSET_ID:
+        return None
+    try:
+        return pwd.getpwuid(int(uid)).pw_name
+    except (KeyError, ValueError):
+        return uid
+
+
+def decode_value(value):
+    """
+    auditd alan değeri → str
+    "..." → tırnaksız metin, (null) / ? → None, diğerleri hex (a1=2F6574...).
+    """
+    if not value:
+        return None
+    if value[0] == '"':
+        return value[1:-1]
+    if value[0] == "'":
+        return value[1:-1]
+    if value == "(null)" or value == "?":
+        return None
+
+    try:
+        return bytes.fromhex(value).decode("utf-8", "replace")
+    except ValueError:
+        return value
+
+
+class AuditRecord:
+
+    __slots__ = (
+        "serial", "ts", "lines", "syscall", "args", "paths", "cwd", "proctitle", "extra",
+    )
+
+    def __init__(self, serial, ts):
+        self.serial = serial
+        self.ts = ts
+        self.lines = []
+        self.syscall = None   # AUDIT_SYSCALL grupları
+        self.args = None      # EXECVE: index → [ham parça, ...]
+        self.paths = []
+        self.cwd = None
+        self.proctitle = None
+        self.extra = []       # SOCKADDR, AVC ... kayıt tipleri
+
+
+class AuditParser:
+    """
+    auditd kayıtlarını serial'e göre birleştirip process event'i üretir.
+    SensitiveFileAccessRule / SuspiciousShellRule bu event'lerde cmdline
+    tahmini yerine gerçek argv ve dokunulan path'leri görür.
+    """
+
+    STATEFUL = True
+
+    # aynı anda tamamlanmayı bekleyen kayıt sınırı (aşılırsa en eski yayınlanır)
+    MAX_PENDING = 4096
+
+    # audit saatine göre bu kadar sn'dir tamamlanmayan kayıt yayınlanır
+    MAX_AGE = 2.0
+
+    # parent_name için pid → process adı önbelleği
+    MAX_PIDS = 8192
+
+    # event raw alanında tutulan satır sayısı
+    MAX_RAW_LINES = 16
+
+    # aynı serial altında birleşen kayıt tipleri; diğerleri tek satırlık kayıttır
+    AUX_TYPES = frozenset((
+        "SYSCALL", "EXECVE", "PATH", "CWD", "PROCTITLE", "EOE",
+        "SOCKADDR", "AVC", "BPRM_FCAPS", "MMAP", "FD_PAIR", "OBJ_PID",
+        "CAPSET", "IPC", "MQ_OPEN", "NETFILTER_CFG", "SECCOMP",
+    ))
+
+    # bu tiplerden sonra aynı serial'e kayıt gelmez
+    TERMINATORS = ("PROCTITLE", "EOE")
+
+    # PROCTITLE'dan sonra gelen EOE yeni kayıt açmasın diye hatırlanan
+    # yayınlanmış serial sayısı
+    MAX_COMPLETED = 1024
+
+    def __init__(self):
+        self._pending = {}   # serial → AuditRecord (geliş sırasıyla)
+        self._completed = {}  # yakın zamanda yayınlanan serial'ler (ekleme sırasıyla)
+        self._ready = []     # süresi dolup yayınlanan event'ler (drain ile alınır)
+        self._names = {}     # pid → process adı
+        self._latest = 0.0   # görülen en yeni audit zamanı
+        self._touched = 0.0  # son kayıt parçasının geldiği an (monotonic)
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def match(self, line) -> bool:
+        if not line:
+            return False
+
+        text = line.text if isinstance(line, LineContext) else line
+        return "msg=audit(" in text and (text.startswith("type=") or text.startswith("node="))
+
+    def parse(self, line):
+        """
+        Kayıt tamamlandıysa event döner; parçası beklenen kayıt için None.
+        Süresi dolan kayıtlar drain() ile alınır.
+        """
+        text = line.text if isinstance(line, LineContext) else line.strip()
+
+        m = AUDIT_HEADER.match(text)
+        if m is None:
+            raise ValueError("missing audit header")
+
+        record_type, sec, msec, serial = m.groups()
+        ts = int(sec) + int(msec) / 1000
+        body = text[m.end():]
+
+        if record_type not in self.AUX_TYPES:
+            return self._standalone(record_type, ts, body, text)
+
+        serial = int(serial)
+        record = self._pending.get(serial)
+        if record is None:
+            if record_type == "EOE" and serial in self._completed:
+                # PROCTITLE ile zaten yayınlandı; geç gelen EOE boş kayıt açmasın
+                return None
+            record = self._pending[serial] = AuditRecord(serial, ts)
+            if len(self._pending) > self.MAX_PENDING:
+                self._ready.append(self._finish(next(iter(self._pending))))
+
+        self._touched = time.monotonic()
+        if len(record.lines) < self.MAX_RAW_LINES:
+            record.lines.append(text)
+
+        if record_type == "SYSCALL":
+            record.syscall = AUDIT_SYSCALL.search(body)
+        elif record_type == "EXECVE":
+            args = record.args = record.args or {}
+            for index, chunk in AUDIT_EXECVE_ARG.findall(body):
+                args.setdefault(int(index), []).append(chunk)
+        elif record_type == "PATH":
+            pm = AUDIT_PATH.search(body)
+            if pm and pm.group(3) != "PARENT":
+                name = decode_value(pm.group(2))
+                if name:
+                    record.paths.append(name)
+        elif record_type == "CWD":
+            cm = AUDIT_CWD.search(body)
+            record.cwd = decode_value(cm.group(1)) if cm else None
+        elif record_type == "PROCTITLE":
+            tm = AUDIT_PROCTITLE.search(body)
+            if tm:
+                record.proctitle = decode_value(tm.group(1))
+        elif record_type != "EOE":
+            record.extra.append(record_type)
+
+        if ts > self._latest:
+            self._latest = ts
+            self._expire(ts - self.MAX_AGE)
+
+        if record_type in self.TERMINATORS:
+            return self._finish(serial)
+
+        return None
+
+    def drain(self) -> list:
+        """parse() sırasında süresi dolup yayınlanan event'ler."""
+        ready, self._ready = self._ready, []
+        return ready
+
+    def expire(self, now=None) -> list:
+        """
+        Yeni satır gelmeden bekleyen kayıtlar (scheduler her turda çağırır):
+        MAX_AGE sn'dir hiç kayıt parçası gelmediyse hepsi yayınlanır.
+        Audit saatine bakılmaz; catch-up sırasında kayıtlar bölünmesin.
+        """
+        now = now or time.monotonic()
+        if self._pending and now - self._touched > self.MAX_AGE:
+            for serial in list(self._pending):
+                self._ready.append(self._finish(serial))
+        return self.drain()
+
+    def flush(self) -> list:
+        """Bekleyen tüm kayıtları eldeki parçalarla yayınlar (arşiv sonu / kapanış)."""
+        for serial in list(self._pending):
+            self._ready.append(self._finish(serial))
+        return self.drain()
+
+    # ---------------------------
+    # INTERNAL HELPERS
+    # ---------------------------
+
+    def _expire(self, limit):
+        # _pending geliş sırasında → ilk genç kayıtta dur
+        while self._pending:
+            serial = next(iter(self._pending))
+            if self._pending[serial].ts >= limit:
+                break
+            self._ready.append(self._finish(serial))
+
+    def _finish(self, serial) -> dict:
+        """Bekleyen kaydı yayınlar ve serial'ini tamamlananlara ekler."""
+        completed = self._completed
+        if len(completed) >= self.MAX_COMPLETED:
+            del completed[next(iter(completed))]
+        completed[serial] = None
+
+        return self._build(self._pending.pop(serial))
+
+    def _remember(self, pid, name):
+        names = self._names
+        if pid in names:
+            del names[pid]
+        elif len(names) >= self.MAX_PIDS:
+            del names[next(iter(names))]
+        names[pid] = name
+
+    def _build(self, record: AuditRecord) -> dict:
+        sc = record.syscall
+        argv = None
+
+        if record.args:
+            argv = []
+            for index in sorted(record.args):
+                chunks = record.args[index]
+                value = decode_value(chunks[0] if chunks[0][0] == '"' else "".join(chunks))
+                argv.append(value or "")
+        elif record.proctitle:
+            argv = record.proctitle.split("\0")
+
+        if sc is None:
+            # SYSCALL satırı kaybolmuş (ör: rotate sınırı) → elde ne varsa
+            return self._log_event(
+                "AUDIT_RECORD", record.ts, record, "LOW",
+                f"audit({record.serial}) {' '.join(argv or record.paths)}",
+                extra={"paths": record.paths, "cmdline": argv, "cwd": record.cwd},
+            )
+
+        syscall, success, exit_code, ppid, pid, auid, uid, euid, ses, comm, exe, key = sc.groups()
+        pid = int(pid)
+        ppid = int(ppid)
+        comm = decode_value(comm)
+        exe = decode_value(exe)
+        key = decode_value(key)
+        name = os.path.basename(exe) if exe else comm
+
+        self._remember(pid, name)
+
+        # PATH kayıtları göreli olabilir (openat(AT_FDCWD, "shadow")) → cwd ile tamamla
+        paths = record.paths
+        if record.cwd:
+            paths = [
+                p if p[0] == "/" else os.path.normpath(os.path.join(record.cwd, p))
+                for p in paths
+            ]
+
+        if argv is None and not record.paths:
+            return self._log_event(
+                "AUDIT_SYSCALL", record.ts, record,
+                "MEDIUM" if success == "no" else "LOW",
+                f"{name}[{pid}] syscall={syscall} success={success} key={key}",
+                user=_username(auid) or _username(uid), process=name, pid=pid,
+                extra={"syscall": syscall, "exit": exit_code, "exe": exe, "key": key,
+                       "ppid": ppid, "records": record.extra},
+            )
+
+        return {
+            "type": "PROCESS_EXEC" if record.args else "PROCESS_FILE_ACCESS",
+            "timestamp": datetime.fromtimestamp(record.ts),
+            "source": "auditd",
+            "serial": record.serial,
+
+            "pid": pid,
+            "ppid": ppid,
+            "name": name,
+            "process_name": name,
+            "comm": comm,
+            "exe": exe,
+            "cmdline": argv,
+            "cwd": record.cwd,
+            "paths": paths,
+            "parent_name": self._names.get(ppid),
+
+            "username": _username(euid),
+            "login_user": _username(auid),
+            "uid": int(uid),
+            "euid": int(euid),
+            "session": None if ses == UNSET_ID else int(ses),
+
+            "syscall": syscall,
+            "success": success == "yes" if success else None,
+            "exit": exit_code,
+            "key": key,
+            "records": record.extra,
+            "raw": "\n".join(record.lines),
+        }
+
+    def _standalone(self, record_type, ts, body, text) -> dict:
+        fields = dict(AUDIT_FIELD.findall(body))
+
+        # user-space kayıtları asıl alanları msg='...' içinde taşır
+        inner = fields.pop("msg", None)
+        if inner and inner[0] == "'":
+            fields.update(AUDIT_FIELD.findall(inner[1:-1]))
+
+        exe = decode_value(fields.get("exe"))
+        res = fields.get("res")
+        addr = decode_value(fields.get("addr"))
+        pid = fields.get("pid")
+
+        return self._log_event(
+            f"AUDIT_{record_type}", ts, None,
+            "MEDIUM" if res in ("failed", "0") else "LOW",
+            text,
+            user=decode_value(fields.get("acct")) or _username(fields.get("auid")),
+            ip=addr,
+            process=os.path.basename(exe) if exe else None,
+            pid=int(pid) if pid and pid.isdigit() else None,
+            extra={k: decode_value(v) if v[:1] in "\"'" else v for k, v in fields.items()},
+            raw=text,
+        )
+
+    def _log_event(self, event_type, ts, record, severity, message,
+                   user=None, ip=None, process=None, pid=None, extra=None, raw=None) -> dict:
+        return {
+            "event_type": event_type,
+            "log_source": "audit",
+            "category": "AUDIT",
+            "severity": severity,
+            "timestamp": datetime.fromtimestamp(ts),
+            "raw": raw if raw is not None else "\n".join(record.lines),
+
+            "user": user,
+            "ip": ip,
+            "pid": pid,
+            "process": process,
+            "message": message,
+            "extra_data": json.dumps({"audit": extra}) if extra else None,
+        }
@@ -18,12 +18,15 @@
 
 from datetime import datetime
 from backend.core.utils.timestamp import parse_timestamp
+from backend.core.parser.prefilter import Prefilter
+from backend.core.parser.line_context import LineContext
 
 from backend.core.utils.regex_patterns import (
     AUTH_PID,
     AUTH_IP,
     AUTH_USER,
     AUTH_TIMESTAMP,
+    AUTH_PREFILTER,
 )
 
 class AuthParser:
@@ -38,32 +41,33 @@ class AuthParser:
         "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12
     }
 
+    def __init__(self):
+        self.prefilter = Prefilter(AUTH_PREFILTER, ignore_case=True)
+
     # ---------------------------
     # Public API
     # ---------------------------
 
-    def match(self, line: str) -> bool:
-        """Bu satır auth.log formatına uyuyor mu?"""
+    def match(self, line) -> bool:
+        """Bu satır auth.log formatına uyuyor mu? (str veya LineContext)"""
 
         if not line:
             return False
 
-        # SSH veya sudo contains -> auth satir
-        keywords = [
-            "sshd", "sudo", "authentication failure",
-            "Failed password", "Accepted password",
-            "session opened", "session closed"
-        ]
+        ctx = line if isinstance(line, LineContext) else LineContext(line)
+
+        # SSH / sudo / PAM anahtar kelimelerinden biri → auth satırı
+        return self.prefilter.classify(ctx.text, ctx) is not None
 
-        return any(k in line for k in keywords)
+    def parse(self, line) -> dict:
+        ctx = line if isinstance(line, LineContext) else LineContext(line)
 
-    def parse(self, line: str) -> dict:
-        ts = self.extract_timestamp(line)
-        event_type = self.detect_event_type(line)
-        user = self.extract_user(line)
-        ip = self.extract_ip(line)
-        method = self.extract_method(line)
-        pid = self.extract_pid(line)
+        ts = self.extract_timestamp(ctx)
+        event_type = self.detect_event_type(ctx)
+        user = self.extract_user(ctx)
+        ip = self.extract_ip(ctx)
+        method = self.extract_method(ctx)
+        pid = self.extract_pid(ctx)
 
         severity = self.estimate_severity(event_type, user)
 
@@ -73,32 +77,36 @@ class AuthParser:
             "category": "AUTH",
             "severity": severity,
             "timestamp": ts,
-            "raw": line.strip(),
+            "raw": ctx.text,
 
             "user": user,
             "ip": ip,
             "method": method,
             "pid": pid,
-            "message": line.strip(),
+            "process": ctx.program,
+            "message": ctx.text,
         }
 
     # ---------------------------
-    # INTERNAL HELPERS
+    # INTERNAL HELPERS (LineContext alır)
     # ---------------------------
 
-    def extract_timestamp(self, line):
-        return parse_timestamp(line)
+    def extract_timestamp(self, ctx: LineContext):
+        return parse_timestamp(ctx.text)
 
-    def extract_pid(self, line: str):
-        m = AUTH_PID.search(line)
+    def extract_pid(self, ctx: LineContext):
+        # header'daki sshd[1234]; header yoksa satırdaki ilk [pid]
+        if ctx.pid is not None:
+            return ctx.pid
+        m = AUTH_PID.search(ctx.text)
         return int(m.group(1)) if m else None
 
-    def extract_ip(self, line: str):
-        m = AUTH_IP.search(line)
+    def extract_ip(self, ctx: LineContext):
+        m = AUTH_IP.search(ctx.body)
         return m.group(1) if m else None
 
-    def extract_user(self, line: str):
-        m = AUTH_USER.search(line)
+    def extract_user(self, ctx: LineContext):
+        m = AUTH_USER.search(ctx.body)
         if not m:
             return None
 
@@ -109,14 +117,14 @@ class AuthParser:
 
         return user
 
-    def extract_method(self, line: str):
-        line_lower = line.lower()
+    def extract_method(self, ctx: LineContext):
+        lower = ctx.lower
 
-        if "password" in line_lower:
+        if "password" in lower:
             return "password"
-        if "publickey" in line_lower:
+        if "publickey" in lower:
             return "publickey"
-        if "keyboard-interactive" in line_lower:
+        if "keyboard-interactive" in lower:
             return "keyboard-interactive"
         return None
 
@@ -124,34 +132,9 @@ class AuthParser:
     # EVENT TYPE DETECTION
     # ---------------------------
 
-    def detect_event_type(self, line: str):
-        l = line.lower()
-
-        if "failed password" in l:
-            return "FAILED_LOGIN"
-
-        if "accepted password" in l or "accepted publickey" in l:
-            return "SUCCESS_LOGIN"
-
-        if "authentication failure" in l:
-            return "FAILED_AUTH"
-
-        if "sudo:" in l and "authentication failure" in l:
-            return "SUDO_FAILED"
-
-        if "sudo:" in l and "session opened" in l:
-            return "SUDO_SESSION_OPEN"
-
-        if "sudo:" in l and "session closed" in l:
-            return "SUDO_SESSION_CLOSE"
-
-        if "session opened" in l:
-            return "SESSION_OPEN"
-
-        if "session closed" in l:
-            return "SESSION_CLOSE"
-
-        return "AUTH_EVENT"
+    def detect_event_type(self, ctx: LineContext):
+        # FAILED_LOGIN > SUCCESS_LOGIN > FAILED_AUTH > SUDO_SESSION_* > SESSION_* > AUTH_EVENT
+        return self.prefilter.classify(ctx.text, ctx) or "AUTH_EVENT"
 
     # ---------------------------
     # SEVERITY CALCULATOR
@@ -5,30 +5,42 @@ from backend.core.utils.regex_patterns import (
     TIMESTAMP,
     PACKAGE,
     VERSION,
-    DPKG_ACTIONS
+    DPKG_ACTIONS,
+    DPKG_PREFILTER,
 )
-from backend.core.utils.hacking_tools import HACKING_TOOLS
+from backend.core.utils.indicators import hacking_tools
 from backend.core.utils.timestamp import parse_timestamp
+from backend.core.parser.prefilter import Prefilter
+from backend.core.parser.line_context import LineContext
 
 class DpkgParser:
 
     VALID_ACTIONS = DPKG_ACTIONS
 
+    def __init__(self):
+        self.prefilter = Prefilter(DPKG_PREFILTER)
+
     # Public API
 
-    def match(self, line: str) -> bool:
-        """Bu satır DPKG formatına uyuyor mu?"""
+    def match(self, line) -> bool:
+        """Bu satır DPKG formatına uyuyor mu? (str veya LineContext)"""
         if not line:
             return False
 
+        if isinstance(line, LineContext):
+            line = line.raw
+
         # TIMESTAMPT CHECK
         if not TIMESTAMP.match(line):
             return False
 
-        return any(f" {action} " in line for action in self.VALID_ACTIONS)
+        return self.prefilter.classify(line) is not None
 
-    def parse(self, line: str) -> dict:
+    def parse(self, line) -> dict:
         """Ham satırdan structured event çıkarır."""
+        if isinstance(line, LineContext):
+            line = line.raw
+
         ts = self.extract_timestamp(line)
         action = self.extract_action(line)
         package, arch = self.extract_package(line)
@@ -58,10 +70,8 @@ class DpkgParser:
         return parse_timestamp(line)
 
     def extract_action(self, line):
-        for action in self.VALID_ACTIONS:
-            if f" {action} " in line:
-                return action
-        return "unknown"
+        # VALID_ACTIONS sırası öncelik sırası
+        return self.prefilter.classify(line) or "unknown"
 
     def extract_package(self, line):
         m = PACKAGE.search(line)
@@ -103,7 +113,7 @@ class DpkgParser:
 
     #SEVERITY CALC
     def estimate_severity(self, action, package):
-        if package in HACKING_TOOLS:
+        if hacking_tools.contains(package):
             return "HIGH"
 
         if action in ["install", "remove"]:
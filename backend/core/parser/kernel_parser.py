@@ -10,19 +10,20 @@
 
 # OOM killer
 
+# NETFILTER_PACKET (iptables LOG satırları, paket alanlarıyla)
+
 from datetime import datetime
 
 from backend.core.utils.regex_patterns import (
     AUTH_TIMESTAMP,
-    KERNEL_PANIC,
-    KERNEL_SEGFAULT,
-    KERNEL_OOM,
-    KERNEL_USB_ERROR,
-    KERNEL_DRIVER_FAIL,
     KERNEL_PID,
-    KERNEL_PROCESS
+    KERNEL_PROCESS,
+    KERNEL_PREFILTER,
 )
 from backend.core.utils.timestamp import parse_timestamp
+from backend.core.parser.prefilter import Prefilter
+from backend.core.parser.line_context import LineContext
+from backend.core.parser.netfilter import parse_packet
 
 class KernelParser:
     """
@@ -31,81 +32,76 @@ class KernelParser:
     - Kernel Panic
     - Segfault
     - OOM Killer
+    - iptables LOG paketleri (src_ip, dst_ip, port, arayüz)
     """
 
-    def match(self, line: str) -> bool:
-        """Kernel check"""
+    def __init__(self):
+        self.prefilter = Prefilter(KERNEL_PREFILTER, ignore_case=True)
+
+    def match(self, line) -> bool:
+        """Kernel check (str veya LineContext)"""
         if not line:
             return False
 
-        keywords = [
-            "kernel", "panic", "segfault", "Out of memory",
-            "OOM", "driver", "usb", "segmentation fault"
-        ]
-
-        return any(k.lower() in line.lower() for k in keywords)
+        ctx = line if isinstance(line, LineContext) else LineContext(line)
+        return self.prefilter.classify(ctx.text, ctx) is not None
 
-    def parse(self, line: str) -> dict:
+    def parse(self, line) -> dict:
+        ctx = line if isinstance(line, LineContext) else LineContext(line)
 
-        ts = self.extract_timestamp(line)
-        event_type = self.detect_event_type(line)
+        ts = self.extract_timestamp(ctx)
+        event_type = self.detect_event_type(ctx)
         severity = self.estimate_severity(event_type)
 
-        return {
+        event = {
             "event_type": event_type,
             "log_source": "kernel",
             "category": "KERNEL",
             "severity": severity,
 
             "timestamp": ts,
-            "raw": line.strip(),
-            "message": line.strip(),
+            "raw": ctx.text,
+            "message": ctx.text,
 
             "user": None,
             "ip": None,
             "method": None,
 
-            "pid": self.extract_pid(line),
-            "process": self.extract_process_name(line),
+            "pid": self.extract_pid(ctx),
+            "process": self.extract_process_name(ctx),
         }
 
+        if event_type == "NETFILTER_PACKET":
+            # iptables LOG hedefi (ufw dışı kurallar) → paket alanları
+            packet = parse_packet(ctx.text)
+            if packet:
+                event.update(packet)
+                event["ip"] = packet["src_ip"]
+
+        return event
+
     # ---------------------------
-    # HELPERS
+    # HELPERS (LineContext alır)
     # ---------------------------
 
-    def extract_timestamp(self, line: str):
-        return parse_timestamp(line)
+    def extract_timestamp(self, ctx: LineContext):
+        return parse_timestamp(ctx.text)
 
-    def extract_pid(self, line: str):
-        m = KERNEL_PID.search(line)
+    def extract_pid(self, ctx: LineContext):
+        m = KERNEL_PID.search(ctx.text)
         return int(m.group(1)) if m else None
 
-    def extract_process_name(self, line: str):
-        m = KERNEL_PROCESS.search(line)
+    def extract_process_name(self, ctx: LineContext):
+        m = KERNEL_PROCESS.search(ctx.text)
         return m.group(1) if m else None
 
     # ---------------------------
     # EVENT TYPE LOGIC
     # ---------------------------
 
-    def detect_event_type(self, line: str):
-
-        if KERNEL_PANIC.search(line):
-            return "KERNEL_PANIC"
-
-        if KERNEL_SEGFAULT.search(line):
-            return "SEGFAULT"
-
-        if KERNEL_OOM.search(line):
-            return "OOM_KILLER"
-
-        if KERNEL_USB_ERROR.search(line):
-            return "USB_ERROR"
-
-        if KERNEL_DRIVER_FAIL.search(line):
-            return "DRIVER_ERROR"
-
-        return "KERNEL_EVENT"
+    def detect_event_type(self, ctx: LineContext):
+        # KERNEL_PANIC > SEGFAULT > OOM_KILLER > USB_ERROR > DRIVER_ERROR > NETFILTER_PACKET
+        return self.prefilter.classify(ctx.text, ctx) or "KERNEL_EVENT"
 
     # ---------------------------
     # SEVERITY
@@ -0,0 +1,137 @@
+# 📁 line_collapser.py
+
+# Amaç: gürültülü daemon'ların art arda yazdığı aynı satırları parse
+# öncesinde tek satıra indirmek (LogsCollector → LineCollapser → LogDispatcher).
+#
+# - Zaman damgası (ve kern.log uptime'ı) hariç gövdesi aynı olan ardışık
+#   satırlar, ilk satırdan itibaren WINDOW_SECONDS içinde kaldıkça birleşir
+# - rsyslog'un "message repeated N times: [ ... ]" satırı da açılır ve
+#   önceki aynı satırla birleşir
+# - Birleşen satırdan üretilen event repeat_count / first_seen / last_seen taşır
+# - Stateful parser'lı kaynaklar (auditd) collapse edilmez: event'ler satır
+#   index'ine bağlı değil, tekrar bilgisi yanlış event'e yazılırdı
+#
+# Not: sadece aynı batch içindeki ardışık satırlar birleşir. Batch'e yayılan
+# tekrar her batch'te ayrı event olur (önceki batch'in event'i dispatch ve
+# checkpoint edilmiş olur; satırı bir sonraki batch'e bekletmek offset'in
+# dispatch edilmemiş satırı geçmesi demek).
+#
+# Böylece parse, rule ve DB maliyeti satır başına değil tekrar grubu başına ödenir.
+
+import json
+
+from backend.core.utils.regex_patterns import (
+    LINE_TIMESTAMP_PREFIX,
+    KERNEL_UPTIME,
+    RSYSLOG_REPEATED,
+)
+from backend.core.utils.timestamp import parse_timestamp
+
+
+class LineCollapser:
+
+    WINDOW_SECONDS = 30
+
+    def __init__(self, window_seconds=None):
+        self.window_seconds = window_seconds or self.WINDOW_SECONDS
+
+        self.lines_in = 0
+        self.lines_out = 0
+
+    # ---------------------------
+    # PUBLIC API
+    # ---------------------------
+
+    def collapse(self, lines):
+        """
+        Ardışık tekrarları birleştirir.
+        → (satırlar, repeats) — repeats: {satır index: [adet, first_ts, last_ts]}
+          sadece birden fazla kez görülen satırlar için
+        """
+        out = []
+        repeats = {}
+        last_body = None
+
+        # bytes modundaki batch: gövde karşılaştırması str üzerinde yapılır
+        if lines and type(lines[0]) is bytes:
+            lines = [line.decode("utf-8", errors="ignore") for line in lines]
+
+        for line in lines:
+            count = 1
+
+            m = RSYSLOG_REPEATED.match(line)
+            if m:
+                line = m.group("head") + m.group("message")
+                count = int(m.group("count"))
+
+            body = self.body(line)
+
+            if out and body == last_body:
+                idx = len(out) - 1
+                info = repeats.get(idx)
+                if info is None:
+                    info = [1, parse_timestamp(out[idx]), None]
+
+                ts = parse_timestamp(line)
+                if self._in_window(info[1], ts):
+                    info[0] += count
+                    info[2] = ts
+                    repeats[idx] = info
+                    continue
+
+            out.append(line)
+            last_body = body
+
+            if count > 1:
+                ts = parse_timestamp(line)
+                repeats[len(out) - 1] = [count, ts, ts]
+
+        self.lines_in += len(lines)
+        self.lines_out += len(out)
+        return out, repeats
+
+    @staticmethod
+    def body(line: str) -> str:
+        """Zaman damgası ve kernel uptime'ı atılmış satır gövdesi."""
+        m = LINE_TIMESTAMP_PREFIX.match(line)
+        body = line[m.end():] if m else line
+        if "[" in body:
+            body = KERNEL_UPTIME.sub("", body, count=1)
+        return body.rstrip()
+
+    # ---------------------------
+    # HELPERS
+    # ---------------------------
+
+    def _in_window(self, first, ts):
+        # zaman damgası çözülemeyen satırlar sadece ardışıklıkla birleşir
+        if first is None or ts is None:
+            return True
+        return (ts - first).total_seconds() <= self.window_seconds
+
+
+def apply_repeat(event: dict, info) -> dict:
+    """Birleşmiş satırdan üretilen event'e tekrar bilgisini ekler."""
+    count, first, last = info
+
+    event["repeat_count"] = count
+    event["first_seen"] = first or event.get("timestamp")
+    event["last_seen"] = last or event["first_seen"]
+
+    # parser'ın koyduğu extra_data korunur, tekrar bilgisi üzerine eklenir
+    extra = event.get("extra_data")
+    if isinstance(extra, str):
+        try:
+            extra = json.loads(extra)
+        except ValueError:
+            extra = {"raw_extra_data": extra}
+    if not isinstance(extra, dict):
+        extra = {} if extra is None else {"raw_extra_data": extra}
+
+    extra.update({
+        "repeat_count": count,
+        "first_seen": event["first_seen"].isoformat() if event["first_seen"] else None,
+        "last_seen": event["last_seen"].isoformat() if event["last_seen"] else None,
+    })
+    event["extra_data"] = json.dumps(extra, default=str)
+    return event
@@ -0,0 +1,83 @@
+# 📁 line_context.py
+
+# Amaç: bir log satırının parser'lar arasında tekrar tekrar hesaplanan
+# görünümlerini (strip, lower, syslog header) tek seferde tutmak.
+#
+# LogDispatcher her satır için bir LineContext oluşturur ve aynı nesneyi
+# match() ve parse()'a verir. Parser'lar hâlâ düz str da kabul eder.
+# lower ve header ilk erişimde hesaplanır; kullanılmazsa maliyeti yoktur.
+#
+#   ctx = LineContext("Dec  4 12:32:10 web01 sshd[812]: Failed password ...")
+#   ctx.host → "web01", ctx.program → "sshd", ctx.pid → 812
+#   ctx.body → "Failed password ..."
+#
+# LogsCollector bytes modunda satır bytes gelir; decode burada, satır başına
+# bir kez yapılır (ParsePool varsa worker process'te).
+
+from backend.core.utils.regex_patterns import SYSLOG_TAG
+
+# header bulunamayan satırlar için (host, program, pid, body)
+_NO_HEADER = (None, None, None, None)
+
+
+class LineContext:
+
+    __slots__ = ("raw", "text", "_lower", "_header")
+
+    def __init__(self, line):
+        if type(line) is bytes:
+            line = line.decode("utf-8", errors="ignore")
+        self.raw = line
+        self.text = line.strip()
+        self._lower = None
+        self._header = None
+
+    @property
+    def lower(self) -> str:
+        """Küçük harf görünümü (ilk erişimde bir kez hesaplanır)."""
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def host(self):
+        return (self._header or self.parse_header())[0]
+
+    @property
+    def program(self):
+        return (self._header or self.parse_header())[1]
+
+    @property
+    def pid(self):
+        return (self._header or self.parse_header())[2]
+
+    @property
+    def body(self) -> str:
+        """Syslog header'ı sonrası mesaj (header yoksa tüm satır)."""
+        return (self._header or self.parse_header())[3] or self.text
+
+    def parse_header(self) -> tuple:
+        """
+        "Dec  4 12:32:10 host prog[pid]: body" veya "<ISO zaman> host prog: body"
+        → (host, program, pid, body); header yoksa hepsi None.
+        """
+        text = self.text
+        m = None
+
+        if text[:1].isdigit():
+            start = text.find(" ") + 1
+            if start:
+                m = SYSLOG_TAG.match(text, start)
+        elif len(text) > 16 and text[15] == " ":
+            m = SYSLOG_TAG.match(text, 16)
+
+        if m is None:
+            self._header = _NO_HEADER
+        else:
+            host, program, pid = m.groups()
+            self._header = (host, program, int(pid) if pid else None, text[m.end():])
+
+        return self._header
+
+    def __str__(self):
+        return self.text
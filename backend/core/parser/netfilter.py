@@ -0,0 +1,41 @@
+# 📁 netfilter.py
+
+# Amaç: netfilter LOG satırlarının (ufw.log ve kern.log'a düşen iptables
+# LOG hedefi) paket alanlarını tek geçişte çıkarmak.
+#
+#   "... [UFW BLOCK] IN=eth0 OUT= MAC=.. SRC=2001:db8::5 DST=2001:db8::1 LEN=80
+#    TC=0 HOPLIMIT=57 FLOWLBL=0 PROTO=TCP SPT=51234 DPT=22 ..."
+#   → src_ip="2001:db8::5", dst_ip="2001:db8::1", protocol="TCP",
+#     src_port=51234, dst_port=22, in_interface="eth0", out_interface=None
+#
+# Eski alan başına regex'ler (8 search) yerine NETFILTER_PACKET tek search.
+# IPv6 adresleri ve "br-1a2b" / "eth0.100" gibi arayüz isimleri de tam alınır.
+
+from backend.core.utils.regex_patterns import NETFILTER_PACKET
+
+PACKET_FIELDS = (
+    "src_ip", "dst_ip", "protocol", "src_port", "dst_port",
+    "in_interface", "out_interface",
+)
+
+# paket alanı bulunamayan satırlar için (kopyalanarak kullanılır)
+EMPTY_PACKET = dict.fromkeys(PACKET_FIELDS)
+
+
+def parse_packet(line: str):
+    """Paket alanları dict'i; satır netfilter LOG formatında değilse None."""
+    m = NETFILTER_PACKET.search(line)
+    if m is None:
+        return None
+
+    in_if, out_if, src_ip, dst_ip, protocol, src_port, dst_port = m.groups()
+
+    return {
+        "src_ip": src_ip,
+        "dst_ip": dst_ip,
+        "protocol": protocol,
+        "src_port": int(src_port) if src_port else None,
+        "dst_port": int(dst_port) if dst_port else None,
+        "in_interface": in_if or None,
+        "out_interface": out_if or None,
+    }
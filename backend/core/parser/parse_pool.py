@@ -0,0 +1,110 @@
+"""
+ParsePool
+
+Yoğun log kaynaklarında (syslog, kern.log) parse işini birden fazla
+process'e dağıtır.
+
+Görevleri:
+1) Collector'dan gelen ham satır batch'lerini worker process'lere gönderir.
+2) Her worker kendi LogDispatcher'ını (aynı parser'lar) kullanır.
+3) Sonuçları gönderim sırasıyla geri verir → kaynak başına sıra korunur.
+4) Worker çökerse batch'i inline parse eder, sistemi çökertmez.
+"""
+
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.core.parser.LogDispatcher import LogDispatcher
+from backend.logger import logger
+
+
+# WORKER PROCESS STATE
+_worker_dispatcher = None
+
+
+def _init_worker():
+    global _worker_dispatcher
+    _worker_dispatcher = LogDispatcher()
+
+
+def _worker_parse(source, lines, repeats=None):
+    return _worker_dispatcher.dispatch_batch(source, lines, repeats)
+
+
+class ParsePool:
+
+    # Bundan küçük batch'ler için IPC maliyeti parse maliyetinden büyük → inline
+    MIN_POOL_BATCH = 200
+
+    def __init__(self, workers: int, dispatcher: LogDispatcher):
+        self.workers = workers
+        self.dispatcher = dispatcher  # inline parse için (küçük batch / fallback)
+        self.max_inflight = workers * 2
+
+        # Scheduler thread'lerinin olduğu process'ten fork güvenli değil → forkserver
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+        )
+
+        logger.info(f"[ParsePool] Started with {workers} worker processes")
+
+    # MAIN
+
+    def imap(self, batches):
+        """
+        Generator: batch'leri worker'lara dağıtır ve (batch, sonuç)
+        çiftlerini gönderim sırasıyla üretir (sonuç: dispatch_batch çıktısı).
+        En fazla max_inflight batch aynı anda işlenir.
+        """
+        inflight = deque()
+
+        for batch in batches:
+            inflight.append((batch, self._submit(batch)))
+
+            if len(inflight) >= self.max_inflight:
+                yield self._result(*inflight.popleft())
+
+        while inflight:
+            yield self._result(*inflight.popleft())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # INTERNAL HELPERS
+
+    def _submit(self, batch):
+        if self._executor is None or len(batch["lines"]) < self.MIN_POOL_BATCH:
+            return None
+
+        # stateful parser (auditd) → kaynak tek bir parser nesnesinden geçmeli
+        if self.dispatcher.is_stateful(batch["parser"]):
+            return None
+
+        try:
+            return self._executor.submit(_worker_parse, batch["parser"], batch["lines"], batch.get("repeats"))
+        except Exception:
+            logger.exception("[ParsePool] Submit failed, parsing inline")
+            self.shutdown()
+            return None
+
+    def _result(self, batch, future):
+        if future is not None:
+            try:
+                return batch, future.result()
+            except BrokenProcessPool:
+                logger.exception("[ParsePool] Worker pool broken, falling back to inline parsing")
+                self.shutdown()
+            except Exception:
+                logger.exception(
+                    f"[ParsePool] Worker failed for {batch['source']}, parsing inline"
+                )
+
+        return batch, self.dispatcher.dispatch_batch(
+            batch["parser"], batch["lines"], batch.get("repeats")
+        )
@@ -0,0 +1,192 @@
+# 📁 parse_telemetry.py
+
+# Amaç: hangi kaynağın kaç satırı parse edebildiğini / düşürdüğünü görmek.
+#
+# Kaynak başına sayaçlar (LineCollapser'ın birleştirdiği satırlar repeat
+# sayısıyla sayılır → collapse açıkken de okunan satır cinsinden):
+#   read      → okunan satır
+#   matched   → match() kabul etti (read - unmatched)
+#   parsed    → event üretildi (stateful parser'da birden çok satır tek event olabilir)
+#   failed    → parse() exception fırlattı
+#   unmatched → match() reddetti
+# + kaynak başına parse süresi ve failed / unmatched satırlardan sınırlı
+#   boyutlu rastgele örnek (reservoir sampling, Algorithm L).
+#
+# Sayaçlar dispatch_batch sonuçlarından beslenir; ParsePool worker'larında
+# parse edilen batch'ler de sonuçlarıyla birlikte ana process'e döndüğü için
+# aynı yoldan sayılır. /api/system/parsers → snapshot()
+
+import threading
+import time
+from math import exp, log
+from random import random, randrange
+
+
+class Reservoir:
+    """
+    Sabit boyutlu, eşit olasılıklı örnek. Algorithm L: örneğe girecek
+    bir sonraki elemanın index'i önceden hesaplanır, aradaki elemanlara
+    hiç dokunulmaz (satır başı maliyet yok).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.items = []
+        self.seen = 0
+
+        self._w = exp(log(self._random()) / size)
+        self._next = size + self._skip()
+
+    def extend(self, items, make=None):
+        """
+        items: bu batch'teki yeni elemanlar (sequence).
+        make: örneğe giren elemandan saklanacak kaydı üretir (sadece onlar için çağrılır).
+        """
+        make = make or (lambda item: item)
+        n = len(items)
+        base = self.seen
+        self.seen += n
+
+        i = 0
+        while len(self.items) < self.size and i < n:
+            self.items.append(make(items[i]))
+            i += 1
+
+        while self._next < self.seen:
+            self.items[randrange(self.size)] = make(items[self._next - base])
+            self._w *= exp(log(self._random()) / self.size)
+            self._next += self._skip() + 1
+
+    def _skip(self) -> int:
+        if self._w >= 1.0:
+            return 0
+        return int(log(self._random()) / log(1.0 - self._w))
+
+    @staticmethod
+    def _random() -> float:
+        # (0, 1) — log(0) olmasın
+        return random() or 0.5
+
+
+class ParseTelemetry:
+
+    SAMPLE_SIZE = 20
+
+    # örneklerde satırın bu kadarı saklanır
+    MAX_LINE_LENGTH = 512
+
+    COUNTERS = ("read", "matched", "parsed", "failed", "unmatched")
+
+    def __init__(self, sample_size=None):
+        self.sample_size = sample_size or self.SAMPLE_SIZE
+        self.started_at = time.time()
+
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    # ---------------------------
+    # PUBLIC API
+    # ---------------------------
+
+    def record(self, source: str, parser: str, lines, result: dict, repeats=None):
+        """
+        Bir batch'in dispatch_batch sonucunu sayaçlara ekler.
+        lines: parser'a verilen satırlar (örnek satırlar buradan okunur)
+        repeats: LineCollapser çıktısı {satır index: [adet, first, last]}
+        """
+        now = time.time()
+        unmatched = result.get("unmatched", ())
+        errors = result.get("errors", ())
+
+        read = len(lines)
+        skipped = result["skipped"]
+        if repeats:
+            # birleşmiş satır, temsil ettiği satır sayısı kadar sayılır
+            read += sum(info[0] - 1 for info in repeats.values())
+            skipped += sum(repeats[i][0] - 1 for i in unmatched if i in repeats)
+
+        with self._lock:
+            stats = self._sources.get(source)
+            if stats is None:
+                stats = self._sources[source] = self._new_stats(parser)
+
+            counters = stats["counters"]
+            counters["read"] += read
+            counters["parsed"] += len(result["events"])
+            counters["failed"] += result["failed"]
+            counters["unmatched"] += skipped
+            counters["matched"] += read - skipped
+            stats["parse_seconds"] += result.get("elapsed", 0.0)
+            stats["last_batch"] = now
+
+            if unmatched:
+                stats["unmatched_sample"].extend(
+                    unmatched, lambda idx: self._sample(lines[idx], now)
+                )
+            if errors:
+                stats["failed_sample"].extend(
+                    errors, lambda err: self._sample(lines[err[0]], now, err[1])
+                )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            sources = {}
+
+            for source, stats in self._sources.items():
+                counters = dict(stats["counters"])
+                read = counters["read"]
+                seconds = stats["parse_seconds"]
+
+                sources[source] = {
+                    "parser": stats["parser"],
+                    **counters,
+                    "unmatched_ratio": round(counters["unmatched"] / read, 4) if read else 0.0,
+                    "parse_seconds": round(seconds, 3),
+                    "lines_per_sec": int(read / seconds) if seconds else None,
+                    "last_batch": self._iso(stats["last_batch"]),
+                    "samples": {
+                        "failed": list(stats["failed_sample"].items),
+                        "unmatched": list(stats["unmatched_sample"].items),
+                    },
+                }
+
+        return {
+            "since": self._iso(self.started_at),
+            "sources": sources,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._sources.clear()
+            self.started_at = time.time()
+
+    # ---------------------------
+    # HELPERS
+    # ---------------------------
+
+    def _new_stats(self, parser: str) -> dict:
+        return {
+            "parser": parser,
+            "counters": dict.fromkeys(self.COUNTERS, 0),
+            "parse_seconds": 0.0,
+            "last_batch": None,
+            "failed_sample": Reservoir(self.sample_size),
+            "unmatched_sample": Reservoir(self.sample_size),
+        }
+
+    def _sample(self, line, ts: float, error=None) -> dict:
+        if type(line) is bytes:
+            line = line[:self.MAX_LINE_LENGTH].decode("utf-8", errors="replace")
+        sample = {
+            "line": line[:self.MAX_LINE_LENGTH],
+            "seen_at": self._iso(ts),
+        }
+        if error is not None:
+            sample["error"] = error
+        return sample
+
+    @staticmethod
+    def _iso(ts):
+        if ts is None:
+            return None
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
@@ -0,0 +1,58 @@
+# 📁 prefilter.py
+
+# Amaç: parser'ların match() ve detect_event_type() adımlarını tek geçişe indirmek.
+#
+# Her parser'ın anahtar kelimeleri ve regex'leri öncelik sıralı tek bir
+# tabloda durur (regex_patterns.py → *_PREFILTER). Satır bir kez sınıflandırılır;
+# sonuç hem "bu satır bu parser'ın mı?" hem de "hangi event tipi?" sorusunu
+# cevaplar. Regex sadece anahtar kelime geçen satırlarda çalışır.
+#
+# Son satırın sonucu saklanır: dispatcher aynı satır için önce match() sonra
+# parse() çağırdığında satır ikinci kez taranmaz.
+
+
+class Prefilter:
+    """
+    rules: [(sonuç, anahtar kelimeler, regex veya None)] — öncelik sırasıyla.
+    ignore_case=True → satır bir kez küçük harfe çevrilir; anahtar kelimeler
+    küçük harfle yazılmalı.
+    """
+
+    def __init__(self, rules, ignore_case=False):
+        self.rules = tuple(rules)
+        self.ignore_case = ignore_case
+
+        self._last_line = None
+        self._last_result = None
+
+    def classify(self, line: str, ctx=None):
+        """
+        Satıra uyan ilk kuralın adı (hiçbiri uymazsa None).
+        ctx: LineContext verilirse küçük harf görünümü oradan alınır (tek lower).
+        """
+        if line == self._last_line:
+            return self._last_result
+
+        if self.ignore_case:
+            text = ctx.lower if ctx is not None else line.lower()
+        else:
+            text = line
+        result = None
+
+        for name, keywords, pattern in self.rules:
+            if keywords:
+                for keyword in keywords:
+                    if keyword in text:
+                        break
+                else:
+                    continue
+
+            if pattern is not None and not pattern.search(text):
+                continue
+
+            result = name
+            break
+
+        self._last_line = line
+        self._last_result = result
+        return result
@@ -0,0 +1,311 @@
+# 📁 ssh_sessions.py
+
+# Amaç: internete açık sunucularda sshd'nin bağlantı başına yazdığı 5-10
+# satırı (connection from, invalid user, PAM, disconnect ...) tek bir
+# SSH_SESSION kaydına indirmek.
+#
+# LogDispatcher → SSHSessionTracker → EventDispatcher
+#
+# - Oturumlar sshd PID'ine göre tutulur (her bağlantı ayrı sshd process'i)
+# - FAILED_LOGIN / FAILED_AUTH / SUCCESS_LOGIN event'leri olduğu gibi ve
+#   hemen geçer → SSHBruteforceRule vb. gecikmeden görür
+# - Diğer sshd satırları oturuma katlanır; oturum kapandığında (disconnect,
+#   pam session closed, zaman aşımı) tek SSH_SESSION event'i üretilir:
+#   kaynak ip, denenen kullanıcılar, auth metotları, sonuç, süre
+#
+# Offset: açık oturumun katlanmış satırları henüz hiçbir event'e yazılmadı;
+# kaynağın checkpoint'i en eski login olmamış oturumun başladığı batch'in
+# öncesinde, en fazla PREAUTH_TIMEOUT boyunca tutulur (hold()). Restart'ta
+# oradan tekrar okunur → oturum yeniden kurulur (o aralıktaki geçen event'ler
+# DB'ye ikinci kez yazılabilir; rule engine'de tekrar sayılmaz, bkz.
+# Scheduler._dispatch_log_events). Login olmuş oturumlar saatlerce sürebilir;
+# checkpoint'i tutmazlar, crash'te özetleri kısmi kalır.
+# Kapanışta flush() açık oturumları özetler.
+
+import json
+import time
+
+from backend.core.utils.regex_patterns import (
+    SSHD_PEER,
+    SSHD_DAEMON_MARKERS,
+    SSHD_CLOSE_MARKERS,
+    SSHD_SESSION_CLOSED,
+)
+
+# olduğu gibi rule engine'e / DB'ye giden event tipleri
+PASS_THROUGH = ("FAILED_LOGIN", "FAILED_AUTH", "SUCCESS_LOGIN")
+
+
+class SSHSession:
+
+    __slots__ = (
+        "pid", "ip", "port", "users", "methods", "failures", "lines", "raw",
+        "first_seen", "last_seen", "authenticated", "disconnected", "touched",
+        "opened", "source", "resume",
+    )
+
+    def __init__(self, pid, now, source=None, resume=None):
+        self.pid = pid
+        self.source = source
+        self.resume = resume  # oturumun ilk satırından önceki checkpoint
+        self.ip = None
+        self.port = None
+        self.users = []
+        self.methods = []
+        self.failures = 0
+        self.lines = 0
+        self.raw = []
+        self.first_seen = None
+        self.last_seen = None
+        self.authenticated = False
+        self.disconnected = False
+        self.touched = now
+        self.opened = now
+
+    @property
+    def outcome(self) -> str:
+        if self.authenticated:
+            return "success"
+        if self.failures:
+            return "failed"
+        return "no_auth"
+
+
+class SSHSessionTracker:
+
+    # sshd LoginGraceTime varsayılanı: login olmamış bağlantı bu kadar sürebilir
+    PREAUTH_TIMEOUT = 120
+
+    # login olmuş oturumda "Disconnected from" sonrası pam "session closed" beklemesi
+    DISCONNECT_GRACE = 5
+
+    # login olmuş oturumda bu kadar sshd satırı gelmezse özetlenir (kapanış
+    # satırı kaçmış olabilir)
+    AUTH_IDLE_TIMEOUT = 3600
+
+    # aynı anda tutulan oturum sınırı (aşılırsa en eski oturum kapatılır)
+    MAX_SESSIONS = 5000
+
+    # özet event'in raw alanında saklanan satır sayısı
+    MAX_RAW_LINES = 20
+    MAX_USERS = 10
+
+    def __init__(self):
+        self._sessions = {}  # pid → SSHSession (dokunulma sırasıyla)
+        self._opened = {}    # pid → SSHSession (açılma sırasıyla, hold() için)
+
+        self._batch = (None, None)
+
+        self.absorbed = 0
+        self.emitted = 0
+
+    # ---------------------------
+    # PUBLIC API
+    # ---------------------------
+
+    def process(self, events, source=None, resume=None) -> list:
+        """
+        Parse edilmiş event'leri alır; dispatch edilecek event'leri sırasıyla
+        döner (geçen event'ler + bu batch'te kapanan oturumların özetleri).
+
+        source / resume: batch'in kaynağı ve batch'ten önceki checkpoint;
+        bu batch'te açılan oturumlar hold() için saklar.
+        """
+        out = []
+        now = time.monotonic()
+        self._batch = (source, resume)
+
+        for event in events:
+            if (
+                event.get("process") != "sshd"
+                or event.get("pid") is None
+                or event.get("log_source") != "auth"
+            ):
+                out.append(event)
+                continue
+
+            self._consume(event, now, out)
+
+        return out
+
+    def expire(self, now=None) -> list:
+        """Zaman aşımına uğrayan oturumların özetleri (scheduler her turda çağırır)."""
+        now = now or time.monotonic()
+        out = []
+
+        for pid, session in list(self._sessions.items()):
+            if session.disconnected:
+                timeout = self.DISCONNECT_GRACE
+            elif session.authenticated:
+                timeout = self.AUTH_IDLE_TIMEOUT
+            else:
+                timeout = self.PREAUTH_TIMEOUT
+
+            if now - session.touched > timeout:
+                out.append(self._close(pid, "timeout"))
+
+        return out
+
+    def flush(self) -> list:
+        """Açık tüm oturumların özetleri (kapanışta)."""
+        return [self._close(pid, "flush") for pid in list(self._sessions)]
+
+    def hold(self, source, now=None):
+        """
+        source'un checkpoint'i nereye kadar ilerleyebilir?
+        → (True, checkpoint) login olmamış, PREAUTH_TIMEOUT'tan genç açık
+          oturum varsa: en eski oturumdan önceki checkpoint (None → bu
+          process'te hiç commit edilmemeli)
+        → (False, None) yoksa
+
+        Login olmuş ve uzun süren oturumlar checkpoint'i tutmaz: restart'ta
+        tekrar okunan aralık en fazla PREAUTH_TIMEOUT kadar olur.
+        """
+        now = now or time.monotonic()
+        for session in self._opened.values():
+            if (
+                session.source == source
+                and not session.authenticated
+                and now - session.opened <= self.PREAUTH_TIMEOUT
+            ):
+                return True, session.resume
+        return False, None
+
+    def stats(self) -> dict:
+        return {
+            "open_sessions": len(self._sessions),
+            "absorbed_lines": self.absorbed,
+            "emitted_sessions": self.emitted,
+        }
+
+    # ---------------------------
+    # HELPERS
+    # ---------------------------
+
+    def _consume(self, event, now, out):
+        pid = event["pid"]
+        text = event.get("message") or ""
+        lower = text.lower()
+
+        for marker in SSHD_DAEMON_MARKERS:
+            if marker in lower:
+                out.append(event)
+                return
+
+        closing = any(marker in lower for marker in SSHD_CLOSE_MARKERS)
+        peer = SSHD_PEER.search(text)
+
+        session = self._sessions.pop(pid, None)
+        if session is None:
+            # oturumu olmayan pid'in kapanış satırı (ör: tek satırlık
+            # "Connection closed by ... [preauth]") veya ip'siz satır → tek başına geçer
+            if closing or (peer is None and not event.get("ip")):
+                out.append(event)
+                return
+
+            source, resume = self._batch
+            session = SSHSession(pid, now, source, resume)
+            self._opened[pid] = session
+            if len(self._sessions) >= self.MAX_SESSIONS:
+                out.append(self._close(next(iter(self._sessions)), "evicted"))
+
+        # sona taşı → _sessions dokunulma sırasında kalır
+        self._sessions[pid] = session
+        self._fold(session, event, peer, lower, now)
+
+        if event["event_type"] in PASS_THROUGH:
+            out.append(event)
+        else:
+            self.absorbed += 1
+            if len(session.raw) < self.MAX_RAW_LINES:
+                session.raw.append(event.get("raw") or text)
+
+        if session.authenticated:
+            if SSHD_SESSION_CLOSED in lower:
+                out.append(self._close(pid, "disconnect"))
+            elif closing:
+                session.disconnected = True
+        elif closing:
+            out.append(self._close(pid, "disconnect"))
+
+    def _fold(self, session, event, peer, lower, now):
+        count = event.get("repeat_count") or 1
+        event_type = event["event_type"]
+        ts = event.get("timestamp")
+
+        session.lines += count
+        session.touched = now
+        if ts is not None:
+            session.first_seen = session.first_seen or ts
+            session.last_seen = ts
+
+        user = event.get("user")
+        if peer is not None:
+            session.ip = session.ip or peer.group(2)
+            session.port = session.port or int(peer.group(3))
+            user = peer.group(1) or user
+        elif event.get("ip"):
+            session.ip = session.ip or event["ip"]
+
+        if user and user not in session.users and len(session.users) < self.MAX_USERS:
+            session.users.append(user)
+
+        method = event.get("method")
+        if method and method not in session.methods:
+            session.methods.append(method)
+
+        if event_type == "SUCCESS_LOGIN":
+            session.authenticated = True
+        elif event_type == "FAILED_LOGIN" or ": failed " in lower:
+            # "Failed password" + "Failed publickey / keyboard-interactive / none"
+            session.failures += count
+
+    def _close(self, pid, reason) -> dict:
+        session = self._sessions.pop(pid)
+        self._opened.pop(pid, None)
+        self.emitted += 1
+
+        duration = None
+        if session.first_seen and session.last_seen:
+            duration = (session.last_seen - session.first_seen).total_seconds()
+
+        outcome = session.outcome
+        users = ", ".join(session.users) or "-"
+
+        return {
+            "event_type": "SSH_SESSION",
+            "log_source": "auth",
+            "category": "AUTH",
+            "severity": "MEDIUM" if outcome == "failed" else "LOW",
+            "timestamp": session.first_seen,
+            "first_seen": session.first_seen,
+            "last_seen": session.last_seen,
+
+            "raw": "\n".join(session.raw),
+            "message": (
+                f"sshd[{pid}] session from {session.ip or '?'}: {outcome} "
+                f"({session.failures} failed attempts, users: {users}, {session.lines} lines)"
+            ),
+
+            "user": session.users[-1] if session.users else None,
+            "ip": session.ip,
+            "method": session.methods[-1] if session.methods else None,
+            "pid": pid,
+            "process": "sshd",
+
+            "extra_data": json.dumps({
+                "ssh_session": {
+                    "ip": session.ip,
+                    "port": session.port,
+                    "users": session.users,
+                    "methods": session.methods,
+                    "failures": session.failures,
+                    "outcome": outcome,
+                    "closed_by": reason,
+                    "lines": session.lines,
+                    "duration_seconds": duration,
+                    "first_seen": session.first_seen.isoformat() if session.first_seen else None,
+                    "last_seen": session.last_seen.isoformat() if session.last_seen else None,
+                }
+            }),
+        }
@@ -18,15 +18,12 @@ from datetime import datetime
 
 from backend.core.utils.regex_patterns import (
     SYS_TIMESTAMP,
-    SYS_SYSTEMD,
     SYS_SERVICE_NAME,
-    SYS_FAILED_START,
-    SYS_STARTED,
-    SYS_STOPPED,
-    SYS_WARNING,
-    SYS_ERROR
+    SYS_PREFILTER,
 )
 from backend.core.utils.timestamp import parse_timestamp
+from backend.core.parser.prefilter import Prefilter
+from backend.core.parser.line_context import LineContext
 
 class SysParser:
     """
@@ -38,21 +35,26 @@ class SysParser:
     - SYS_EVENT (generic)
     """
 
+    def __init__(self):
+        self.prefilter = Prefilter(SYS_PREFILTER)
+
     # ---------------------------
     # PUBLIC API
     # ---------------------------
 
-    def match(self, line: str) -> bool:
-        """syslog formatına uyuyor mu?"""
+    def match(self, line) -> bool:
+        """syslog formatına uyuyor mu? (str veya LineContext)"""
         if not line:
             return False
-        return bool(SYS_TIMESTAMP.match(line))
+        text = line.text if isinstance(line, LineContext) else line.strip()
+        return bool(SYS_TIMESTAMP.match(text))
 
-    def parse(self, line: str) -> dict:
+    def parse(self, line) -> dict:
+        ctx = line if isinstance(line, LineContext) else LineContext(line)
 
-        ts = self.extract_timestamp(line)
-        service = self.extract_service_name(line)
-        event_type = self.detect_event_type(line)
+        ts = self.extract_timestamp(ctx)
+        service = self.extract_service_name(ctx)
+        event_type = self.detect_event_type(ctx)
         severity = self.estimate_severity(event_type)
 
         return {
@@ -62,8 +64,8 @@ class SysParser:
             "severity": severity,
 
             "timestamp": ts,
-            "raw": line.strip(),
-            "message": line.strip(),
+            "raw": ctx.text,
+            "message": ctx.text,
 
             "service": service,
             "user": None,
@@ -71,42 +73,24 @@ class SysParser:
         }
 
     # ---------------------------
-    # HELPERS
+    # HELPERS (LineContext alır)
     # ---------------------------
 
-    def extract_timestamp(self, line: str): 
-        return parse_timestamp(line)
+    def extract_timestamp(self, ctx: LineContext):
+        return parse_timestamp(ctx.text)
 
-    def extract_service_name(self, line: str):
+    def extract_service_name(self, ctx: LineContext):
         """systemd veya service restart satırlarında service adını yakala."""
-        m = SYS_SERVICE_NAME.search(line)
+        m = SYS_SERVICE_NAME.search(ctx.text)
         return m.group(1) if m else None
 
     # ---------------------------
     # EVENT TYPE DETECTION
     # ---------------------------
 
-    def detect_event_type(self, line: str):
-
-        lower = line.lower()
-
-        # High-level failures
-        if SYS_FAILED_START.search(line):
-            return "SERVICE_FAILED"
-
-        if SYS_STARTED.search(line):
-            return "SERVICE_STARTED"
-
-        if SYS_STOPPED.search(line):
-            return "SERVICE_STOPPED"
-
-        if SYS_ERROR.search(lower):
-            return "SYSTEM_ERROR"
-
-        if SYS_WARNING.search(lower):
-            return "SYSTEM_WARNING"
-
-        return "SYS_EVENT"
+    def detect_event_type(self, ctx: LineContext):
+        # SERVICE_FAILED > SERVICE_STARTED > SERVICE_STOPPED > SYSTEM_ERROR > SYSTEM_WARNING
+        return self.prefilter.classify(ctx.text) or "SYS_EVENT"
 
     # ---------------------------
     # SEVERITY MAPPING
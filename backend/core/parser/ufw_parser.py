@@ -1,18 +1,13 @@
-import re
 from datetime import datetime
 
 from backend.core.utils.regex_patterns import (
     AUTH_TIMESTAMP,   
-    UFW_ACTION,
-    UFW_SRC_IP,
-    UFW_DST_IP,
-    UFW_PROTOCOL,
-    UFW_SRC_PORT,
-    UFW_DST_PORT,
-    UFW_IN_IF,
-    UFW_OUT_IF,
+    UFW_PREFILTER,
 )
 from backend.core.utils.timestamp import parse_timestamp
+from backend.core.parser.prefilter import Prefilter
+from backend.core.parser.netfilter import parse_packet, EMPTY_PACKET
+from backend.core.parser.line_context import LineContext
 
 
 class UfwParser:
@@ -26,28 +21,28 @@ class UfwParser:
         - interface bilgisi (IN/OUT)
     """
 
+    def __init__(self):
+        self.prefilter = Prefilter(UFW_PREFILTER, ignore_case=True)
+
     # ---------------------------
     # PUBLIC API
     # ---------------------------
 
-    def match(self, line: str) -> bool:
-        """Bu satır UFW log formatına uyuyor mu?"""
+    def match(self, line) -> bool:
+        """Bu satır UFW log formatına uyuyor mu? (str veya LineContext)"""
         if not line:
             return False
 
-        return "UFW " in line
+        if isinstance(line, LineContext):
+            return self.prefilter.classify(line.text, line) is not None
+        return self.prefilter.classify(line.strip()) is not None
 
-    def parse(self, line: str) -> dict:
+    def parse(self, line) -> dict:
+        line = line.text if isinstance(line, LineContext) else line.strip()
 
         ts = self.extract_timestamp(line)
         event_type = self.extract_event_type(line)
-        src_ip = self.extract_src_ip(line)
-        dst_ip = self.extract_dst_ip(line)
-        protocol = self.extract_protocol(line)
-        src_port = self.extract_src_port(line)
-        dst_port = self.extract_dst_port(line)
-        in_if = self.extract_in_interface(line)
-        out_if = self.extract_out_interface(line)
+        packet = self.extract_packet(line)
 
         severity = self.estimate_severity(event_type)
 
@@ -58,16 +53,16 @@ class UfwParser:
             "severity": severity,
 
             "timestamp": ts,
-            "raw": line.strip(),
-            "message": line.strip(),
-
-            "src_ip": src_ip,
-            "dst_ip": dst_ip,
-            "protocol": protocol,
-            "src_port": src_port,
-            "dst_port": dst_port,
-            "in_interface": in_if,
-            "out_interface": out_if,
+            "raw": line,
+            "message": line,
+
+            "src_ip": packet["src_ip"],
+            "dst_ip": packet["dst_ip"],
+            "protocol": packet["protocol"],
+            "src_port": packet["src_port"],
+            "dst_port": packet["dst_port"],
+            "in_interface": packet["in_interface"],
+            "out_interface": packet["out_interface"],
         }
 
     # ---------------------------
@@ -78,39 +73,11 @@ class UfwParser:
         return parse_timestamp(line)
 
     def extract_event_type(self, line: str):
-        m = UFW_ACTION.search(line)
-        if not m:
-            return "UFW_EVENT"
-        action = m.group(1).upper()
-        return f"UFW_{action}"
-
-    def extract_src_ip(self, line: str):
-        m = UFW_SRC_IP.search(line)
-        return m.group(1) if m else None
-
-    def extract_dst_ip(self, line: str):
-        m = UFW_DST_IP.search(line)
-        return m.group(1) if m else None
-
-    def extract_protocol(self, line: str):
-        m = UFW_PROTOCOL.search(line)
-        return m.group(1) if m else None
-
-    def extract_src_port(self, line: str):
-        m = UFW_SRC_PORT.search(line)
-        return int(m.group(1)) if m else None
-
-    def extract_dst_port(self, line: str):
-        m = UFW_DST_PORT.search(line)
-        return int(m.group(1)) if m else None
-
-    def extract_in_interface(self, line: str):
-        m = UFW_IN_IF.search(line)
-        return m.group(1) if m else None
-
-    def extract_out_interface(self, line: str):
-        m = UFW_OUT_IF.search(line)
-        return m.group(1) if m else None
+        return self.prefilter.classify(line) or "UFW_EVENT"
+
+    def extract_packet(self, line: str):
+        # IN/OUT, SRC/DST (IPv4 + IPv6), PROTO, SPT/DPT tek geçişte
+        return parse_packet(line) or EMPTY_PACKET
 
     # ---------------------------
     # SEVERITY MAPPING
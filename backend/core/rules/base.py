@@ -81,10 +81,16 @@ class StatelessRule(BaseRule, ABC):
 # STATEFUL RULE
 # =========================================================
 class StatefulRule(BaseRule, ABC):
+    """
+    consume() dokunduğu key'lerin listesini dönebilir:
+      []    → hiçbir key değişmedi, evaluate() çağrılmaz
+      [key] → evaluate(context, keys=[key]) sadece o key'e bakar
+      None  → evaluate(context) (tam tarama, eski davranış)
+    """
     window_seconds: int = 300
 
     @abstractmethod
-    def consume(self, event: Dict[str, Any], context: Any) -> None:
+    def consume(self, event: Dict[str, Any], context: Any) -> Optional[List[tuple]]:
         pass
 
     @abstractmethod
@@ -117,34 +123,54 @@ class ThresholdRule(StatefulRule, ABC):
         """Eşik aşıldığında üretilecek alert payload'u."""
         pass
 
-    def consume(self, event: Dict[str, Any], context: Any) -> None:
+    def consume(self, event: Dict[str, Any], context: Any) -> List[tuple]:
         if not self.is_relevant(event):
-            return
+            return []
 
         key = self.get_key(event)
-        context.add(
-            rule_id=self.rule_id,
-            key=key,
-            event=event,
-            window_seconds=self.window_seconds,
-        )
 
-    def evaluate(self, context: Any) -> List[Dict[str, Any]]:
+        # birleşmiş tekrar satırı (repeat_count) kaç olay ise o kadar sayılır;
+        # key başına tutulan event sayısından fazlası anlamsız
+        repeat = min(event.get("repeat_count") or 1, context.max_events_per_key)
+
+        for _ in range(repeat):
+            context.add(
+                rule_id=self.rule_id,
+                key=key,
+                event=event,
+                window_seconds=self.window_seconds,
+            )
+
+        return [key]
+
+    def evaluate(self, context: Any, keys: Optional[List[tuple]] = None) -> List[Dict[str, Any]]:
+        """
+        keys: consume()'un dokunduğu key'ler → sadece onlar kontrol edilir (event başına O(1)).
+        None → kuralın tüm key'leri taranır.
+        """
         results = []
-        rule_bucket = context._store.get(self.rule_id)
-        if not rule_bucket:
-            return results
+        if keys is None:
+            rule_bucket = context._store.get(self.rule_id)
+            if not rule_bucket:
+                return results
+            keys = list(rule_bucket.keys())
+
+        for key in keys:
+            count = context.count(
+                rule_id=self.rule_id,
+                key=key,
+                window_seconds=self.window_seconds,
+            )
+            if count < self.threshold:
+                continue
 
-        for key in list(rule_bucket.keys()):
             events = context.get(
                 rule_id=self.rule_id,
                 key=key,
                 window_seconds=self.window_seconds,
             )
-
-            if len(events) >= self.threshold:
-                alert = self.create_alert(key, events)
-                results.append({"alert": alert, "evidence": []})
-                context.clear_key(rule_id=self.rule_id, key=key)
+            alert = self.create_alert(key, events)
+            results.append({"alert": alert, "evidence": []})
+            context.clear_key(rule_id=self.rule_id, key=key)
 
         return results
\ No newline at end of file
@@ -1,12 +1,102 @@
+import itertools
+import json
+import os
+import sys
+import threading
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from typing import Any, Dict, Deque, Tuple, List
 
+from backend.core.utils.file_utils import atomic_write_text
 from backend.logger import logger
 
 EventRef = Dict[str, Any]
 ContextKey = Tuple[Any, ...]
 
+# stats() içindeki yaklaşık bellek hesabı için (CPython, 64-bit)
+EVENT_REF_BYTES = sys.getsizeof({"event_id": None, "event_type": None, "ts": 0.0}) + sys.getsizeof(0.0)
+KEY_BYTES = sys.getsizeof(deque(maxlen=1)) + 3 * 100  # deque + bucket / LRU / timer kayıtları
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel (Varghese & Lauck).
+
+    - levels x 2^bits slots; level 0 slots are `resolution` seconds wide,
+      each higher level is 2^bits times wider
+    - schedule() / advance() are O(1) per item (amortized over cascades)
+    - deadlines beyond the horizon are clamped; the owner re-arms on fire
+    """
+
+    def __init__(self, *, resolution: float = 1.0, bits: int = 6, levels: int = 4, now: float = None):
+        self.resolution = resolution
+        self.bits = bits
+        self.levels = levels
+        self.mask = (1 << bits) - 1
+        self.horizon = (1 << (bits * levels)) - 1  # ticks
+
+        self._wheels = [[[] for _ in range(1 << bits)] for _ in range(levels)]
+        self._tick = int((time.time() if now is None else now) / resolution)
+        self.pending = 0
+
+    def schedule(self, item: Any, deadline: float):
+        """item, deadline'ı geçen ilk advance()'te döner (en erken bir sonraki tick)."""
+        ticks = -int(-deadline // self.resolution)  # ceil → erken tetiklenmesin
+        self._place(max(ticks, self._tick + 1), item)
+
+    def advance(self, now: float) -> List[Any]:
+        """Wheel'i now'a kadar ilerletir; süresi dolan item'ları döner."""
+        target = int(now / self.resolution)
+        due = []
+
+        while self._tick < target:
+            if not self.pending:
+                # boş wheel: aradaki tick'leri tek tek dolaşmaya gerek yok
+                self._tick = target
+                break
+
+            self._tick += 1
+            tick = self._tick
+
+            # üst seviyelerden alt seviyelere: bu tick'te sınırı geçilen slot'ları dağıt
+            for level in range(self.levels - 1, 0, -1):
+                shift = self.bits * level
+                if tick & ((1 << shift) - 1):
+                    continue
+
+                slots = self._wheels[level]
+                index = (tick >> shift) & self.mask
+                entries, slots[index] = slots[index], []
+                self.pending -= len(entries)
+
+                for ticks, item in entries:
+                    if ticks <= tick:
+                        due.append(item)
+                    else:
+                        self._place(ticks, item)
+
+            slots = self._wheels[0]
+            index = tick & self.mask
+            if slots[index]:
+                entries, slots[index] = slots[index], []
+                self.pending -= len(entries)
+                due.extend(item for _, item in entries)
+
+        return due
+
+    def _place(self, ticks: int, item: Any):
+        delta = ticks - self._tick
+        if delta > self.horizon:
+            delta = self.horizon
+            ticks = self._tick + delta
+
+        level = 0
+        while delta >> (self.bits * (level + 1)):
+            level += 1
+
+        self._wheels[level][(ticks >> (self.bits * level)) & self.mask].append((ticks, item))
+        self.pending += 1
+
 
 class CorrelationContext:
     """
@@ -14,24 +104,78 @@ class CorrelationContext:
 
     Responsibilities:
     - Maintain per-rule, per-key sliding time windows
-    - Enforce size limits (keys / events)
+    - Expire idle keys proactively (timing wheel, deadline = newest event + window)
+    - Enforce size limits: keys per rule, and a global key / event budget
+      across all rules; eviction is LRU by last activity
     - Store minimal event references (NOT full events)
     - Provide deterministic, debuggable behavior
+
+    Thread-safe: rule engine is called from the log, process and metrics threads.
+
+    save() / load(): compact snapshot of the windows so a restart does not
+    reset in-progress correlations (e.g. 2 of 3 failed logins). Log sources
+    are re-read at-least-once after a restart; for restored keys, events at
+    or before the newest restored event are ignored so they are not counted
+    twice.
     """
 
+    SNAPSHOT_VERSION = 1
+
+    # JSON'a yazılabilen key elemanları (diğer key'ler snapshot'a girmez)
+    SNAPSHOT_KEY_TYPES = (str, int, float, bool, type(None))
+
     def __init__(
         self,
         *,
         default_window: int = 300,
         max_keys_per_rule: int = 500,
         max_events_per_key: int = 50,
+        max_total_keys: int = 5000,
+        max_total_events: int = 50000,
+        wheel_resolution: float = 1.0,
     ):
         self.default_window = default_window
         self.max_keys_per_rule = max_keys_per_rule
         self.max_events_per_key = max_events_per_key
-
-        # rule_id -> key -> deque[event_ref]
-        self._store: Dict[str, Dict[ContextKey, Deque[EventRef]]] = defaultdict(dict)
+        self.max_total_keys = max_total_keys
+        self.max_total_events = max_total_events
+
+        # rule_id -> key -> deque[event_ref]  (son aktiviteye göre sıralı)
+        self._store: Dict[str, "OrderedDict[ContextKey, Deque[EventRef]]"] = defaultdict(OrderedDict)
+
+        # rule_id -> son add()'de kullanılan pencere
+        self._windows: Dict[str, int] = {}
+
+        # (rule_id, key) -> None, tüm kurallar genelinde son aktiviteye göre sıralı
+        self._lru: "OrderedDict[Tuple[str, ContextKey], None]" = OrderedDict()
+        self._total_events = 0
+
+        # (rule_id, key) -> wheel'deki geçerli kaydın token'ı (key başına tek timer)
+        self._armed: Dict[Tuple[str, ContextKey], int] = {}
+        self._tokens = itertools.count()
+        self._wheel = TimerWheel(resolution=wheel_resolution, now=self._now())
+
+        self._lock = threading.RLock()
+
+        self.expired_keys = 0
+        self.evicted_rule_limit = 0
+        self.evicted_budget = 0
+
+        # snapshot: son kaydedilen durumdan beri değişiklik var mı?
+        self._mutations = 0
+        self._saved_mutations = 0
+        # snapshot artımlı: key başına encode edilmiş JSON parçası saklanır,
+        # her save'de sadece o arada değişen (_dirty) key'ler yeniden encode edilir
+        self._dirty = set()
+        self._fragments: Dict[Tuple[str, ContextKey], str] = {}
+        self._save_lock = threading.Lock()
+
+        # (rule_id, key) -> restore edilen en yeni event'in ts'i; snapshot bu
+        # ana kadarki event'leri zaten içeriyor, tekrar okunanlar sayılmaz
+        self._restored_until: Dict[Tuple[str, ContextKey], float] = {}
+        self.skipped_replayed = 0
+        # yüklenen snapshot'ın saved_at'i (epoch), load edilmediyse None
+        self.restored_at = None
 
     # --------------------------------------------------
     # INTERNAL HELPERS
@@ -61,23 +205,119 @@ class CorrelationContext:
 
         removed = before - len(dq)
         if removed > 0:
+            self._total_events -= removed
             logger.debug(
                 f"[CTX][PRUNE] removed={removed} remaining={len(dq)}"
             )
 
     def _ensure_key_limit(self, rule_id: str):
         """
-        Enforce max_keys_per_rule using FIFO eviction.
+        Enforce max_keys_per_rule; drops the least recently active key.
         """
         rule_bucket = self._store[rule_id]
-        if len(rule_bucket) <= self.max_keys_per_rule:
+
+        while len(rule_bucket) > self.max_keys_per_rule:
+            oldest_key = next(iter(rule_bucket))
+            if not self.evicted_rule_limit:
+                logger.warning(
+                    f"[CTX][LIMIT] rule={rule_id} reached {self.max_keys_per_rule} keys, "
+                    f"evicting least recently active keys"
+                )
+            logger.debug(
+                f"[CTX][LIMIT] rule={rule_id} dropping least recent key={oldest_key}"
+            )
+            self._remove_key(rule_id, oldest_key)
+            self.evicted_rule_limit += 1
+
+    def _ensure_budget(self):
+        """
+        Enforce the global key / event budget across all rules (LRU).
+        The most recently touched key is never evicted.
+        """
+        lru = self._lru
+
+        while len(lru) > 1 and (
+            len(lru) > self.max_total_keys or self._total_events > self.max_total_events
+        ):
+            rule_id, key = next(iter(lru))
+            if not self.evicted_budget:
+                logger.warning(
+                    f"[CTX][BUDGET] budget reached (keys={len(lru)}, events={self._total_events}), "
+                    f"evicting least recently active keys"
+                )
+            logger.debug(f"[CTX][BUDGET] rule={rule_id} dropping key={key}")
+            self._remove_key(rule_id, key)
+            self.evicted_budget += 1
+
+    def _remove_key(self, rule_id: str, key: ContextKey):
+        rule_bucket = self._store.get(rule_id)
+        dq = rule_bucket.pop(key, None) if rule_bucket is not None else None
+        if dq is None:
             return
 
-        oldest_key = next(iter(rule_bucket))
-        logger.warning(
-            f"[CTX][LIMIT] rule={rule_id} dropping oldest key={oldest_key}"
-        )
-        del rule_bucket[oldest_key]
+        ref = (rule_id, key)
+        self._total_events -= len(dq)
+        self._mutations += 1
+        self._dirty.discard(ref)
+        self._lru.pop(ref, None)
+        # wheel'deki kayıt bayatlar; tetiklendiğinde token eşleşmediği için atlanır
+        self._armed.pop(ref, None)
+
+    def _arm(self, ref: Tuple[str, ContextKey], deadline: float):
+        token = next(self._tokens)
+        self._armed[ref] = token
+        self._wheel.schedule((ref, token), deadline)
+
+        # silinen key'lerin bayat kayıtları wheel'de deadline'a kadar kalır;
+        # yüksek cardinality altında sınırsız birikmesin
+        if self._wheel.pending > 2 * self.max_total_keys + 1024:
+            self._compact_timers()
+
+    def _compact_timers(self):
+        """Wheel'i sadece canlı key'lerin timer'larıyla yeniden kurar (O(canlı key))."""
+        now = self._now()
+        armed = list(self._armed)
+
+        self._wheel = TimerWheel(resolution=self._wheel.resolution, now=now)
+        self._armed = {}
+
+        for ref in armed:
+            rule_id, key = ref
+            dq = self._store[rule_id].get(key)
+            deadline = dq[-1]["ts"] + self._windows.get(rule_id, self.default_window) if dq else now
+            token = next(self._tokens)
+            self._armed[ref] = token
+            self._wheel.schedule((ref, token), deadline)
+
+        logger.debug(f"[CTX][TIMERS] compacted to {len(armed)} timers")
+
+    def _advance(self, now: float) -> int:
+        """Timer wheel'i ilerletir, penceresi dolan key'leri siler."""
+        removed = 0
+
+        for ref, token in self._wheel.advance(now):
+            if self._armed.get(ref) != token:
+                continue
+            del self._armed[ref]
+
+            rule_id, key = ref
+            rule_bucket = self._store.get(rule_id)
+            dq = rule_bucket.get(key) if rule_bucket is not None else None
+            if dq is None:
+                continue
+
+            deadline = dq[-1]["ts"] + self._windows.get(rule_id, self.default_window) if dq else 0
+            if deadline > now:
+                # key bu arada yeni event aldı → yeni son tarihe kur
+                self._arm(ref, deadline)
+                continue
+
+            logger.debug(f"[CTX][EXPIRE] rule={rule_id} key={key}")
+            self._remove_key(rule_id, key)
+            removed += 1
+
+        self.expired_keys += removed
+        return removed
 
     # --------------------------------------------------
     # PUBLIC API
@@ -99,31 +339,57 @@ class CorrelationContext:
         - ts (epoch seconds)
         """
         window = window_seconds or self.default_window
-        rule_bucket = self._store[rule_id]
-
-        self._ensure_key_limit(rule_id)
-
-        if key not in rule_bucket:
-            logger.debug(f"[CTX][NEW_KEY] rule={rule_id} key={key}")
-            rule_bucket[key] = deque(maxlen=self.max_events_per_key)
-
-        dq = rule_bucket[key]
+        ts = self._normalize_ts(event.get("timestamp"))
+        ref = (rule_id, key)
+
+        with self._lock:
+            # snapshot ts'leri 3 haneye yuvarlanmış saklanır
+            if self._restored_until and round(ts, 3) <= self._restored_until.get(ref, float("-inf")):
+                # snapshot'ta zaten var (restart sonrası tekrar okunan satır)
+                self.skipped_replayed += 1
+                logger.debug(f"[CTX][REPLAY] rule={rule_id} key={key} ts={ts} skipped")
+                return
+
+            self._advance(self._now())
+            self._windows[rule_id] = window
+
+            rule_bucket = self._store[rule_id]
+
+            dq = rule_bucket.get(key)
+            if dq is None:
+                logger.debug(f"[CTX][NEW_KEY] rule={rule_id} key={key}")
+                dq = rule_bucket[key] = deque(maxlen=self.max_events_per_key)
+                self._lru[ref] = None
+                self._ensure_key_limit(rule_id)
+            else:
+                rule_bucket.move_to_end(key)
+                self._lru.move_to_end(ref)
+
+            # prune expired before insert
+            self._prune_deque(dq, window)
+
+            event_ref: EventRef = {
+                "event_id": event.get("id"),
+                "event_type": event.get("event_type"),
+                "ts": ts,
+            }
 
-        # prune expired before insert
-        self._prune_deque(dq, window)
+            if len(dq) == dq.maxlen:
+                self._total_events -= 1  # deque en eskiyi kendisi atar
+            dq.append(event_ref)
+            self._total_events += 1
+            self._mutations += 1
+            self._dirty.add(ref)
 
-        event_ref: EventRef = {
-            "event_id": event.get("id"),
-            "event_type": event.get("event_type"),
-            "ts": self._normalize_ts(event.get("timestamp")),
-        }
+            if ref not in self._armed:
+                self._arm(ref, event_ref["ts"] + window)
 
-        dq.append(event_ref)
+            self._ensure_budget()
 
-        logger.debug(
-            f"[CTX][ADD] rule={rule_id} key={key} "
-            f"count={len(dq)} ts={event_ref['ts']}"
-        )
+            logger.debug(
+                f"[CTX][ADD] rule={rule_id} key={key} "
+                f"count={len(dq)} ts={event_ref['ts']}"
+            )
 
     def get(
         self,
@@ -136,53 +402,271 @@ class CorrelationContext:
         Retrieve active event references for rule + key.
         """
         window = window_seconds or self.default_window
-        rule_bucket = self._store.get(rule_id)
 
-        if not rule_bucket:
-            logger.debug(f"[CTX][GET] rule={rule_id} no bucket")
-            return []
+        with self._lock:
+            rule_bucket = self._store.get(rule_id)
 
-        dq = rule_bucket.get(key)
-        if not dq:
-            logger.debug(f"[CTX][GET] rule={rule_id} key={key} not found")
-            return []
+            if not rule_bucket:
+                logger.debug(f"[CTX][GET] rule={rule_id} no bucket")
+                return []
 
-        self._prune_deque(dq, window)
+            dq = rule_bucket.get(key)
+            if not dq:
+                logger.debug(f"[CTX][GET] rule={rule_id} key={key} not found")
+                return []
 
-        logger.debug(
-            f"[CTX][GET] rule={rule_id} key={key} count={len(dq)}"
-        )
-        return list(dq)
+            self._prune_deque(dq, window)
+
+            logger.debug(
+                f"[CTX][GET] rule={rule_id} key={key} count={len(dq)}"
+            )
+            return list(dq)
+
+    def count(
+        self,
+        *,
+        rule_id: str,
+        key: ContextKey,
+        window_seconds: int | None = None,
+    ) -> int:
+        """
+        Number of active events for rule + key (prunes, no copy).
+        Threshold checks use this; get() is only needed to build the alert.
+        """
+        with self._lock:
+            rule_bucket = self._store.get(rule_id)
+            dq = rule_bucket.get(key) if rule_bucket else None
+            if not dq:
+                return 0
+
+            self._prune_deque(dq, window_seconds or self.default_window)
+            return len(dq)
+
+    def expire(self) -> int:
+        """
+        Drop keys whose newest event is outside the rule's window.
+        add() already advances the timing wheel; RuleEngine also calls this
+        periodically so idle keys go away without new traffic.
+        """
+        with self._lock:
+            now = self._now()
+            removed = self._advance(now)
+
+            if self._restored_until:
+                # pencereden çıkmış restore sınırları: tekrar okunan event'ler
+                # artık pencere dışı, sınırı tutmaya gerek yok
+                self._restored_until = {
+                    ref: until
+                    for ref, until in self._restored_until.items()
+                    if until + self._windows.get(ref[0], self.default_window) >= now
+                }
+
+        if removed:
+            logger.debug(f"[CTX][EXPIRE] removed_keys={removed}")
+        return removed
 
     def clear_key(self, *, rule_id: str, key: ContextKey):
         """
         Clear correlation state for a specific key.
         """
-        rule_bucket = self._store.get(rule_id)
-        if not rule_bucket:
-            return
+        with self._lock:
+            rule_bucket = self._store.get(rule_id)
+            if not rule_bucket:
+                return
 
-        if key in rule_bucket:
-            logger.debug(f"[CTX][CLEAR_KEY] rule={rule_id} key={key}")
+            if key in rule_bucket:
+                logger.debug(f"[CTX][CLEAR_KEY] rule={rule_id} key={key}")
 
-        rule_bucket.pop(key, None)
+            self._remove_key(rule_id, key)
 
     def clear_rule(self, *, rule_id: str):
         """
         Clear all state for a rule.
         """
-        if rule_id in self._store:
-            logger.debug(f"[CTX][CLEAR_RULE] rule={rule_id}")
-        self._store.pop(rule_id, None)
+        with self._lock:
+            if rule_id in self._store:
+                logger.debug(f"[CTX][CLEAR_RULE] rule={rule_id}")
+            for key in list(self._store.get(rule_id, ())):
+                self._remove_key(rule_id, key)
+            self._store.pop(rule_id, None)
 
     def stats(self) -> Dict[str, Any]:
         """
         Lightweight introspection for debugging / health checks.
+        "_total": global budget usage (approx_bytes is an estimate).
         """
-        return {
-            rule_id: {
-                "keys": len(bucket),
-                "events": sum(len(dq) for dq in bucket.values()),
+        with self._lock:
+            stats = {
+                rule_id: {
+                    "keys": len(bucket),
+                    "events": sum(len(dq) for dq in bucket.values()),
+                }
+                for rule_id, bucket in self._store.items()
             }
-            for rule_id, bucket in self._store.items()
-        }
+
+            stats["_total"] = {
+                "keys": len(self._lru),
+                "events": self._total_events,
+                "max_total_keys": self.max_total_keys,
+                "max_total_events": self.max_total_events,
+                "approx_bytes": len(self._lru) * KEY_BYTES + self._total_events * EVENT_REF_BYTES,
+                "timers": self._wheel.pending,
+                "expired_keys": self.expired_keys,
+                "evicted_rule_limit": self.evicted_rule_limit,
+                "evicted_budget": self.evicted_budget,
+                "restored_keys": len(self._restored_until),
+                "skipped_replayed": self.skipped_replayed,
+            }
+
+        return stats
+
+    # --------------------------------------------------
+    # SNAPSHOT / RESTORE
+    # --------------------------------------------------
+    def save(self, path: str) -> bool:
+        """
+        Writes a compact snapshot atomically (temp → fsync → rename).
+        Skipped when nothing changed since the last save / load.
+
+        Incremental: each key's JSON fragment is cached and only keys touched
+        since the previous save are re-encoded; the file is the cached
+        fragments joined in LRU order. The lock is held only while the key
+        order and the dirty deques are copied.
+        """
+        with self._save_lock:
+            with self._lock:
+                mutations = self._mutations
+                if mutations == self._saved_mutations:
+                    return False
+
+                windows = dict(self._windows)
+                order = list(self._lru)
+                store = self._store
+                dirty = [(ref, list(store[ref[0]][ref[1]])) for ref in self._dirty]
+                self._dirty = set()
+
+            fragments = self._fragments
+            types = self.SNAPSHOT_KEY_TYPES
+            for (rule_id, key), refs in dirty:
+                if not refs or not all(isinstance(part, types) for part in key):
+                    fragments.pop((rule_id, key), None)
+                    continue
+                fragments[(rule_id, key)] = json.dumps(
+                    [
+                        rule_id,
+                        list(key),
+                        [[r["event_id"], r["event_type"], round(r["ts"], 3)] for r in refs],
+                    ],
+                    separators=(",", ":"),
+                    default=str,
+                )
+
+            # silinen key'lerin parçaları burada düşer
+            self._fragments = fragments = {
+                ref: fragments[ref] for ref in order if ref in fragments
+            }
+
+            header = json.dumps(
+                {
+                    "version": self.SNAPSHOT_VERSION,
+                    "saved_at": round(self._now(), 3),
+                    "windows": windows,
+                },
+                separators=(",", ":"),
+            )
+            # "keys": global LRU sırasıyla (en az yakın zamanda aktif olan önce)
+            text = header[:-1] + ',"keys":[' + ",".join(fragments.values()) + "]}"
+
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            atomic_write_text(path, text)
+
+            with self._lock:
+                self._saved_mutations = max(self._saved_mutations, mutations)
+
+        logger.debug(f"[CTX][SNAPSHOT] saved keys={len(fragments)} encoded={len(dirty)} path={path}")
+        return True
+
+    def load(self, path: str) -> int:
+        """Restores a snapshot written by save(); returns restored key count."""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"[CTX][RESTORE] unreadable snapshot {path}: {e}")
+            return 0
+
+        return self.restore(data)
+
+    def restore(self, data: Dict[str, Any]) -> int:
+        """
+        Loads snapshot data; events outside their rule's window (as of now)
+        are dropped, keys left without events are skipped. Keys that already
+        have live state are kept as they are.
+
+        For every restored key the newest event's ts is remembered; add()
+        ignores events at or before it (they are already in the snapshot).
+        """
+        if not isinstance(data, dict) or data.get("version") != self.SNAPSHOT_VERSION:
+            logger.warning("[CTX][RESTORE] unsupported snapshot format, ignoring")
+            return 0
+
+        now = self._now()
+        restored = 0
+        dropped = 0
+
+        try:
+            self.restored_at = float(data.get("saved_at"))
+        except (TypeError, ValueError):
+            self.restored_at = None
+
+        with self._lock:
+            self._advance(now)
+
+            for rule_id, window in (data.get("windows") or {}).items():
+                self._windows.setdefault(rule_id, window)
+
+            for entry in data.get("keys") or ():
+                try:
+                    rule_id, key, refs = entry
+                    window = self._windows.get(rule_id, self.default_window)
+                    cutoff = now - window
+
+                    refs = [
+                        {"event_id": event_id, "event_type": event_type, "ts": float(ts)}
+                        for event_id, event_type, ts in refs[-self.max_events_per_key:]
+                        if ts >= cutoff
+                    ]
+                    key = tuple(key)
+                    hash(key)
+                except (TypeError, ValueError):
+                    dropped += 1
+                    continue
+
+                if not refs:
+                    dropped += 1
+                    continue
+
+                rule_bucket = self._store[rule_id]
+                if key in rule_bucket:
+                    continue
+
+                ref = (rule_id, key)
+                rule_bucket[key] = deque(refs, maxlen=self.max_events_per_key)
+                self._lru[ref] = None
+                self._total_events += len(refs)
+
+                self._ensure_key_limit(rule_id)
+                self._arm(ref, refs[-1]["ts"] + window)
+                self._restored_until[ref] = max(r["ts"] for r in refs)
+                self._dirty.add(ref)
+                restored += 1
+
+            self._ensure_budget()
+            self._saved_mutations = self._mutations
+
+        logger.info(f"[CTX][RESTORE] restored keys={restored}, dropped expired/invalid={dropped}")
+        return restored
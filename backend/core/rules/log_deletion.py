@@ -1,4 +1,5 @@
 from backend.core.rules.base import StatelessRule
+from backend.core.utils.indicators import IndicatorMatcher
 
 class LogDeletionRule(StatelessRule):
     rule_id = "LOG_001"
@@ -10,28 +11,28 @@ class LogDeletionRule(StatelessRule):
         "/var/log/auth", "/var/log/syslog", "/var/log/messages",
         "/var/log/hids", ".bash_history", ".zsh_history", "/var/log/hids/app.log"
     ]
+    DELETE_COMMANDS = ["truncate", "rm", "shred"]
+
+    TARGETS = IndicatorMatcher(SUSPICIOUS_TARGETS)
+    COMMANDS = IndicatorMatcher(DELETE_COMMANDS)
 
     def supports(self, event_type: str) -> bool:
         return event_type in ["PROCESS_NEW", "LOG_EVENT"]
 
     def match(self, event: dict) -> bool:
         if event.get("type") == "LOG_EVENT":
-            content = event.get("message", "").lower()
-            if not any(cmd in content for cmd in ["truncate", "rm", "shred"]):
+            content = event.get("message", "")
+            if not self.COMMANDS.search(content):
                 return False
         else:
             raw_cmdline = event.get("cmdline", "")
-            content = " ".join(raw_cmdline).lower() if isinstance(raw_cmdline, list) else str(raw_cmdline).lower()
-            
-            pname = (event.get("process_name") or "").lower()
-            if pname not in ["rm", "truncate", "shred"]:
-                return False
+            content = " ".join(raw_cmdline) if isinstance(raw_cmdline, list) else str(raw_cmdline)
 
-        for target in self.SUSPICIOUS_TARGETS:
-            if target.lower() in content:
-                return True
+            pname = event.get("process_name")
+            if not self.COMMANDS.contains(pname):
+                return False
 
-        return False
+        return self.TARGETS.search(content) is not None
 
     def build_alert(self, event: dict) -> dict:
         user = event.get("username") or event.get("user", "unknown")
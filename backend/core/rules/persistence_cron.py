@@ -1,4 +1,5 @@
 from backend.core.rules.base import StatelessRule
+from backend.core.utils.indicators import IndicatorMatcher
 from backend.logger import logger
 from typing import Dict, Any
 
@@ -8,6 +9,9 @@ class PersistenceCronRule(StatelessRule):
     severity = "HIGH"
     event_prefix = ""  
 
+    CRON_TARGETS = IndicatorMatcher(["/etc/cron", "/var/spool/cron", "crontab"])
+    CRONTAB_ACTIONS = IndicatorMatcher(["edit", "replace", "delete", "list"])
+
     def supports(self, event_type: str) -> bool:
         """Kuralın hangi olay tiplerini desteklediğini belirtir"""
         return event_type in ["PROCESS_NEW", "LOG_EVENT"]
@@ -16,16 +20,15 @@ class PersistenceCronRule(StatelessRule):
         if event.get("type") == "PROCESS_NEW":
             pname = (event.get("process_name") or "").lower()
             raw_cmd = event.get("cmdline", "")
-            cmdline = " ".join(raw_cmd).lower() if isinstance(raw_cmd, list) else str(raw_cmd).lower()
+            cmdline = " ".join(raw_cmd) if isinstance(raw_cmd, list) else str(raw_cmd)
 
-            targets = ["/etc/cron", "/var/spool/cron", "crontab"]
-            if any(t in cmdline for t in targets) or "cron" in pname:
+            if "cron" in pname or self.CRON_TARGETS.search(cmdline):
                 logger.info(f"[{self.rule_id}] Process-based cron activity detected: {cmdline}")
                 return True
 
         if event.get("type") == "LOG_EVENT":
             msg = event.get("message", "").lower()
-            if "crontab" in msg and any(action in msg for action in ["edit", "replace", "delete", "list"]):
+            if "crontab" in msg and self.CRONTAB_ACTIONS.search(msg):
                 logger.info(f"[{self.rule_id}] Log-based cron activity detected: {msg}")
                 return True
 
@@ -28,19 +28,23 @@ class HighResourceUsageRule(ThresholdRule):
         mem = event.get("ram_percent", 0)
         return cpu > self.CPU_THRESHOLD or mem > self.MEM_THRESHOLD
 
-    def consume(self, event: Dict[str, Any], context: Any) -> None:
+    def consume(self, event: Dict[str, Any], context: Any) -> List[tuple]:
         """Eşik aşılıyorsa olayı CorrelationContext hafızasına ekle"""
         if not self.is_relevant(event):
-            return
+            return []
             
-        if self.match_condition(event):
-            logger.debug(f"[{self.rule_id}] High usage detected: CPU %{event.get('cpu_percent')}")
-            context.add(
-                rule_id=self.rule_id,
-                key=self.get_key(event),
-                event=event,
-                window_seconds=self.window_seconds,
-            )
+        if not self.match_condition(event):
+            return []
+
+        logger.debug(f"[{self.rule_id}] High usage detected: CPU %{event.get('cpu_percent')}")
+        key = self.get_key(event)
+        context.add(
+            rule_id=self.rule_id,
+            key=key,
+            event=event,
+            window_seconds=self.window_seconds,
+        )
+        return [key]
 
     def create_alert(self, key: tuple, events: List[Any]) -> Dict[str, Any]:
         """Eşik aşıldığında asıl alarm payload'unu oluştur"""
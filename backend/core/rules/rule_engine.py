@@ -1,4 +1,5 @@
 # backend/core/rules/rule_engine.py
+import time
 from typing import Dict, List, Any
 
 from backend.logger import logger
@@ -6,20 +7,33 @@ from backend.core.rules.base import BaseRule, StatelessRule, StatefulRule
 
 
 class RuleEngine:
+    """
+    Event tipi → uygulanacak kurallar indeksi (dispatch table):
+    bir event tipi ilk görüldüğünde her kuralın supports()'u bir kez sorulur,
+    sonuç saklanır. Sonraki event'lerde sadece ilgili kurallar dolaşılır.
+
+    supports() sadece event tipine bakmalı (event içeriğine değil).
+    İndeks kural eklenince / çıkarılınca / enable-disable edilince yeniden kurulur;
+    rule.enabled doğrudan değiştirilirse invalidate() çağrılmalı.
+    """
+
+    # bundan fazla farklı event tipi görülürse indeks sıfırlanır (sınırsız büyümesin)
+    MAX_INDEXED_TYPES = 1024
+
+    # CorrelationContext'te süresi dolmuş key'lerin temizlenme aralığı (sn)
+    CONTEXT_EXPIRE_INTERVAL = 30
+
     def __init__(self, rules: List[BaseRule], context: Any = None):
         self.context = context
         self.stateless_rules: List[StatelessRule] = []
         self.stateful_rules: List[StatefulRule] = []
 
+        # event tipi → (stateless kurallar, stateful kurallar)
+        self._index: Dict[str, tuple] = {}
+        self._next_expire = time.monotonic() + self.CONTEXT_EXPIRE_INTERVAL
+
         for rule in rules:
-            if isinstance(rule, StatelessRule):
-                self.stateless_rules.append(rule)
-            elif isinstance(rule, StatefulRule):
-                self.stateful_rules.append(rule)
-            else:
-                logger.warning(
-                    f"[RULE_ENGINE] Rule {getattr(rule, 'rule_id', '?')} has unknown base class"
-                )
+            self._register(rule)
 
         logger.info(
             f"[RULE_ENGINE] Loaded "
@@ -27,6 +41,59 @@ class RuleEngine:
             f"stateful={len(self.stateful_rules)}"
         )
 
+    # ---------------------------
+    # RULE MANAGEMENT
+    # ---------------------------
+
+    def add_rule(self, rule: BaseRule) -> None:
+        if self._register(rule):
+            self.invalidate()
+            logger.info(f"[RULE_ENGINE] Rule added: {rule.rule_id}")
+
+    def remove_rule(self, rule_id: str) -> bool:
+        before = len(self.stateless_rules) + len(self.stateful_rules)
+        self.stateless_rules = [r for r in self.stateless_rules if r.rule_id != rule_id]
+        self.stateful_rules = [r for r in self.stateful_rules if r.rule_id != rule_id]
+
+        removed = before != len(self.stateless_rules) + len(self.stateful_rules)
+        if removed:
+            self.invalidate()
+            logger.info(f"[RULE_ENGINE] Rule removed: {rule_id}")
+        return removed
+
+    def set_enabled(self, rule_id: str, enabled: bool) -> bool:
+        found = False
+        for rule in self.stateless_rules + self.stateful_rules:
+            if rule.rule_id == rule_id:
+                rule.enabled = enabled
+                found = True
+
+        if found:
+            self.invalidate()
+            logger.info(f"[RULE_ENGINE] Rule {rule_id} {'enabled' if enabled else 'disabled'}")
+        return found
+
+    def invalidate(self) -> None:
+        """Dispatch indeksini sıfırlar; bir sonraki event'te tip başına yeniden kurulur."""
+        self._index = {}
+
+    def rules_for(self, event_type: str) -> tuple:
+        """→ (stateless kurallar, stateful kurallar) — bu event tipine uygulananlar."""
+        entry = self._index.get(event_type)
+        if entry is not None:
+            return entry
+
+        entry = (
+            tuple(r for r in self.stateless_rules if r.enabled and r.supports(event_type)),
+            tuple(r for r in self.stateful_rules if r.enabled and r.supports(event_type)),
+        )
+
+        index = self._index
+        if len(index) >= self.MAX_INDEXED_TYPES:
+            index = self._index = {}
+        index[event_type] = entry
+        return entry
+
     def process(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Returns list of:
@@ -38,14 +105,12 @@ class RuleEngine:
         results: List[Dict[str, Any]] = []
 
         raw_type = event.get("type", "")
+        stateless_rules, stateful_rules = self.rules_for(raw_type)
 
         # ---------------------------
         # STATELESS
         # ---------------------------
-        for rule in self.stateless_rules:
-            if not rule.supports(raw_type):
-                continue
-
+        for rule in stateless_rules:
             try:
                 if rule.match(event):
                     alert = rule.build_alert(event)
@@ -66,14 +131,20 @@ class RuleEngine:
         # ---------------------------
         # STATEFUL
         # ---------------------------
-        for rule in self.stateful_rules:
-            if not rule.supports(raw_type):
-                continue
+        if stateful_rules and self.context is not None:
+            self._maybe_expire_context()
 
+        for rule in stateful_rules:
             try:
-                rule.consume(event, context=self.context)
-
-                produced = rule.evaluate(self.context)
+                touched = rule.consume(event, context=self.context)
+
+                # [] → key değişmedi; [key, ...] → sadece o key'ler; None → tam tarama
+                if touched is None:
+                    produced = rule.evaluate(self.context)
+                elif touched:
+                    produced = rule.evaluate(self.context, keys=touched)
+                else:
+                    continue
                 
                 if produced:
                     for item in produced:
@@ -91,4 +162,31 @@ class RuleEngine:
                     f"[RULE_ENGINE] Stateful rule failed {rule.rule_id}: {e}"
                 )
 
-        return results
\ No newline at end of file
+        return results
+
+    # ---------------------------
+    # HELPERS
+    # ---------------------------
+
+    def _maybe_expire_context(self) -> None:
+        now = time.monotonic()
+        if now < self._next_expire:
+            return
+        self._next_expire = now + self.CONTEXT_EXPIRE_INTERVAL
+
+        try:
+            self.context.expire()
+        except Exception:
+            logger.exception("[RULE_ENGINE] Context expiry failed")
+
+    def _register(self, rule: BaseRule) -> bool:
+        if isinstance(rule, StatelessRule):
+            self.stateless_rules.append(rule)
+        elif isinstance(rule, StatefulRule):
+            self.stateful_rules.append(rule)
+        else:
+            logger.warning(
+                f"[RULE_ENGINE] Rule {getattr(rule, 'rule_id', '?')} has unknown base class"
+            )
+            return False
+        return True
@@ -1,5 +1,6 @@
 from backend.core.rules.base import StatelessRule
-from backend.core.utils.sensitive_files import SENSITIVE_FILES, SENSITIVE_ACCESS_WHITELIST
+from backend.core.utils.indicators import sensitive_files
+from backend.core.utils.sensitive_files import SENSITIVE_ACCESS_WHITELIST
 from backend.logger import logger
 
 class SensitiveFileAccessRule(StatelessRule):
@@ -8,30 +9,56 @@ class SensitiveFileAccessRule(StatelessRule):
     severity = "HIGH"
     event_prefix = "PROCESS_"
 
+    # PROCESS_NEW: psutil snapshot (cmdline'dan tahmin)
+    # PROCESS_EXEC / PROCESS_FILE_ACCESS: auditd (gerçek argv + dokunulan path'ler)
+    EVENT_TYPES = ("PROCESS_NEW", "PROCESS_EXEC", "PROCESS_FILE_ACCESS")
+
+    WHITELIST = frozenset(SENSITIVE_ACCESS_WHITELIST)
+
     def match(self, event: dict) -> bool:
-        if event.get("type") != "PROCESS_NEW":
+        etype = event.get("type")
+        if etype not in self.EVENT_TYPES:
             return False
 
+        if etype != "PROCESS_NEW":
+            return self._match_audit(event)
+
         raw_cmdline = event.get("cmdline") or ""
-        
+
         if isinstance(raw_cmdline, list):
-            cmdline_str = " ".join(raw_cmdline).lower()
+            cmdline_str = " ".join(raw_cmdline)
         else:
-            cmdline_str = str(raw_cmdline).lower()
+            cmdline_str = str(raw_cmdline)
 
         pname = (event.get("process_name") or "").lower()
 
         logger.debug(f"[{self.rule_id}] Checking: {pname} | Cmd: {cmdline_str}")
 
         # WHITELIST CHECK
-        if pname in SENSITIVE_ACCESS_WHITELIST:
+        if pname in self.WHITELIST:
+            return False
+
+        # SENSETIVE FILE CHECK (glob'lar dahil, tek tarama)
+        target = sensitive_files.search(cmdline_str)
+        if target:
+            logger.info(f"[{self.rule_id}] MATCH! Target: {target} in {cmdline_str}")
+            return True
+
+        return False
+
+    def _match_audit(self, event: dict) -> bool:
+        pname = (event.get("process_name") or "").lower()
+        if pname in self.WHITELIST:
             return False
 
-        # SENSETIVE FILE CHECK
-        for s_file in SENSITIVE_FILES:
-            clean_path = s_file.replace("*", "").lower()
-            if clean_path in cmdline_str:
-                logger.info(f"[{self.rule_id}] MATCH! Target: {clean_path} in {cmdline_str}")
+        # kernel'in çözdüğü path'ler + argv'deki mutlak path'ler (ör: cat /etc/shadow)
+        targets = list(event.get("paths") or ())
+        targets += [arg for arg in event.get("cmdline") or () if arg.startswith("/")]
+
+        for target in targets:
+            indicator = sensitive_files.match_path(target)
+            if indicator:
+                logger.info(f"[{self.rule_id}] MATCH! Target: {target} ({indicator}) by {pname}")
                 return True
 
         return False
@@ -1,6 +1,6 @@
 # backend/core/rules/suspicious_process.py
 from backend.core.rules.base import StatelessRule
-from backend.core.utils.hacking_tools import HACKING_TOOLS
+from backend.core.utils.indicators import hacking_tools
 
 
 class SuspiciousProcessRule(StatelessRule):
@@ -13,7 +13,7 @@ class SuspiciousProcessRule(StatelessRule):
         return (event.get("process_name") or event.get("name") or "").lower()
 
     def match(self, event: dict) -> bool:
-        return self._get_process_name(event) in HACKING_TOOLS
+        return hacking_tools.contains(self._get_process_name(event))
 
     def build_alert(self, event: dict) -> dict:
         pname = self._get_process_name(event)
@@ -12,8 +12,11 @@ class SuspiciousShellRule(StatelessRule):
     
     SHELL_PROCESSES = ["sh", "bash", "zsh", "dash", "rbash"]
 
+    # PROCESS_EXEC: auditd execve kaydı (parent_name audit akışından gelir)
+    EVENT_TYPES = ("PROCESS_NEW", "PROCESS_EXEC")
+
     def match(self, event: Dict[str, Any]) -> bool:
-        if event.get("type") != "PROCESS_NEW":
+        if event.get("type") not in self.EVENT_TYPES:
             return False
 
         pname = (event.get("process_name") or "").lower()
@@ -1,4 +1,5 @@
 from backend.core.rules.base import StatelessRule
+from backend.core.utils.indicators import IndicatorMatcher
 from backend.logger import logger
 from typing import Dict, Any
 
@@ -8,6 +9,11 @@ class UserCreationRule(StatelessRule):
     severity = "CRITICAL"
     event_prefix = "LOG_" 
 
+    # Kritik log desenleri:
+    # "new user" -> adduser/useradd komutu sonrası oluşur
+    # "new group" -> Genellikle kullanıcıyla beraber oluşur
+    KEYWORDS = IndicatorMatcher(["new user", "new group", "useradd", "adduser"])
+
     def supports(self, event_type: str) -> bool:
         return event_type == "LOG_EVENT"
 
@@ -15,15 +21,9 @@ class UserCreationRule(StatelessRule):
         if event.get("type") != "LOG_EVENT":
             return False
 
-        msg = event.get("message", "").lower()
-        
-        # Kritik log desenleri:
-        # "new user" -> adduser/useradd komutu sonrası oluşur
-        # "new group" -> Genellikle kullanıcıyla beraber oluşur
-        # "password changed" -> usermod veya passwd değişikliği
-        keywords = ["new user", "new group", "useradd", "adduser"]
-        
-        if any(key in msg for key in keywords):
+        msg = event.get("message", "")
+
+        if self.KEYWORDS.search(msg):
             logger.info(f"[{self.rule_id}] Pattern matched in logs: {msg}")
             return True
 
@@ -8,6 +8,10 @@ from backend.core.collector.logs_collector import LogsCollector
 
 from backend.core.event_dispatcher.event_dispatcher import EventDispatcher
 from backend.core.parser.LogDispatcher import LogDispatcher
+from backend.core.parser.parse_pool import ParsePool
+from backend.core.parser.line_collapser import LineCollapser
+from backend.core.parser.parse_telemetry import ParseTelemetry
+from backend.core.parser.ssh_sessions import SSHSessionTracker
 
 from backend.logger import logger
 
@@ -26,7 +30,7 @@ class Scheduler:
     • ProcessCollector → EventDispatcher
     • NetworkCollector → EventDispatcher
 
-    • LogsCollector → LogDispatcher → EventDispatcher
+    • LogsCollector → LogDispatcher → SSHSessionTracker → EventDispatcher
     ============================================================
     """
 
@@ -35,19 +39,58 @@ class Scheduler:
     NETWORK_INTERVAL = 15
     LOG_INTERVAL = 3
 
+    # >0 → log batch'leri bu kadar worker process'te parse edilir (0 = inline)
+    PARSE_WORKERS = 0
+
+    # Ardışık aynı log satırlarını parse öncesi tek event'e indir (repeat_count)
+    COLLAPSE_REPEATS = True
+
+    # sshd bağlantı gürültüsünü PID başına tek SSH_SESSION event'ine indir
+    TRACK_SSH_SESSIONS = True
+
+    # Log satırları collector'dan "str" veya "bytes" olarak gelir (LogsCollector.LINE_MODE).
+    # "bytes" decode'u parse aşamasına taşır; en çok PARSE_WORKERS > 0 ve
+    # COLLAPSE_REPEATS = False iken kazandırır (collapser satırları yine decode eder).
+    LOG_LINE_MODE = "str"
+
+    # Rule correlation penceresi (CorrelationContext) restart'ta sıfırlanmasın:
+    # periyodik atomic snapshot, açılışta geri yükleme (süresi dolanlar atılır)
+    CONTEXT_SNAPSHOT_FILE = "/var/lib/hids/correlation_context.json"
+    CONTEXT_SNAPSHOT_INTERVAL = 30
+
     def __init__(self):
         # COLLECTORS
         self.metrics_collector = MetricsCollector()
         self.process_collector = ProcessCollector()
         self.network_collector = NetworkCollector()
-        self.log_collector = LogsCollector()
+        self.log_collector = LogsCollector(line_mode=self.LOG_LINE_MODE)
 
         # DISPATCHER
         self.event_dispatcher = EventDispatcher()
         self.log_dispatcher = LogDispatcher()
+        self.parse_pool = (
+            ParsePool(self.PARSE_WORKERS, self.log_dispatcher)
+            if self.PARSE_WORKERS > 0 else None
+        )
+        self.line_collapser = LineCollapser() if self.COLLAPSE_REPEATS else None
+        self.parse_telemetry = ParseTelemetry()
+        self.ssh_sessions = SSHSessionTracker() if self.TRACK_SSH_SESSIONS else None
 
         self.heartbeat = {}
         self.threads = []
+        self._stop_event = threading.Event()
+
+        # source → dispatch edilmiş son batch'in checkpoint'i / commit'e verilen son konum
+        self._log_positions = {}
+        self._log_committed = {}
+
+        # restart: snapshot anından eski log event'leri zaten rule engine'den
+        # geçmişti (checkpoint geride kalmış olabilir) → ilk okuma turunda
+        # tekrar sayılmazlar (epoch, None → kontrol yok)
+        self._replay_until = None
+
+        self._restore_context()
+        self._next_context_snapshot = time.monotonic() + self.CONTEXT_SNAPSHOT_INTERVAL
 
         logger.info("[Scheduler] Initialized")
 
@@ -55,11 +98,33 @@ class Scheduler:
     # HEALTH LOOP
     # ---------------------------------------------------------
     def _run_health_loop(self):
-        while True:
+        while not self._stop_event.is_set():
             now = time.time()
             self.heartbeat["HealthThread"] = now
             self.heartbeat["MainThread"] = now
-            time.sleep(2)
+
+            if time.monotonic() >= self._next_context_snapshot:
+                self._next_context_snapshot = time.monotonic() + self.CONTEXT_SNAPSHOT_INTERVAL
+                self._snapshot_context()
+
+            self._stop_event.wait(2)
+
+    # ---------------------------------------------------------
+    # CORRELATION CONTEXT SNAPSHOT
+    # ---------------------------------------------------------
+    def _restore_context(self):
+        try:
+            context = self.event_dispatcher.context
+            context.load(self.CONTEXT_SNAPSHOT_FILE)
+            self._replay_until = context.restored_at
+        except Exception:
+            logger.exception("[Scheduler] Correlation context restore failed")
+
+    def _snapshot_context(self):
+        try:
+            self.event_dispatcher.context.save(self.CONTEXT_SNAPSHOT_FILE)
+        except Exception:
+            logger.exception("[Scheduler] Correlation context snapshot failed")
 
     # ---------------------------------------------------------
     # METRICS LOOP
@@ -68,7 +133,7 @@ class Scheduler:
         interval = self.METRICS_INTERVAL
         logger.info(f"[Scheduler] MetricsCollector started ({interval}s interval)")
 
-        while True:
+        while not self._stop_event.is_set():
             self.heartbeat["MetricsThread"] = time.time()
 
             try:
@@ -78,7 +143,7 @@ class Scheduler:
             except Exception:
                 logger.exception("[Scheduler] MetricsCollector error")
 
-            time.sleep(interval)
+            self._stop_event.wait(interval)
 
     # ---------------------------------------------------------
     # GENERIC LOOP (Process / Network)
@@ -92,7 +157,7 @@ class Scheduler:
         thread_name = threading.current_thread().name
         logger.info(f"[Scheduler] {thread_name} started ({interval}s interval)")
 
-        while True:
+        while not self._stop_event.is_set():
             self.heartbeat[thread_name] = time.time()
 
             try:
@@ -104,41 +169,155 @@ class Scheduler:
             except Exception:
                 logger.exception(f"[Scheduler] {thread_name} error")
 
-            time.sleep(interval)
+            self._stop_event.wait(interval)
 
     # ---------------------------------------------------------
     # LOG LOOP
     # ---------------------------------------------------------
     def _run_log_collector(self):
-        logger.info("[Scheduler] LogCollector started")
+        mode = "inotify" if self.log_collector.watcher else f"polling, {self.LOG_INTERVAL}s interval"
+        logger.info(f"[Scheduler] LogCollector started ({mode})")
 
-        while True:
+        # None → first pass reads every source
+        changed = None
+
+        while not self._stop_event.is_set():
             self.heartbeat["LogThread"] = time.time()
+            # source → bu döngüde dispatch edilmiş son batch'in checkpoint'i
+            delivered = {}
 
             try:
-                raw_entries = self.log_collector.collect()
-
-                for entry in raw_entries:
-                    source = entry["source"]
-                    line = entry["line"]
-
-                    parsed_event = self.log_dispatcher.dispatch(source, line)
-
-                    if not parsed_event:
-                        continue 
-
-                    parsed_event.setdefault("type", "LOG_EVENT")
-
-                    logger.debug(
-                        f"[Scheduler] Dispatching parsed log event: {parsed_event}"
-                    )
-                    self.event_dispatcher.dispatch(parsed_event)
+                for batch, result in self._parse_batches(self.log_collector.collect(changed)):
+                    # catch-up sırasında da heartbeat canlı kalsın
+                    self.heartbeat["LogThread"] = time.time()
+
+                    source = batch["source"]
+                    events = result["events"]
+                    if self.ssh_sessions:
+                        events = self.ssh_sessions.process(
+                            events, source, self._log_positions.get(source)
+                        )
+
+                    self._dispatch_log_events(events)
+
+                    self._log_positions[source] = batch["checkpoint"]
+                    delivered[source] = batch["checkpoint"]
+                    self._checkpoint_log_source(source)
+
+                # yeni satır gelmese de biten / zaman aşımına uğrayan sshd oturumları
+                # ve stateful parser'larda (auditd) tamamlanmayı bekleyen kayıtlar
+                expired = self.log_dispatcher.expire()
+                if self.ssh_sessions:
+                    expired.extend(self.ssh_sessions.expire())
+                if expired:
+                    self._dispatch_log_events(expired)
+                    self._checkpoint_log_sources()
+
+                # restart sonrası birikmiş satırlar okundu
+                self._replay_until = None
 
             except Exception:
                 logger.exception("[Scheduler] LogCollector error")
-
-            time.sleep(self.LOG_INTERVAL)
-
+                # önden okunup dispatch edilmemiş batch'ler bir sonraki turda tekrar okunsun
+                self.log_collector.rewind(delivered)
+
+            # inotify: returns as soon as a source changes (LOG_INTERVAL = heartbeat timeout)
+            # polling: sleeps LOG_INTERVAL and returns None
+            changed = self.log_collector.wait_for_changes(self.LOG_INTERVAL)
+
+        self._flush_log_state()
+
+    def _checkpoint_log_source(self, source):
+        """
+        Kaynağın offset'ini, event'leri DB'ye yazıldıktan sonra ilerletir.
+        Açık sshd oturumu varsa, özeti henüz yazılmamış satırları geçmemek için
+        en eski oturumun başladığı batch'ten önceki konumda tutulur.
+        """
+        position = self._log_positions.get(source)
+        if self.ssh_sessions:
+            held, resume = self.ssh_sessions.hold(source)
+            if held:
+                position = resume
+
+        if position is None or self._log_committed.get(source) == position:
+            return
+
+        self._log_committed[source] = position
+        self.event_dispatcher.checkpoint(
+            lambda b={"source": source, "checkpoint": position}: self.log_collector.commit(b)
+        )
+
+    def _checkpoint_log_sources(self):
+        for source in list(self._log_positions):
+            self._checkpoint_log_source(source)
+
+    def _flush_log_state(self):
+        """Kapanış: bekleyen audit kayıtlarını ve açık sshd oturumlarını özetle, offset'leri ilerlet ve diske yaz."""
+        try:
+            for name in list(self.log_dispatcher.parsers):
+                self._dispatch_log_events(self.log_dispatcher.flush(name))
+            if self.ssh_sessions:
+                self._dispatch_log_events(self.ssh_sessions.flush())
+            self._checkpoint_log_sources()
+            # kuyruktaki tüm commit'lerden sonra coalesce edilmiş offset'leri hemen yaz
+            self.event_dispatcher.checkpoint(self.log_collector.flush)
+        except Exception:
+            logger.exception("[Scheduler] Log state flush failed")
+
+
+    def _dispatch_log_events(self, events):
+        for parsed_event in events:
+            parsed_event.setdefault("type", "LOG_EVENT")
+            # log offset'ine bağlı: yazılamazsa DBWriter checkpoint'i bekletir
+            parsed_event["checkpointed"] = True
+            if self._replay_until is not None and self._is_replayed(parsed_event):
+                parsed_event["replayed"] = True
+
+            logger.debug(
+                f"[Scheduler] Dispatching parsed log event: {parsed_event}"
+            )
+            self.event_dispatcher.dispatch(parsed_event)
+
+    def _is_replayed(self, event):
+        # SSH_SESSION özetleri restart'tan önce hiç üretilmemişti
+        if event.get("event_type") == "SSH_SESSION":
+            return False
+        ts = event.get("timestamp")
+        if not hasattr(ts, "timestamp"):
+            return False
+        return ts.timestamp() <= self._replay_until
+
+    def _parse_batches(self, batches):
+        """
+        (batch, dispatch_batch sonucu) çiftleri üretir; sıra batch sırasıyla aynıdır.
+        PARSE_WORKERS > 0 ise parse worker process'lerde yapılır.
+        Her sonuç ParseTelemetry'ye işlenir (/api/system/parsers).
+        """
+        if self.line_collapser:
+            batches = self._collapse_batches(batches)
+
+        if self.parse_pool:
+            results = self.parse_pool.imap(batches)
+        else:
+            results = (
+                (batch, self.log_dispatcher.dispatch_batch(
+                    batch["parser"], batch["lines"], batch.get("repeats")
+                ))
+                for batch in batches
+            )
+
+        for batch, result in results:
+            self.parse_telemetry.record(
+                batch["source"], batch["parser"], batch["lines"], result, batch.get("repeats")
+            )
+            yield batch, result
+
+    def _collapse_batches(self, batches):
+        for batch in batches:
+            # stateful parser (auditd): çok satırlı kayıtlar, tekrar index'e bağlanamaz
+            if not self.log_dispatcher.is_stateful(batch["parser"]):
+                batch["lines"], batch["repeats"] = self.line_collapser.collapse(batch["lines"])
+            yield batch
 
     # ---------------------------------------------------------
     # START THREADS
@@ -177,6 +356,27 @@ class Scheduler:
         with scheduler_lock:
             scheduler_instance = self
 
+    def stop(self, timeout=10):
+        """
+        Döngüleri durdurur. Log thread'i çıkarken açık sshd oturumlarını
+        özetler ve offset'leri yazar; correlation context snapshot'ı alınır.
+        DBWriter bundan sonra durdurulmalı (kuyruktakileri yazması için).
+        """
+        logger.info("[Scheduler] Stopping collectors...")
+        self._stop_event.set()
+
+        deadline = time.monotonic() + timeout
+        for t in self.threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+            if t.is_alive():
+                logger.warning(f"[Scheduler] Thread did not stop in time: {t.name}")
+
+        if self.parse_pool:
+            self.parse_pool.shutdown()
+
+        self._snapshot_context()
+        logger.info("[Scheduler] Stopped")
+
 
 # FOR TESTING 
 if __name__ == "__main__":
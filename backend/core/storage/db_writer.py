@@ -1,6 +1,7 @@
 import threading
 import queue
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, Any
 
@@ -29,8 +30,18 @@ class DBWriter:
     Yapmaz:
     - Rule çalıştırmak
     - Correlation mantığı kurmak
+
+    Log offset checkpoint'leri: log kaynağından gelen (checkpointed) bir event
+    yazılamadıysa CHECKPOINT callback'i çalışmaz (ertelenir); offset commit
+    edilmemiş event'i geçmez. Tipi önemli değil: auditd'den gelen
+    PROCESS_EXEC de audit.log offset'ine bağlıdır.
     """
 
+    # ertelenen checkpoint'ler sırasında tekrar denenmek üzere tutulan
+    # başarısız event sınırı; aşılırsa checkpoint restart'a kadar durur
+    # (restart'ta son sağlam offset'ten tekrar okunur)
+    MAX_FAILED_WRITES = 10000
+
     # -------------------------------------------------
     # INIT
     # -------------------------------------------------
@@ -39,6 +50,12 @@ class DBWriter:
         self._stop_event = threading.Event()
         self.scheduler = None  # Reference to scheduler
 
+        # yazılamamış log kaynaklı event'ler (model, payload, tip) + onlar
+        # yüzünden bekleyen checkpoint callback'leri
+        self._failed_writes = deque()
+        self._deferred_checkpoints = []
+        self._checkpoints_blocked = False
+
         self.worker = threading.Thread(
             target=self._run,
             name="DBWriter",
@@ -59,7 +76,8 @@ class DBWriter:
     def stop(self):
         logger.info("[DBWriter] Stopping DB writer thread")
         self._stop_event.set()
-        self.worker.join(timeout=5)
+        if self.worker.is_alive():
+            self.worker.join(timeout=10)
 
     def enqueue(self, payload: Dict[str, Any]):
         if payload:
@@ -72,7 +90,8 @@ class DBWriter:
     def _run(self):
         logger.info("[DBWriter] Worker running")
         
-        while not self._stop_event.is_set():
+        # stop() sonrası kuyrukta kalanlar (kapanış özetleri, checkpoint'ler) yazılır
+        while not (self._stop_event.is_set() and self.queue.empty()):
             # HEARTBEAT UPDATE (Clean access via registered instance)
             if self.scheduler:
                  self.scheduler.heartbeat["DBWriter"] = time.time()
@@ -101,16 +120,20 @@ class DBWriter:
         logger.debug(f"[DBWriter][ROUTE] type={etype}")
 
         if etype.startswith("PROCESS_"):
-            self._write(ProcessEventModel, payload, etype)
+            self._write_event(ProcessEventModel, payload, etype)
 
         elif etype == "LOG_EVENT":
-            self._write(LogEventModel, payload, etype)
+            self._write_event(LogEventModel, payload, etype)
 
         elif etype.startswith("NET_") or etype.startswith("CONNECTION_"):
-            self._write(NetworkEventModel, payload, etype)
+            self._write_event(NetworkEventModel, payload, etype)
 
         elif etype == "METRIC_SNAPSHOT":
-            self._write(MetricModel, payload, etype)
+            self._write_event(MetricModel, payload, etype)
+
+        elif etype == "CHECKPOINT":
+            # önceki tüm payload'lar işlendi → checkpoint ilerleyebilir
+            self._checkpoint(payload["callback"])
 
         elif etype == "ALERT":
             # HATA PAYI
@@ -132,7 +155,84 @@ class DBWriter:
 
         self._with_retry(op, event_type=event_type)
 
+    def _write_event(self, model, payload: Dict[str, Any], event_type: str):
+        try:
+            self._write(model, payload, event_type)
+        except Exception:
+            # log kaynağından geldiyse offset'i bu event yazılmadan ilerlememeli
+            if payload.get("checkpointed"):
+                self._remember_failed_write(model, payload, event_type)
+            raise
+
+    # -------------------------------------------------
+    # LOG OFFSET CHECKPOINT
+    # -------------------------------------------------
+    def _checkpoint(self, callback):
+        if self._checkpoints_blocked:
+            return
+
+        # önce yazılamamış event'leri tekrar dene
+        if self._failed_writes and not self._retry_failed_writes():
+            # offset commit edilmemiş event'i geçmesin → callback sırayla bekler
+            self._deferred_checkpoints.append(callback)
+            logger.warning(
+                f"[DBWriter][CHECKPOINT] deferred, "
+                f"{len(self._failed_writes)} log source events not written yet"
+            )
+            return
+
+        deferred, self._deferred_checkpoints = self._deferred_checkpoints, []
+        for cb in deferred:
+            cb()
+        callback()
+
+    def _remember_failed_write(self, model, payload: Dict[str, Any], event_type: str):
+        if self._checkpoints_blocked:
+            return
+
+        if len(self._failed_writes) >= self.MAX_FAILED_WRITES:
+            self._checkpoints_blocked = True
+            self._failed_writes.clear()
+            self._deferred_checkpoints = []
+            logger.error(
+                "[DBWriter][CHECKPOINT] too many failed log source writes, "
+                "log offsets frozen until restart (unwritten lines will be re-read)"
+            )
+            return
+
+        self._failed_writes.append((model, payload, event_type))
+
+    def _retry_failed_writes(self) -> bool:
+        """Başarısız event'leri sırayla tekrar yazar; hepsi yazıldıysa True."""
+        failed = self._failed_writes
+
+        while failed:
+            try:
+                self._write(*failed[0])
+            except Exception as e:
+                logger.debug(f"[DBWriter][CHECKPOINT] retry failed: {e}")
+                return False
+            failed.popleft()
+
+        return True
+
+    def write_bulk(self, model, rows, *, event_type: str, chunk_size: int = 5000):
+        """
+        Senkron toplu yazma (backfill gibi tek seferlik yüklemeler için).
+        rows: kolon dict'leri. Her chunk ayrı transaction'dır.
+        """
+        for i in range(0, len(rows), chunk_size):
+            chunk = rows[i:i + chunk_size]
+
+            def op(session):
+                session.bulk_insert_mappings(model, chunk)
+
+            self._with_retry(op, event_type=event_type)
+
+        logger.debug(f"[DBWriter][BULK] model={model.__name__} rows={len(rows)}")
+
     def _with_retry(self, fn, *, event_type: str, retries: int = 3):
+        """Locked hatasında tekrar dener; denemeler biterse son hata yükseltilir."""
         for attempt in range(1, retries + 1):
             session = SessionLocal()
             try:
@@ -144,7 +244,7 @@ class DBWriter:
                 return
             except OperationalError as e:
                 session.rollback()
-                if "locked" in str(e):
+                if "locked" in str(e) and attempt < retries:
                     logger.debug(
                         f"[DBWriter][RETRY] db locked attempt={attempt}"
                     )
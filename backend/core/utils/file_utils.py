@@ -2,4 +2,44 @@
 
 # güvenli dosya okuma
 # tail fonksiyonu (son N satırı alma)
-# path existence kontrolü
\ No newline at end of file
+# path existence kontrolü
+
+import json
+import os
+import tempfile
+
+
+def atomic_write_json(path, data):
+    """
+    JSON'u atomic olarak yazar: temp dosya → fsync → rename.
+    Yazma sırasında crash olursa eski dosya bozulmadan kalır.
+    """
+    # json.dump() chunk chunk pure-Python encoder'dan geçer; dumps() C encoder
+    # ile tek string üretir → büyük dosyalarda kat kat hızlı
+    atomic_write_text(path, json.dumps(data, separators=(",", ":")))
+
+
+def atomic_write_text(path, text):
+    """Hazır metni (ör: parça parça üretilmiş JSON) atomic olarak yazar."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # rename'in kalıcı olması için dizini de fsync et
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
@@ -0,0 +1,194 @@
+# 📁 indicators.py
+
+# Amaç: rule'ların IOC / anahtar kelime listelerini (HACKING_TOOLS,
+# SENSITIVE_FILES, komut ve log kelimeleri) bir kez derleyip her event'te
+# liste taramadan sorgulamak.
+#
+#   matcher = IndicatorMatcher(["/etc/shadow", "/home/*/.ssh/authorized_keys"])
+#   matcher.contains("nmap")                          → tam eşleşme (hash set)
+#   matcher.search("cat /home/bob/.ssh/authorized_keys")  → metinde geçen ilk indicator
+#   matcher.match_path("/home/bob/.ssh/authorized_keys")  → path'in tamamı eşleşiyor mu
+#
+# - Düz indicator'lar: set (contains / match_path) + trie'den üretilmiş tek regex
+#   (search). Trie regex'in maliyeti liste uzunluğuyla değil, metin ve ortak
+#   önek yapısıyla büyür → binlerce IOC'de de event başına tek tarama.
+# - Küçük listelerde (SCAN_THRESHOLD altı) düz `in` taraması regex'ten hızlı → o kullanılır.
+# - Glob indicator'lar (*, ?, [..]): "*" bir path parçası içinde kalır
+#   (/home/*/.ssh → /home/bob/.ssh, /home/a/b/.ssh değil); metin aramasında
+#   boşluk da geçilmez.
+# - Varsayılan büyük/küçük harf duyarsız: indicator'lar ve sorgular küçük harfe çevrilir.
+
+import re
+
+from backend.core.utils.hacking_tools import HACKING_TOOLS
+from backend.core.utils.sensitive_files import SENSITIVE_FILES
+
+GLOB_CHARS = ("*", "?", "[")
+
+
+class IndicatorMatcher:
+
+    # bu kadar düz indicator'a kadar search() `in` ile tarar, üstünde trie regex
+    SCAN_THRESHOLD = 32
+
+    def __init__(self, indicators, ignore_case=True):
+        self.ignore_case = ignore_case
+
+        self._original = {}   # normalize edilmiş → listedeki hali
+        literals = []
+        globs = []
+
+        for indicator in indicators:
+            if not indicator:
+                continue
+            key = indicator.lower() if ignore_case else indicator
+            if key in self._original:
+                continue
+            self._original[key] = indicator
+
+            if any(ch in key for ch in GLOB_CHARS):
+                globs.append(key)
+            else:
+                literals.append(key)
+
+        self._literals = frozenset(literals)
+
+        # search(): küçük liste → tuple taraması, büyük liste → trie regex
+        self._scan = None
+        self._literal_re = None
+        if len(literals) <= self.SCAN_THRESHOLD:
+            self._scan = tuple(literals)
+        else:
+            self._literal_re = re.compile(_trie_pattern(literals))
+
+        # glob başına (path regex'i, metin regex'i) + birleşik regex'ler
+        self._globs = [
+            (key, re.compile(_glob_pattern(key, "[^/]")), re.compile(_glob_pattern(key, r"[^/\s]")))
+            for key in globs
+        ]
+        self._glob_path_re = self._union(p for _, p, _ in self._globs)
+        self._glob_text_re = self._union(t for _, _, t in self._globs)
+
+    def __len__(self):
+        return len(self._original)
+
+    # ---------------------------
+    # PUBLIC API
+    # ---------------------------
+
+    def contains(self, value) -> bool:
+        """value listedeki düz indicator'lardan biriyle birebir aynı mı? (O(1))"""
+        if not value:
+            return False
+        return (value.lower() if self.ignore_case else value) in self._literals
+
+    def match_path(self, path):
+        """Path'in tamamı bir indicator'a (glob dahil) uyuyorsa o indicator, yoksa None."""
+        if not path:
+            return None
+
+        key = path.lower() if self.ignore_case else path
+        if key in self._literals:
+            return self._original[key]
+
+        if self._glob_path_re is not None and self._glob_path_re.fullmatch(key):
+            for glob, path_re, _ in self._globs:
+                if path_re.fullmatch(key):
+                    return self._original[glob]
+
+        return None
+
+    def search(self, text):
+        """Metinde geçen ilk indicator (glob dahil), yoksa None."""
+        if not text:
+            return None
+
+        if self.ignore_case:
+            text = text.lower()
+
+        if self._scan is not None:
+            for literal in self._scan:
+                if literal in text:
+                    return self._original[literal]
+        else:
+            m = self._literal_re.search(text)
+            if m:
+                return self._original[m.group(0)]
+
+        if self._glob_text_re is not None and self._glob_text_re.search(text):
+            for glob, _, text_re in self._globs:
+                if text_re.search(text):
+                    return self._original[glob]
+
+        return None
+
+    # ---------------------------
+    # HELPERS
+    # ---------------------------
+
+    @staticmethod
+    def _union(patterns):
+        patterns = [p.pattern for p in patterns]
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+
+def _trie_pattern(words) -> str:
+    """
+    Kelime listesi → ortak önekleri birleştirilmiş regex:
+    ["crontab", "cron.d", "curl"] → c(?:ron(?:tab|\\.d)|url)
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # kelime burada bitebilir → devamı opsiyonel
+            return "(?:" + pattern + ")?"
+        return pattern
+
+    return build(trie)
+
+
+def _glob_pattern(glob: str, any_char: str) -> str:
+    """Glob → regex; *, ? ve [..] any_char sınıfını aşmaz (ör: path ayırıcı)."""
+    out = []
+    i, n = 0, len(glob)
+
+    while i < n:
+        ch = glob[i]
+        i += 1
+
+        if ch == "*":
+            out.append(any_char + "*")
+        elif ch == "?":
+            out.append(any_char)
+        elif ch == "[":
+            end = glob.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(ch))
+                continue
+            body = glob[i:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        else:
+            out.append(re.escape(ch))
+
+    return "".join(out)
+
+
+# Rule'ların ve parser'ların ortak kullandığı varsayılan instance'lar
+hacking_tools = IndicatorMatcher(HACKING_TOOLS)
+sensitive_files = IndicatorMatcher(SENSITIVE_FILES)
@@ -58,16 +58,6 @@ KERNEL_PANIC = re.compile(
     r"kernel panic", re.IGNORECASE
 )
 
-# Segfault
-KERNEL_SEGFAULT = re.compile(
-    r"(segfault|segmentation fault)", re.IGNORECASE
-)
-
-# Out of memory / OOM killer
-KERNEL_OOM = re.compile(
-    r"(Out of memory|OOM killer)", re.IGNORECASE
-)
-
 # USB device errors
 KERNEL_USB_ERROR = re.compile(
     r"usb .* error", re.IGNORECASE
@@ -97,11 +87,6 @@ SYS_TIMESTAMP = re.compile(
     r"^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}"
 )
 
-# systemd-unit: something happened
-SYS_SYSTEMD = re.compile(
-    r"systemd\[(\d+)\]:\s*(.*)"
-)
-
 # service name: foo.service
 SYS_SERVICE_NAME = re.compile(
     r"([a-zA-Z0-9_.-]+)\.service"
@@ -139,13 +124,163 @@ SYS_ERROR = re.compile(
 
 UFW_ACTION = re.compile(r"UFW (BLOCK|ALLOW)", re.IGNORECASE)
 
-UFW_SRC_IP = re.compile(r"SRC=([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)")
-UFW_DST_IP = re.compile(r"DST=([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)")
 
-UFW_PROTOCOL = re.compile(r"PROTO=([A-Z]+)")
 
-UFW_SRC_PORT = re.compile(r"SPT=(\d+)")
-UFW_DST_PORT = re.compile(r"DPT=(\d+)")
+# ============================
+# NETFILTER LOG (UFW / iptables LOG)
+# ============================
+
+# Kernel'in netfilter LOG çıktısı sabit sıralıdır (IPv4 ve IPv6 aynı iskelet):
+#   IN=eth0 OUT= [PHYSIN=.. PHYSOUT=..] [MAC=..] SRC=.. DST=.. LEN=.. ... PROTO=TCP [SPT=.. DPT=..]
+# Tek search ile tüm paket alanları; SPT/DPT sadece PROTO'nun hemen ardından
+# (ICMP hata mesajlarındaki iç paketin portları alınmasın).
+NETFILTER_PACKET = re.compile(
+    r" IN=(\S*) OUT=(\S*) "
+    r"(?:\S+ )*?SRC=([0-9A-Fa-f.:]+) DST=([0-9A-Fa-f.:]+) "
+    r"(?:\S+ )*?PROTO=(\S+)"
+    r"(?: SPT=(\d+) DPT=(\d+))?"
+)
+
+# küçük harfe çevrilmiş kern.log satırında netfilter LOG izi
+NETFILTER_TAG = re.compile(r" in=\S* out=")
+
+
 
-UFW_IN_IF = re.compile(r"IN=([a-zA-Z0-9]+)")
-UFW_OUT_IF = re.compile(r"OUT=([a-zA-Z0-9]+)")
+# ============================
+# AUDITD (/var/log/audit/audit.log)
+# ============================
+
+# "type=SYSCALL msg=audit(1364481363.243:24287): ..." → tip, saniye, ms, serial
+AUDIT_HEADER = re.compile(
+    r"(?:node=\S+ )?type=(\w+) msg=audit\((\d+)\.(\d+):(\d+)\):\s*"
+)
+
+# SYSCALL alan sırası kernel'de sabit:
+# arch syscall success exit a0..a3 items ppid pid auid uid gid euid ... tty ses comm exe [subj] key
+AUDIT_SYSCALL = re.compile(
+    r"syscall=(\w+)(?: success=(\w+))?(?: exit=(\S+))?"
+    r".*? ppid=(\d+) pid=(\d+) auid=(\d+) uid=(\d+)"
+    r".*? euid=(\d+)"
+    r".*? ses=(\d+) comm=(\S+) exe=(\S+)"
+    r"(?:.*? key=(\S+))?"
+)
+
+# EXECVE: a0="ls" a1=2D6C61 ... ; uzun argümanlar a1_len=N a1[0]=.. a1[1]=.. parçalı gelir
+AUDIT_EXECVE_ARG = re.compile(r" a(\d+)(?:\[\d+\])?=(\S+)")
+
+AUDIT_PATH = re.compile(r"item=(\d+) name=(\S+)(?:.*? nametype=(\w+))?")
+AUDIT_CWD = re.compile(r"cwd=(\S+)")
+AUDIT_PROCTITLE = re.compile(r"proctitle=(\S+)")
+
+# tek satırlık (user-space) kayıtlar: pid=.. uid=.. msg='op=.. acct="root" res=failed'
+AUDIT_FIELD = re.compile(r"(\w+)=(\"[^\"]*\"|'[^']*'|\S+)")
+
+# ============================
+# SYSLOG HEADER
+# ============================
+
+# zaman damgasından sonrası: "host sshd[1234]: message" → host, program, pid
+# (LineContext zaman damgası uzunluğunu bildiği için match(text, pos) ile kullanılır)
+SYSLOG_TAG = re.compile(
+    r"(\S+) ([^\s\[:]+)(?:\[(\d+)\])?:\s*"
+)
+
+# ============================
+# SSHD SESSION (core/parser/ssh_sessions.py)
+# ============================
+
+# sshd bağlantı satırlarında karşı taraf hep "<ip> port <n>" olarak geçer;
+# öncesindeki "user X" / "for X" denenen kullanıcıdır (IPv4 + IPv6):
+#   "Invalid user admin from 203.0.113.45 port 51122"
+#   "Connection closed by authenticating user root 203.0.113.45 port 51130 [preauth]"
+#   "Unable to negotiate with 2001:db8::17 port 33222: ..."
+SSHD_PEER = re.compile(
+    r"(?:(?:user|for) (\S+) )?(?:from |by |with )?([0-9a-fA-F:.]+) port (\d+)"
+)
+
+# küçük harfli satırda — bağlantıya ait olmayan, sshd ana process'inin satırları
+SSHD_DAEMON_MARKERS = ("server listening", "received signal", "received sighup", "terminating")
+
+# preauth bağlantının son satırı
+SSHD_CLOSE_MARKERS = (
+    "disconnected from", "connection closed by", "connection reset by", "disconnecting ",
+    "did not receive identification", "unable to negotiate", "banner exchange",
+)
+
+# login olmuş oturumun son satırı (öncesinde "disconnected from" gelir)
+SSHD_SESSION_CLOSED = "session closed for user"
+
+# ============================
+# REPEATED LINE COLLAPSE
+# ============================
+
+# Satır başındaki zaman damgası (syslog / ISO / dpkg) → gövde karşılaştırmasında atlanır
+LINE_TIMESTAMP_PREFIX = re.compile(
+    r"^(?:(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}"
+    r"|\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}\S*)\s+"
+)
+
+# kern.log uptime damgası → "kernel: [ 1234.567890] "
+KERNEL_UPTIME = re.compile(r"\[\s*\d+\.\d+\]\s*")
+
+# rsyslog özeti → "host sshd[12]: message repeated 5 times: [ Failed password ...]"
+RSYSLOG_REPEATED = re.compile(
+    r"^(?P<head>.*?: )message repeated (?P<count>\d+) times: \[ ?(?P<message>.*?) ?\]$"
+)
+
+
+
+# ============================
+# PREFILTERS (tek geçiş sınıflandırma)
+# ============================
+# [(sonuç, anahtar kelimeler, doğrulama regex'i)] — öncelik sırasıyla.
+# Kural: anahtar kelimelerden biri satırda geçiyorsa (boşsa her zaman) ve
+# regex verilmişse o da eşleşiyorsa ilk uyan kuralın adı döner
+# (bkz: core/parser/prefilter.py).
+
+# sudo oturum satırları: "sudo: pam_unix(sudo:session): session opened ..."
+AUTH_SUDO_TAG = re.compile(r"sudo:")
+
+# AUTH (küçük harfe çevrilmiş satır üzerinde)
+AUTH_PREFILTER = [
+    ("FAILED_LOGIN", ("failed password",), None),
+    ("SUCCESS_LOGIN", ("accepted password", "accepted publickey"), None),
+    ("FAILED_AUTH", ("authentication failure",), None),
+    ("SUDO_SESSION_OPEN", ("session opened",), AUTH_SUDO_TAG),
+    ("SUDO_SESSION_CLOSE", ("session closed",), AUTH_SUDO_TAG),
+    ("SESSION_OPEN", ("session opened",), None),
+    ("SESSION_CLOSE", ("session closed",), None),
+    ("AUTH_EVENT", ("sshd", "sudo"), None),
+]
+
+# KERNEL (küçük harfe çevrilmiş satır üzerinde)
+KERNEL_PREFILTER = [
+    ("KERNEL_PANIC", ("kernel panic",), None),
+    ("SEGFAULT", ("segfault", "segmentation fault"), None),
+    ("OOM_KILLER", ("out of memory", "oom killer"), None),
+    ("USB_ERROR", ("usb ",), KERNEL_USB_ERROR),
+    ("DRIVER_ERROR", ("driver ",), KERNEL_DRIVER_FAIL),
+    ("NETFILTER_PACKET", (" in=",), NETFILTER_TAG),
+    ("KERNEL_EVENT", ("kernel", "panic", "oom", "driver", "usb"), None),
+]
+
+# SYSLOG — servis kalıpları büyük/küçük harf duyarlı; SYS_ERROR / SYS_WARNING IGNORECASE
+SYS_PREFILTER = [
+    ("SERVICE_FAILED", ("Failed to start",), SYS_FAILED_START),
+    ("SERVICE_STARTED", ("Started",), SYS_STARTED),
+    ("SERVICE_STOPPED", ("Stopped",), SYS_STOPPED),
+    ("SYSTEM_ERROR", (), SYS_ERROR),
+    ("SYSTEM_WARNING", (), SYS_WARNING),
+]
+
+# UFW — eski UFW_ACTION gibi büyük/küçük harf duyarsız ([UFW block], [UFW Audit])
+UFW_PREFILTER = [
+    ("UFW_BLOCK", ("ufw block",), None),
+    ("UFW_ALLOW", ("ufw allow",), None),
+    ("UFW_EVENT", ("ufw ",), None),
+]
+
+# DPKG — DPKG_ACTIONS sırası öncelik sırası
+DPKG_PREFILTER = [
+    (action, (f" {action} ",), None) for action in DPKG_ACTIONS
+]
@@ -1,4 +1,18 @@
-from datetime import datetime
+# 📁 timestamp.py
+
+# Log satırı başındaki zaman damgasını datetime'a çevirir.
+#
+# - Klasik syslog: "Dec  4 12:32:10"  (yıl yok → referans zamandan çıkarılır)
+# - ISO-8601 (journald / rsyslog high precision): "2024-12-04T12:32:10.123+03:00"
+# - dpkg: "2024-12-04 12:32:10"
+#
+# Ardışık satırlar çoğunlukla aynı saniyeyi paylaşır: sonuçlar ham prefix'e
+# göre cache'lenir, strptime yerine alanlar elle okunur. Yılsız syslog
+# zamanlarının yılı referans güne bağlı olduğu için referans günü değişince
+# (reference=None → gece yarısı geçince) cache boşaltılır.
+
+import time
+from datetime import datetime, timedelta
 
 MONTHS = {
     "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4,
@@ -6,32 +20,140 @@ MONTHS = {
     "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12
 }
 
-def parse_timestamp(line: str):
-    if not line:
-        return None
-
-    try:
-        # ISO-8601 (journald)
-        if line[0].isdigit():
-            parts = line.split()
-            if "T" in parts[0]:
-                return datetime.fromisoformat(parts[0])
-            if len(parts) >= 2:
-                return datetime.fromisoformat(f"{parts[0]} {parts[1]}")
-
-        # Klasik syslog
-        month_str = line[0:3]
-        if month_str not in MONTHS:
+# referanstan bu kadar ileride görünen syslog zamanı → geçen yıla ait
+FUTURE_TOLERANCE = timedelta(days=1)
+
+
+class TimestampParser:
+    """
+    reference: yılsız syslog zamanlarının yılı bu zamana göre seçilir
+    (None → datetime.now()). Backfill'de arşivin mtime'ı verilir.
+
+    Aralık→Ocak geçişi: aday zaman referanstan 1 günden fazla ilerideyse
+    bir önceki yıl kabul edilir (ör: 2 Ocak'ta okunan "Dec 31" satırı).
+    """
+
+    CACHE_SIZE = 1024
+
+    def __init__(self, reference=None, cache_size=None):
+        self.reference = reference
+        self.cache_size = cache_size or self.CACHE_SIZE
+
+        self._cache = {}
+        # reference=None iken cache'in geçerli olduğu günün bitişi (epoch)
+        self._cache_until = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------------------
+    # PUBLIC API
+    # ---------------------------
+
+    def parse(self, line: str):
+        if not line:
+            return None
+
+        iso = line[0].isdigit()
+        key = self._iso_prefix(line) if iso else line[:15]
+
+        if self.reference is None and time.time() >= self._cache_until:
+            self._roll_day()
+
+        cache = self._cache
+        if key in cache:
+            self.hits += 1
+            return cache[key]
+
+        self.misses += 1
+        ts = self._parse_iso(key) if iso else self._parse_syslog(key)
+
+        if len(cache) >= self.cache_size:
+            cache.clear()
+        cache[key] = ts
+        return ts
+
+    def set_reference(self, reference):
+        """Referans zamanı değiştirir; yıl çıkarımı değişeceği için cache boşalır."""
+        self.reference = reference
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._cache),
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------------------
+    # HELPERS
+    # ---------------------------
+
+    def _roll_day(self):
+        # yeni gün → "Dec 31" gibi prefix'lerin yılı değişmiş olabilir
+        self._cache.clear()
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self._cache_until = (today + timedelta(days=1)).timestamp()
+
+    @staticmethod
+    def _iso_prefix(line: str) -> str:
+        # "2024-12-04T12:32:10..." → ilk token, "2024-12-04 12:32:10 ..." → ilk iki token
+        first = line.find(" ")
+        if first < 0:
+            return line
+        if "T" in line[:first]:
+            return line[:first]
+        second = line.find(" ", first + 1)
+        return line[:second] if second > 0 else line
+
+    @staticmethod
+    def _parse_iso(text: str):
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
             return None
 
-        day = int(line[4:6])
-        time_str = line[7:15]
-        year = datetime.now().year
+    def _parse_syslog(self, text: str):
+        # "Dec  4 12:32:10"
+        month = MONTHS.get(text[0:3])
+        if month is None or len(text) < 15 or text[9] != ":" or text[12] != ":":
+            return None
+
+        try:
+            day = int(text[4:6])
+            hour = int(text[7:9])
+            minute = int(text[10:12])
+            second = int(text[13:15])
+        except ValueError:
+            return None
+
+        reference = self.reference or datetime.now()
+        year = reference.year
+
+        try:
+            ts = datetime(year, month, day, hour, minute, second)
+        except ValueError:
+            # 29 Şubat → artık yıl olan geçen yıla ait olabilir
+            year -= 1
+            try:
+                return datetime(year, month, day, hour, minute, second)
+            except ValueError:
+                return None
+
+        if ts - reference > FUTURE_TOLERANCE:
+            try:
+                ts = ts.replace(year=year - 1)
+            except ValueError:
+                return None
+
+        return ts
 
-        return datetime.strptime(
-            f"{year}-{MONTHS[month_str]}-{day} {time_str}",
-            "%Y-%m-%d %H:%M:%S"
-        )
 
-    except Exception:
-        return None
+# Parser'ların ortak kullandığı varsayılan instance
+default_parser = TimestampParser()
+parse_timestamp = default_parser.parse
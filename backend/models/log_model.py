@@ -39,22 +39,27 @@ class LogEventModel(Base):
     # ---------------------------------------------------
     #            STATIC CREATE METHOD
     # ---------------------------------------------------
+    @staticmethod
+    def to_row(event: dict) -> dict:
+        """Parsed event → kolon dict'i (create ve bulk insert ortak kullanır)."""
+        return {
+            "timestamp": event.get("timestamp"),
+            "log_source": event.get("log_source"),
+            "event_type": event.get("event_type"),
+            "category": event.get("category"),
+            "severity": event.get("severity"),
+            "raw_log": event.get("raw"),
+            "message": event.get("message"),
+            "user": event.get("user"),
+            "ip_address": event.get("ip"),
+            "process_name": event.get("process"),
+            "rule_triggered": None,
+            "extra_data": event.get("extra_data"),
+        }
+
     @staticmethod
     def create(event: dict, session):
-        obj = LogEventModel(
-            timestamp=event.get("timestamp"),
-            log_source=event.get("log_source"),
-            event_type=event.get("event_type"),
-            category=event.get("category"),
-            severity=event.get("severity"),
-            raw_log=event.get("raw"),
-            message=event.get("message"),
-            user=event.get("user"),
-            ip_address=event.get("ip"),
-            process_name=event.get("process"),
-            rule_triggered=None,
-            extra_data=event.get("extra_data"),
-        )
+        obj = LogEventModel(**LogEventModel.to_row(event))
 
         session.add(obj)
         return obj
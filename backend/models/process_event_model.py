@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
 from backend.models.base import Base, current_time
 
@@ -70,6 +72,14 @@ class ProcessEventModel(Base):
     # ---------------------------------------------------
     @staticmethod
     def create(event: dict, session):
+        # auditd event'lerinde timestamp datetime (yerel, naive) → kolona yazılır,
+        # JSON kolonlarına ISO string olarak girer
+        ts = event.get("timestamp")
+        if isinstance(ts, datetime):
+            event = {**event, "timestamp": ts.isoformat()}
+        else:
+            ts = None
+
         obj = ProcessEventModel(
             event_type=event.get("type"),
             pid=event.get("pid"),
@@ -91,6 +101,8 @@ class ProcessEventModel(Base):
             snapshot_data=event,
             raw_event=event
         )
+        if ts is not None:
+            obj.timestamp = ts
 
         session.add(obj)
         return obj
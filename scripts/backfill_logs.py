@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# Agent yeni kurulduğunda son N günün rotate edilmiş loglarını
+# (auth.log.1, syslog.2.gz ...) DB'ye yükler. Alarm üretmez.
+#
+# Kullanım:
+#   python scripts/backfill_logs.py --days 7
+#   python scripts/backfill_logs.py --days 3 --workers 4 --dry-run
+
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from backend.core.collector.backfill import LogBackfill
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HIDS rotated log backfill")
+    parser.add_argument("--days", type=int, default=7, help="kaç günlük arşiv yüklensin (varsayılan: 7)")
+    parser.add_argument("--workers", type=int, default=None, help="parse worker sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--dry-run", action="store_true", help="sadece parse et, DB'ye yazma")
+    args = parser.parse_args()
+
+    print(f"\n===== HIDS LOG BACKFILL (son {args.days} gün) =====\n")
+
+    db_writer = None
+    if not args.dry_run:
+        from backend.database import init_db
+        from backend.core.storage.db_writer import DBWriter
+
+        init_db()
+        db_writer = DBWriter()  # thread başlatılmaz; write_bulk senkron yazar
+
+    backfill = LogBackfill(days=args.days, workers=args.workers, db_writer=db_writer)
+    stats = backfill.run()
+
+    if not stats:
+        print("Arşiv bulunamadı.")
+        return
+
+    total = stats.pop("_total")
+
+    for source, s in stats.items():
+        print(f"{source:<10} {s['archives']:>3} arşiv  {s['lines']:>10} satır  {s['events']:>8} event")
+
+    print("\n-------------------------------------------")
+    print(f"Toplam satır : {total['lines']}")
+    print(f"Toplam event : {total['events']}")
+    print(f"Süre         : {total['seconds']} sn ({total['lines_per_sec']} satır/sn)")
+    print("-------------------------------------------\n")
+
+
+if __name__ == "__main__":
+    main()
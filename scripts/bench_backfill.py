@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+# 📁 bench_backfill.py
+#
+# LogBackfill paralellik kontrolü: N arşiv N worker ile gerçekten aynı anda
+# parse ediliyor mu?
+#
+#   python scripts/bench_backfill.py                       # CPU sayısı kadar arşiv / worker
+#   python scripts/bench_backfill.py --archives 8 --workers 4 --lines 300000
+#
+# scripts/bench/corpus/auth.log tekrarlanarak geçici dizinde auth.log.1.gz ...
+# arşivleri üretilir, önce 1 worker sonra N worker ile backfill çalıştırılır.
+# Event'ler DB yerine sayan bir writer'a gider (spool yolu dahil ölçülür;
+# --dry-run → spool da yok, sadece parse).
+#
+# Çıktı: süre, lines/sec, hızlanma ve worker'larda aynı anda parse edilen en
+# fazla arşiv sayısı. Overlap beklenenin altındaysa exit code 1.
+
+import argparse
+import gzip
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.collector.backfill import LogBackfill
+from backend.core.collector.log_sources import LogSourceRegistry
+
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench", "corpus", "auth.log")
+
+
+class CountingWriter:
+    """DBWriter.write_bulk yerine: satırları sayar, yazmaz."""
+
+    def __init__(self):
+        self.rows = 0
+
+    def write_bulk(self, model, rows, *, event_type, chunk_size=5000):
+        self.rows += len(rows)
+
+
+def make_archives(directory, count, lines):
+    with open(CORPUS, "rb") as f:
+        corpus = [line for line in f if line.strip()]
+
+    now = time.time()
+    for i in range(1, count + 1):
+        path = os.path.join(directory, f"auth.log.{i}.gz")
+        with gzip.open(path, "wb", compresslevel=1) as out:
+            out.writelines(itertools.islice(itertools.cycle(corpus), lines))
+        # numarası büyük olan daha eski
+        os.utime(path, (now - i * 3600, now - i * 3600))
+
+
+def max_overlap(timings):
+    """Aynı anda parse edilen en fazla arşiv sayısı."""
+    points = sorted(
+        [(start, 1) for _, start, _ in timings] + [(end, -1) for _, _, end in timings],
+        key=lambda p: (p[0], p[1]),
+    )
+    best = current = 0
+    for _, delta in points:
+        current += delta
+        best = max(best, current)
+    return best
+
+
+def run(directory, workers, dry_run):
+    registry = LogSourceRegistry([{"name": "auth", "path": os.path.join(directory, "auth.log"), "parser": "auth"}])
+    writer = None if dry_run else CountingWriter()
+    backfill = LogBackfill(days=3650, workers=workers, registry=registry, db_writer=writer)
+
+    started = time.perf_counter()
+    stats = backfill.run()
+    elapsed = time.perf_counter() - started
+
+    total = stats["_total"]
+    busy = sum(end - start for _, start, end in backfill.timings)
+    return {
+        "seconds": elapsed,
+        "lines": total["lines"],
+        "events": total["events"],
+        "overlap": max_overlap(backfill.timings),
+        "parallelism": busy / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LogBackfill parallelism benchmark")
+    parser.add_argument("--archives", type=int, default=None, help="arşiv sayısı (varsayılan: worker sayısı)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="worker sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--lines", type=int, default=200000, help="arşiv başına satır (varsayılan 200000)")
+    parser.add_argument("--dry-run", action="store_true", help="spool / writer olmadan sadece parse")
+    args = parser.parse_args()
+
+    archives = args.archives or args.workers
+
+    with tempfile.TemporaryDirectory(prefix="hids-bench-backfill-") as directory:
+        make_archives(directory, archives, args.lines)
+
+        print(f"\n===== BACKFILL BENCH ({archives} arşiv × {args.lines} satır) =====\n")
+
+        results = {}
+        for workers in sorted({1, args.workers}):
+            r = results[workers] = run(directory, workers, args.dry_run)
+            print(
+                f"workers={workers:<3} {r['seconds']:>7.2f} sn  {int(r['lines'] / r['seconds']):>9} satır/sn  "
+                f"overlap={r['overlap']}  parallelism={r['parallelism']:.2f}  events={r['events']}"
+            )
+
+    expected = min(archives, args.workers)
+    overlap = results[args.workers]["overlap"]
+    speedup = results[1]["seconds"] / results[args.workers]["seconds"]
+
+    print("\n-------------------------------------------")
+    print(f"Hızlanma       : {speedup:.2f}x ({args.workers} worker)")
+    print(f"Aynı anda      : {overlap} / {expected} arşiv")
+    print("-------------------------------------------\n")
+
+    if overlap < expected:
+        print("FAIL: arşivler worker'larda aynı anda parse edilmiyor")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
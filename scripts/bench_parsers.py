@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+# 📁 bench_parsers.py
+#
+# Parser throughput benchmark + golden corpus doğruluk kontrolü.
+#
+#   python scripts/bench_parsers.py                    # tüm kaynaklar
+#   python scripts/bench_parsers.py auth ufw --lines 200000
+#   python scripts/bench_parsers.py --update           # expected/*.json yeniden üret
+#
+# scripts/bench/corpus/<kaynak>.log      → anonim, gerçekçi satır karışımı
+# scripts/bench/expected/<kaynak>.json   → her satır için beklenen event (eşleşmeyen → null)
+#
+# Her kaynak için:
+#   - parser çıktısı expected ile karşılaştırılır (fark varsa exit code 1)
+#   - parser lines/sec, satır başı p50 / p99 gecikme
+#   - tracemalloc: satır başı peak byte ve canlı kalan blok sayısı (event'ler tutulurken)
+#   - LogDispatcher.dispatch_batch uçtan uca lines/sec
+#   - TimestampParser cache isabet oranı
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.parser.LogDispatcher import LogDispatcher
+from backend.core.parser.line_context import LineContext
+from backend.core.utils.timestamp import default_parser
+
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench")
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+EXPECTED_DIR = os.path.join(BENCH_DIR, "expected")
+
+SOURCES = ("auth", "syslog", "kernel", "ufw", "dpkg")
+
+# syslog satırlarında yıl yok → golden çıktı çalıştırıldığı tarihe bağlı kalmasın
+REFERENCE = datetime(2024, 12, 31, 23, 59, 59)
+
+DEFAULT_LINES = 50000
+
+
+# ---------------------------
+# CORPUS / GOLDEN
+# ---------------------------
+
+def load_corpus(source: str) -> list:
+    with open(os.path.join(CORPUS_DIR, f"{source}.log"), encoding="utf-8") as f:
+        return [line for line in f.read().splitlines() if line]
+
+
+def parse_lines(parser, lines) -> list:
+    events = []
+    for line in lines:
+        ctx = LineContext(line)
+        events.append(parser.parse(ctx) if parser.match(ctx) else None)
+    return events
+
+
+def normalize(events) -> list:
+    # datetime → str; JSON ile aynı şekle getirilir
+    return json.loads(json.dumps(events, default=str, sort_keys=True))
+
+
+def check_golden(source: str, parser, lines, update=False) -> list:
+    """Beklenen event'lerle farkları döner (update → expected dosyasını yazar)."""
+    actual = normalize(parse_lines(parser, lines))
+    path = os.path.join(EXPECTED_DIR, f"{source}.json")
+
+    if update:
+        os.makedirs(EXPECTED_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(actual, f, indent=2, sort_keys=True, ensure_ascii=False)
+            f.write("\n")
+        return []
+
+    if not os.path.exists(path):
+        return [f"{source}: expected file missing ({path}), run with --update"]
+
+    with open(path, encoding="utf-8") as f:
+        expected = json.load(f)
+
+    if len(expected) != len(actual):
+        return [f"{source}: {len(actual)} lines parsed, expected file has {len(expected)}"]
+
+    errors = []
+    for lineno, (exp, got) in enumerate(zip(expected, actual), 1):
+        if exp == got:
+            continue
+
+        if exp is None or got is None:
+            errors.append(f"{source}:{lineno}: expected {exp!r}, got {got!r}")
+            continue
+
+        for key in sorted(set(exp) | set(got)):
+            if exp.get(key) != got.get(key):
+                errors.append(
+                    f"{source}:{lineno}: {key}: expected {exp.get(key)!r}, got {got.get(key)!r}"
+                )
+
+    return errors
+
+
+# ---------------------------
+# MEASUREMENTS
+# ---------------------------
+
+def measure_throughput(parser, lines) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        ctx = LineContext(line)
+        if parser.match(ctx):
+            parser.parse(ctx)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def measure_latency(parser, lines) -> tuple:
+    """Satır başı (p50, p99) µs — perf_counter_ns çağrısının kendi maliyeti dahil."""
+    clock = time.perf_counter_ns
+    samples = []
+
+    for line in lines:
+        start = clock()
+        ctx = LineContext(line)
+        if parser.match(ctx):
+            parser.parse(ctx)
+        samples.append(clock() - start)
+
+    samples.sort()
+    return (
+        samples[len(samples) // 2] / 1000,
+        samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1000,
+    )
+
+
+def measure_allocations(parser, lines) -> tuple:
+    """(peak byte / satır, canlı blok / satır) — event'ler pipeline'daki gibi tutulur."""
+    tracemalloc.start()
+    try:
+        events = parse_lines(parser, lines)
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+
+    del events
+    return peak / len(lines), blocks / len(lines)
+
+
+def measure_dispatcher(dispatcher, source: str, lines) -> tuple:
+    start = time.perf_counter()
+    result = dispatcher.dispatch_batch(source, lines)
+    return len(lines) / (time.perf_counter() - start), result
+
+
+# ---------------------------
+# MAIN
+# ---------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Parser benchmark + golden corpus check")
+    ap.add_argument("sources", nargs="*", default=list(SOURCES),
+                    help=f"kaynaklar: {', '.join(SOURCES)} (varsayılan: hepsi)")
+    ap.add_argument("--lines", type=int, default=DEFAULT_LINES,
+                    help=f"kaynak başına ölçülen satır sayısı (corpus tekrarlanır, varsayılan {DEFAULT_LINES})")
+    ap.add_argument("--update", action="store_true",
+                    help="expected/*.json dosyalarını mevcut parser çıktısıyla yeniden yaz")
+    ap.add_argument("--check-only", action="store_true",
+                    help="sadece doğruluk kontrolü, ölçüm yok")
+    args = ap.parse_args()
+
+    unknown = set(args.sources) - set(SOURCES)
+    if unknown:
+        ap.error(f"unknown source(s): {', '.join(sorted(unknown))}")
+
+    default_parser.set_reference(REFERENCE)
+    dispatcher = LogDispatcher()
+
+    errors = []
+    rows = []
+
+    for source in args.sources:
+        parser = dispatcher.get_parser(source)
+        corpus = load_corpus(source)
+
+        errors += check_golden(source, parser, corpus, update=args.update)
+        if args.check_only or args.update:
+            continue
+
+        lines = (corpus * (args.lines // len(corpus) + 1))[:args.lines]
+
+        # ısınma (lazy import / regex cache)
+        parse_lines(parser, corpus)
+
+        default_parser.reset_stats()
+        rate = measure_throughput(parser, lines)
+        ts_stats = default_parser.stats()
+
+        p50, p99 = measure_latency(parser, lines)
+        peak_per_line, blocks_per_line = measure_allocations(parser, lines[:len(corpus) * 20])
+        dispatch_rate, result = measure_dispatcher(dispatcher, source, lines)
+
+        rows.append((
+            source, len(lines), rate, p50, p99, peak_per_line, blocks_per_line,
+            dispatch_rate, len(result["events"]), ts_stats["hit_rate"],
+        ))
+
+    if rows:
+        print(
+            f"{'source':<8} {'lines':>7} {'parser/s':>10} {'p50 µs':>7} {'p99 µs':>7} "
+            f"{'B/line':>7} {'blk/line':>8} {'dispatch/s':>10} {'events':>7} {'ts hit':>6}"
+        )
+        for source, n, rate, p50, p99, peak, blocks, d_rate, events, hit in rows:
+            print(
+                f"{source:<8} {n:>7} {rate:>10.0f} {p50:>7.2f} {p99:>7.2f} "
+                f"{peak:>7.0f} {blocks:>8.1f} {d_rate:>10.0f} {events:>7} {hit:>6.2f}"
+            )
+
+    if args.update:
+        print(f"Expected dosyaları güncellendi: {EXPECTED_DIR}")
+
+    if errors:
+        print(f"\n{len(errors)} golden mismatch:")
+        for err in errors[:50]:
+            print("  ✗", err)
+        sys.exit(1)
+
+    if not args.update:
+        print("\nGolden corpus: OK")
+
+
+if __name__ == "__main__":
+    main()
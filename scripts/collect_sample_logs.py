@@ -13,15 +13,19 @@ def main():
     print("Running LogsCollector test...\n")
 
     collector = LogsCollector()
-    raw_logs = collector.collect()
+    total = 0
 
-    print(f"Toplam yeni satır: {len(raw_logs)}\n")
+    for batch in collector.collect():
+        src = batch["source"]
+        total += len(batch["lines"])
 
-    for entry in raw_logs:
-        src = entry["source"]
-        line = entry["line"]
-        print(f"[{src}] {line}")
+        for line in batch["lines"]:
+            print(f"[{src}] {line}")
 
+        collector.commit(batch)
+
+    collector.flush()
+    print(f"\nToplam yeni satır: {total}")
     print("\nTest tamamlandı! (Yeni satır yoksa collector doğru çalışıyor demektir.)")
 
 
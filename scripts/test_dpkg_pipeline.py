@@ -19,22 +19,25 @@ def main():
     collector = LogsCollector()
     dispatcher = LogDispatcher()
 
-    raw_logs = collector.collect()
+    total = 0
 
-    print(f"Toplam yeni satır bulundu: {len(raw_logs)}\n")
+    for batch in collector.collect():
+        src = batch["source"]
+        total += len(batch["lines"])
 
-    for entry in raw_logs:
-        src = entry["source"]
-        line = entry["line"]
+        result = dispatcher.dispatch_batch(batch["parser"], batch["lines"])
+        print(
+            f"[BATCH] ({src}) {len(batch['lines'])} satır, "
+            f"{result['skipped']} skipped, {result['failed']} failed"
+        )
 
-        print(f"[RAW] ({src}) {line}")
+        for event in result["events"]:
+            print(f"  → [PARSED] {event['event_type']} | {event['message']}")
 
-        event = dispatcher.dispatch(src, line)
+        collector.commit(batch)
 
-        if event:
-            print(f"  → [PARSED] {event['event_type']} | {event['message']}")
-        else:
-            print("  → [SKIPPED] Parser bu satırı işlemedi.")
+    collector.flush()
+    print(f"\nToplam yeni satır bulundu: {total}\n")
 
     # --- DB kontrol ---
     session = SessionLocal()
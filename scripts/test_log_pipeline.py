@@ -14,24 +14,31 @@ def main():
     collector = LogsCollector()
     dispatcher = LogDispatcher()
 
-    logs = collector.collect()
+    total = 0
+    parsed = 0
 
-    print(f"Toplam yeni log satırı: {len(logs)}\n")
+    for batch in collector.collect():
+        source = batch["source"]
+        total += len(batch["lines"])
 
-    for entry in logs:
-        source = entry["source"]
-        line = entry["line"]
+        result = dispatcher.dispatch_batch(batch["parser"], batch["lines"])
+        parsed += len(result["events"])
 
-        event = dispatcher.dispatch(source, line)
+        print(
+            f"[{source.upper()}] {len(batch['lines'])} satır → {len(result['events'])} event "
+            f"(skipped: {result['skipped']}, failed: {result['failed']})"
+        )
 
-        print(f"[{source.upper()}] RAW: {line}")
-
-        if event:
+        for event in result["events"]:
             print("  → PARSED EVENT:", event)
-        else:
-            print("  → NO MATCH / SKIPPED")
 
         print("-" * 60)
 
+        collector.commit(batch)
+
+    collector.flush()
+    print(f"Toplam yeni log satırı: {total}")
+    print(f"Toplam parse edilen event: {parsed}\n")
+
 if __name__ == "__main__":
     main()